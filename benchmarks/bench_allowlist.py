@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Allowlist matching cost as the number of literal entries grows.
+
+Compares the old flat ``a|b|c|...`` alternation with the trie-compiled
+AllowedMatcher on the same synthetic prose (a banned-looking emoji on every
+fifth line). The flat alternation grows linearly with the entry count; the
+matcher stays roughly flat.
+
+    python benchmarks/bench_allowlist.py [--lines 2000] [--sizes 100,1000,5000,20000]
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Callable, List
+import argparse
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from emoji_sniper.core.allowed_parser import AllowedMatcher, AllowedSpec  # noqa: E402
+
+
+WORDS = ["alpha", "beta", "gamma", "delta", "note", "todo", "warn", "done", "star", "ship"]
+
+
+def _entries(n: int, rng: random.Random) -> List[str]:
+    out = set()
+    while len(out) < n:
+        emoji = chr(rng.randint(0x1F300, 0x1F5FF))
+        word = f"{rng.choice(WORDS)}{rng.randint(0, 9999)}"
+        out.add(f"{emoji} {word}" if rng.random() < 0.5 else f"{word} {emoji}")
+    return sorted(out)
+
+
+def _lines(n: int, rng: random.Random) -> List[str]:
+    lines = []
+    for i in range(n):
+        line = " ".join(rng.choice(WORDS + ["the", "a", "of", "and"]) for _ in range(12))
+        if i % 5 == 0:
+            line += " " + chr(rng.randint(0x1F300, 0x1F5FF))
+        lines.append(line)
+    return lines
+
+
+def _time(fn: Callable[[str], object], lines: List[str]) -> float:
+    start = time.perf_counter()
+    for line in lines:
+        fn(line)
+    return (time.perf_counter() - start) * 1000
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--lines", type=int, default=2000)
+    ap.add_argument("--sizes", default="100,1000,5000,20000")
+    args = ap.parse_args()
+
+    rng = random.Random(1)
+    lines = _lines(args.lines, rng)
+    print(f"{'entries':>8}  {'flat (ms)':>10}  {'trie (ms)':>10}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        entries = _entries(size, rng)
+        flat = re.compile("|".join(re.escape(e) for e in entries))
+        matcher = AllowedMatcher(AllowedSpec(tuple(entries), ()))
+        t_flat = _time(lambda s, flat=flat: [m.span() for m in flat.finditer(s)], lines)
+        t_trie = _time(matcher.spans, lines)
+        print(f"{size:>8}  {t_flat:>10.1f}  {t_trie:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
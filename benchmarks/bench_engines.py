@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Regex engine vs the NumPy engine on one large synthetic file.
+
+Mostly-ASCII prose with a sprinkle of emoji and accented text, scanned with
+the default-style emoji ranges. Both engines must report the same hits.
+
+    python benchmarks/bench_engines.py [--mb 50] [--density 0.01]
+"""
+from __future__ import annotations
+
+from pathlib import Path
+import argparse
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from emoji_sniper.core.banned_parser import BannedSpec  # noqa: E402
+from emoji_sniper.core.engine import Sniper  # noqa: E402
+from emoji_sniper.core.numpy_engine import NumpyEngine  # noqa: E402
+
+
+WORDS = ["alpha", "beta", "café", "naïve", "note", "todo", "über", "done", "star", "ship"]
+SPEC = BannedSpec(
+    ranges=((0x1F300, 0x1F5FF), (0x1F600, 0x1F64F), (0x1F680, 0x1F6FF), (0x2600, 0x27BF)),
+    literals=(),
+)
+
+
+def _write(path: Path, mb: int, density: float, rng: random.Random) -> None:
+    target = mb * 1024 * 1024
+    with open(path, "w", encoding="utf-8") as f:
+        written = 0
+        while written < target:
+            words = [rng.choice(WORDS) for _ in range(12)]
+            if rng.random() < density * 12:
+                words.insert(rng.randrange(12), chr(rng.randint(0x1F600, 0x1F64F)))
+            line = " ".join(words) + "\n"
+            f.write(line)
+            written += len(line.encode("utf-8"))
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--mb", type=int, default=50)
+    ap.add_argument("--density", type=float, default=0.01, help="Emoji per word")
+    args = ap.parse_args()
+
+    sniper = Sniper(SPEC)
+    engine = NumpyEngine(sniper)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "big.md"
+        _write(path, args.mb, args.density, random.Random(1))
+
+        start = time.perf_counter()
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            lines = ((i, line.rstrip("\n")) for i, line in enumerate(f, start=1))
+            regex_hits = sum(1 for _ in sniper.scan_lines(str(path), lines))
+        t_regex = time.perf_counter() - start
+
+        start = time.perf_counter()
+        numpy_hits = sum(1 for _ in engine.scan_file(path))
+        t_numpy = time.perf_counter() - start
+
+    assert regex_hits == numpy_hits, (regex_hits, numpy_hits)
+    print(f"{args.mb} MB, {regex_hits} hits")
+    print(f"  regex: {t_regex:6.2f}s  ({args.mb / t_regex:6.1f} MB/s)")
+    print(f"  numpy: {t_numpy:6.2f}s  ({args.mb / t_numpy:6.1f} MB/s)")
+
+
+if __name__ == "__main__":
+    main()
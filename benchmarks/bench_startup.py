@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+CLI startup cost: importing the CLI, and a one-file scan with a small and a
+large allowlist.
+
+Each measurement runs a fresh interpreter and reports the median of --runs.
+With --budget-ms the script exits non-zero when the import median exceeds it
+(tests/test_startup.py checks the same budget).
+
+    python benchmarks/bench_startup.py [--runs 7] [--allowed-entries 20000]
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List
+import argparse
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = Path(__file__).resolve().parent.parent
+
+IMPORT_SNIPPET = (
+    "import time; t = time.perf_counter(); import emoji_sniper.main; "
+    "print((time.perf_counter() - t) * 1000)"
+)
+
+
+def _env() -> dict:
+    return dict(os.environ, PYTHONPATH=str(ROOT))
+
+
+def import_ms(runs: int) -> float:
+    samples = [
+        float(subprocess.check_output([sys.executable, "-c", IMPORT_SNIPPET], env=_env()))
+        for _ in range(runs)
+    ]
+    return statistics.median(samples)
+
+
+def scan_ms(argv: List[str], runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-m", "emoji_sniper.main", *argv],
+            env=_env(),
+            stdout=subprocess.DEVNULL,
+            check=False,
+        )
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--runs", type=int, default=7)
+    ap.add_argument("--allowed-entries", type=int, default=20000)
+    ap.add_argument("--budget-ms", type=float, default=None)
+    args = ap.parse_args()
+
+    t_import = import_ms(args.runs)
+    print(f"import emoji_sniper.main: {t_import:7.1f} ms")
+
+    rng = random.Random(1)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        note = tmp_path / "note.md"
+        note.write_text("Shipping today 🚀\nAll good ✅\n", encoding="utf-8")
+        allowed = tmp_path / "allowed.txt"
+        allowed.write_text(
+            "".join(
+                f"{chr(rng.randint(0x1F300, 0x1F5FF))} word{i}\n"
+                for i in range(args.allowed_entries)
+            ),
+            encoding="utf-8",
+        )
+        argv = ["scan", str(note), "--banned", str(ROOT / "banned.txt")]
+        print("scan one file:")
+        print(f"  no allowlist:             {scan_ms(argv, args.runs):7.1f} ms")
+        print(
+            f"  {args.allowed_entries:>6} allowlist entries: "
+            f"{scan_ms(argv + ['--allowed', str(allowed)], args.runs):7.1f} ms"
+        )
+
+    if args.budget_ms is not None and t_import > args.budget_ms:
+        sys.exit(f"import time {t_import:.1f} ms is over the {args.budget_ms:.0f} ms budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,36 @@
-from .core import SniperScanner, Occurrence
-from .substitute import Substitutor
-from .output import (
-    format_results_as_json,
-    format_results_as_text,
-    print_summary,
-)
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+import importlib
+
+# Re-exports are resolved on first access so that importing one submodule
+# (as the CLI does for each subcommand) does not import all of them
+_EXPORTS = {
+    "SniperScanner": ".core",
+    "Occurrence": ".engine",
+    "Sniper": ".engine",
+    "Substitutor": ".substitute",
+    "format_results_as_json": ".output",
+    "format_results_as_text": ".output",
+    "print_summary": ".output",
+    "scan_paths_async": ".aio",
+    "scan_text_async": ".aio",
+}
+
+__all__ = list(_EXPORTS)
+
+if TYPE_CHECKING:
+    from .aio import scan_paths_async, scan_text_async
+    from .core import SniperScanner
+    from .engine import Occurrence, Sniper
+    from .output import format_results_as_json, format_results_as_text, print_summary
+    from .substitute import Substitutor
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,126 @@
+"""
+asyncio front end for a compiled Sniper.
+
+Nothing here blocks the event loop: files are read in the loop's default
+thread pool and matching runs in ``executor`` (the default thread pool when
+None). Threads keep the loop responsive but share the GIL; for CPU
+parallelism pass ``process_pool(sniper)``, whose workers receive the Sniper
+once instead of with every call.
+
+``scan_paths_async`` is an async generator with at most ``concurrency`` files
+read or scanned ahead of the consumer, so a slow consumer holds back reading
+(backpressure) and memory stays bounded. Results come in path order.
+Cancelling the consuming task, closing the generator or running past
+``timeout`` (seconds for the whole request, raising ``asyncio.TimeoutError``)
+cancels the files still in flight; work already running in an executor
+finishes there, but its result is dropped.
+"""
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Deque, Iterable, List, TypeVar
+import asyncio
+import weakref
+
+from .engine import Occurrence, Sniper
+
+
+T = TypeVar("T")
+
+# Pools from process_pool(), whose workers already hold their Sniper
+_pools: "weakref.WeakKeyDictionary[Executor, int]" = weakref.WeakKeyDictionary()
+
+# Set once per worker process by the pool initializer
+_worker_sniper: Sniper | None = None
+
+
+def _init_worker(sniper: Sniper) -> None:
+    global _worker_sniper
+    _worker_sniper = sniper
+
+
+def _scan(sniper: Sniper | None, data: str | bytes, label: str) -> List[Occurrence]:
+    if sniper is None:
+        assert _worker_sniper is not None
+        sniper = _worker_sniper
+    if isinstance(data, bytes):
+        return sniper.scan_bytes(data, label)
+    return sniper.scan_text(data, label)
+
+
+def process_pool(sniper: Sniper, workers: int | None = None) -> ProcessPoolExecutor:
+    """A process pool for the async API whose workers each get ``sniper`` once."""
+    pool = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(sniper,))
+    _pools[pool] = id(sniper)
+    return pool
+
+
+def _scan_call(
+    sniper: Sniper, executor: Executor | None, data: str | bytes, label: str
+) -> "asyncio.Future[List[Occurrence]]":
+    loop = asyncio.get_running_loop()
+    # A pool from process_pool() for this Sniper already has it in every worker
+    shipped = executor is not None and _pools.get(executor) == id(sniper)
+    return loop.run_in_executor(executor, _scan, None if shipped else sniper, data, label)
+
+
+async def _within(aw: Awaitable[T], deadline: float | None) -> T:
+    if deadline is None:
+        return await aw
+    remaining = deadline - asyncio.get_running_loop().time()
+    return await asyncio.wait_for(aw, max(remaining, 0))
+
+
+async def scan_text_async(
+    sniper: Sniper,
+    text: str | bytes,
+    label: str = "<text>",
+    *,
+    executor: Executor | None = None,
+    timeout: float | None = None,
+) -> List[Occurrence]:
+    """``Sniper.scan_text`` (or ``scan_bytes`` for bytes) off the event loop."""
+    deadline = None if timeout is None else asyncio.get_running_loop().time() + timeout
+    return await _within(_scan_call(sniper, executor, text, label), deadline)
+
+
+async def scan_paths_async(
+    sniper: Sniper,
+    paths: Iterable[Path | str],
+    *,
+    executor: Executor | None = None,
+    concurrency: int = 4,
+    timeout: float | None = None,
+) -> AsyncIterator[Occurrence]:
+    """
+    Yield the occurrences of each file in ``paths``, in order, labelled with
+    the path. Read errors propagate (and cancel the rest of the request).
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    loop = asyncio.get_running_loop()
+    deadline = None if timeout is None else loop.time() + timeout
+
+    async def scan_one(path: Path | str) -> List[Occurrence]:
+        data = await loop.run_in_executor(None, Path(path).read_bytes)
+        return await _scan_call(sniper, executor, data, str(path))
+
+    pending: Deque["asyncio.Task[List[Occurrence]]"] = deque()
+    try:
+        for path in paths:
+            pending.append(asyncio.ensure_future(scan_one(path)))
+            if len(pending) >= concurrency:
+                for occ in await _within(pending.popleft(), deadline):
+                    yield occ
+        while pending:
+            for occ in await _within(pending.popleft(), deadline):
+                yield occ
+    finally:
+        for task in pending:
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled():
+                # Retrieve it, so a failure nobody waited for is not logged
+                task.exception()
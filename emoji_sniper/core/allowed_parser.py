@@ -10,13 +10,33 @@ Format:
 
 Allowed matches are later used to suppress banned occurrences that fall within
 any allowed match span.
+
+Literal lines are compiled into a prefix trie rather than one long
+alternation, so matching cost does not grow with the number of entries: small
+lists become a nested trie regex (e.g. ``✨ (?:brilliant|shiny)``), large ones
+are matched by walking the trie from candidate start positions.
+
+Literals and ``re:`` lines are matched in two independent passes whose spans
+may overlap. Literals are scanned left to right: where several match at one
+position the longest wins and the scan resumes at its end, so a shorter literal
+starting inside it is not tried. ``re:`` lines form their own alternation (the
+first listed regex matching at a position wins) and also match inside literal
+spans. Before the trie, literals and regexes shared one alternation in which
+the first listed entry won and consumed its text.
 """
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable, List, Tuple
+from typing import Dict, Iterable, List, Sequence, Tuple
 import re
 
+from .substitution_map import LiteralTrie
+
+
+# Up to this many literal entries the nested trie regex (matched in C) is
+# fastest; beyond it, walking the trie costs the same however many entries there are
+TRIE_REGEX_MAX = 512
+
 
 @dataclass(frozen=True)
 class AllowedSpec:
@@ -47,10 +67,101 @@ def parse_allowed_file(path: Path) -> AllowedSpec:
         return _parse_lines(f.readlines())
 
 
+def _class_or_literal(chars: List[str]) -> str:
+    if len(chars) == 1:
+        return re.escape(chars[0])
+    return "[" + "".join(re.escape(c) for c in chars) + "]"
+
+
+def build_trie_regex(sequences: Sequence[str]) -> re.Pattern[str] | None:
+    """
+    Compile literals into a regex shaped like their prefix trie.
+
+    Shared prefixes are written once, single-character leaves collapse into a
+    character class, and a literal that is a prefix of another becomes an
+    optional tail (greedy, so the longest literal wins).
+    """
+    root: Dict[str, dict] = {}
+    for seq in sequences:
+        if not seq:
+            continue
+        node = root
+        for ch in seq:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+    if not root:
+        return None
+
+    def emit(node: Dict[str, dict]) -> str:
+        alts: List[str] = []
+        leaves: List[str] = []
+        for ch in sorted(k for k in node if k):
+            child = node[ch]
+            # Follow unbranched chains iteratively to keep recursion shallow
+            chain = [ch]
+            while len(child) == 1 and "" not in child:
+                (nxt, child), = child.items()
+                chain.append(nxt)
+            if list(child) == [""]:
+                if len(chain) == 1:
+                    leaves.append(ch)
+                else:
+                    alts.append(re.escape("".join(chain)))
+            else:
+                alts.append(re.escape("".join(chain)) + emit(child))
+        if leaves:
+            alts.append(_class_or_literal(leaves))
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        if "" in node:
+            body = f"(?:{body})?"
+        return body
+
+    return re.compile(emit(root))
+
+
+class AllowedMatcher:
+    """Find allowed spans on a line: trie for literals, alternation for re: lines."""
+
+    def __init__(self, spec: AllowedSpec) -> None:
+        literals = [s for s in spec.sequences if s]
+        self.literal_pattern: re.Pattern[str] | None = None
+        self.literal_trie: LiteralTrie | None = None
+        if len(literals) <= TRIE_REGEX_MAX:
+            self.literal_pattern = build_trie_regex(literals)
+        else:
+            self.literal_trie = LiteralTrie({s: s for s in literals})
+        self.regex_pattern: re.Pattern[str] | None = None
+        if spec.regexes:
+            # Group raw regex to avoid precedence issues
+            self.regex_pattern = re.compile("|".join(f"(?:{rx})" for rx in spec.regexes))
+
+    def spans(self, text: str) -> List[Tuple[int, int]]:
+        """(start, end) of allowed matches; literal and regex spans may overlap."""
+        spans: List[Tuple[int, int]] = []
+        if self.literal_pattern is not None:
+            spans.extend(m.span() for m in self.literal_pattern.finditer(text))
+        elif self.literal_trie is not None:
+            spans.extend(self.literal_trie.spans(text))
+        if self.regex_pattern is not None:
+            spans.extend(m.span() for m in self.regex_pattern.finditer(text))
+        return spans
+
+
+def build_allowed_matcher(spec: AllowedSpec) -> AllowedMatcher | None:
+    if not any(spec.sequences) and not spec.regexes:
+        return None
+    return AllowedMatcher(spec)
+
+
 def build_allowed_regex(spec: AllowedSpec) -> re.Pattern[str] | None:
+    """
+    One pattern for the whole allowlist (trie regex for literals, then raw
+    regexes). ``build_allowed_matcher`` is faster for large allowlists.
+    """
     parts: List[str] = []
-    for seq in spec.sequences:
-        parts.append(re.escape(seq))
+    literal = build_trie_regex(spec.sequences)
+    if literal is not None:
+        parts.append(f"(?:{literal.pattern})")
     for rx in spec.regexes:
         # Group raw regex to avoid precedence issues
         parts.append(f"(?:{rx})")
@@ -58,4 +169,3 @@ def build_allowed_regex(spec: AllowedSpec) -> re.Pattern[str] | None:
     if not parts:
         return None
     return re.compile("|".join(parts))
-
@@ -5,18 +5,23 @@ Supported lines:
 - Unicode ranges like: \U0001F600-\U0001F64F (with or without indentation)
 - Literal characters on a line, e.g.: ✅❌⚠️✓❗️⭐️
 - Comments start with '#'; empty/whitespace lines ignored.
+- Section headers like [smart-quotes] start a named profile; lines before the
+  first header belong to the "default" profile.
 """
 from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable, List, Set, Tuple
+from typing import Dict, Iterable, List, Set, Tuple
 import re
 
 
 _RANGE_RE = re.compile(r"\\U([0-9A-Fa-f]{8})\s*-\s*\\U([0-9A-Fa-f]{8})")
 # Support literal character ranges like: 😀-😃
 _CHAR_RANGE_RE = re.compile(r"^(.)\s*-\s*(.)$")
+_SECTION_RE = re.compile(r"^\[([A-Za-z0-9_.-]+)\]$")
+
+DEFAULT_PROFILE = "default"
 
 
 @dataclass(frozen=True)
@@ -31,7 +36,7 @@ def _parse_lines(lines: Iterable[str]) -> BannedSpec:
 
     for raw in lines:
         s = raw.strip()
-        if not s or s.startswith("#"):
+        if not s or s.startswith("#") or _SECTION_RE.match(s):
             continue
 
         # 1) Backslash-U form: \UXXXXXXXX-\UYYYYYYYY
@@ -85,17 +90,39 @@ def _parse_lines(lines: Iterable[str]) -> BannedSpec:
 
 
 def parse_banned_file(path: Path) -> BannedSpec:
+    """Parse a banlist; any [profile] sections are merged into one spec."""
     with open(path, "r", encoding="utf-8") as f:
         return _parse_lines(f.readlines())
 
 
-def build_regex(spec: BannedSpec) -> re.Pattern[str]:
+def parse_banned_profiles(path: Path) -> Dict[str, BannedSpec]:
     """
-    Build a compiled regex that matches any banned code point.
+    Parse a banlist into named profiles, one per [name] section.
 
-    Note: complex emoji sequences will be matched per code point; this is
-    intentional for fast detection and simple highlighting.
+    A file without section headers yields a single "default" profile.
     """
+    sections: Dict[str, List[str]] = {}
+    current = DEFAULT_PROFILE
+    with open(path, "r", encoding="utf-8") as f:
+        for raw in f:
+            m = _SECTION_RE.match(raw.strip())
+            if m:
+                current = m.group(1)
+                sections.setdefault(current, [])
+                continue
+            sections.setdefault(current, []).append(raw)
+
+    profiles: Dict[str, BannedSpec] = {}
+    for name, lines in sections.items():
+        spec = _parse_lines(lines)
+        if name == DEFAULT_PROFILE and not (spec.ranges or spec.literals) and len(sections) > 1:
+            # Only comments before the first header
+            continue
+        profiles[name] = spec
+    return profiles
+
+
+def _char_class(spec: BannedSpec) -> str | None:
     parts: List[str] = []
 
     # Add ranges as \UXXXXXXXX-\UYYYYYYYY inside a char class
@@ -111,8 +138,103 @@ def build_regex(spec: BannedSpec) -> re.Pattern[str]:
             parts.append(re.escape(ch))
 
     if not parts:
+        return None
+    return "[" + "".join(parts) + "]"
+
+
+def build_regex(spec: BannedSpec) -> re.Pattern[str]:
+    """
+    Build a compiled regex that matches any banned code point.
+
+    Note: complex emoji sequences will be matched per code point; this is
+    intentional for fast detection and simple highlighting. See
+    build_sequence_regex for whole-sequence matching.
+    """
+    char_class = _char_class(spec)
+    if char_class is None:
         # Fallback that never matches
         return re.compile(r"(?!x)x")
-
-    char_class = "[" + "".join(parts) + "]"
     return re.compile(char_class)
+
+
+# Emoji sequence components (UTS #51)
+_VS = "[\uFE0E\uFE0F]"
+_MOD = "[\U0001F3FB-\U0001F3FF]"
+_TAGS = "[\U000E0020-\U000E007E]+\U000E007F"
+_RI = "[\U0001F1E6-\U0001F1FF]"
+_KEYCAP = "[0-9#*]\uFE0F?\u20E3"
+# Code points that commonly follow a ZWJ even when not banned themselves
+# (gender signs, medical/scales, airplane, heart, arrow, black square, pictographs)
+_ZWJ_TAIL = "[\u2640\u2642\u2695\u2696\u2708\u2764\u27A1\u2B1B\U0001F300-\U0001FAFF]"
+
+
+def build_sequence_regex(spec: BannedSpec) -> re.Pattern[str]:
+    """
+    Build a compiled regex that matches whole emoji sequences in one pass.
+
+    A match starts at a banned code point and absorbs any trailing variation
+    selectors, skin-tone modifiers, tag sequences and ZWJ-joined elements;
+    regional-indicator pairs and keycaps are matched as single units when
+    their components are banned. A variation selector or ZWJ is never a
+    match on its own, even when a literal line bans it. Each match is one
+    occurrence.
+    """
+    char_class = _char_class(spec)
+    if char_class is None:
+        return re.compile(r"(?!x)x")
+
+    banned = re.compile(char_class)
+    element_tail = f"(?:{_VS}|{_MOD}|{_TAGS})*"
+    # Joiners and selectors only count as part of a sequence, never on their own
+    element = f"(?![\u200D\uFE0E\uFE0F]){char_class}{element_tail}"
+    joined = f"\u200D(?:{char_class}|{_ZWJ_TAIL}){element_tail}"
+
+    alts: List[str] = []
+    if banned.match("\U0001F1E6") or banned.match("\U0001F1FF"):
+        alts.append(f"{_RI}{_RI}")
+    if banned.match("\u20E3") or banned.match("\uFE0F"):
+        alts.append(_KEYCAP)
+    alts.append(f"{element}(?:{joined})*")
+    return re.compile("|".join(alts))
+
+
+def build_trigger_regex(specs: Iterable[BannedSpec], sequences: bool = False) -> re.Pattern[str]:
+    """
+    Build a single-code-point regex for dispatching substitution rules.
+
+    Rules are selected by the code points of a line's banned matches, so the
+    trigger set must hold single code points whatever the scan mode: every
+    banned range and literal code point from all specs and, in sequence mode
+    with keycaps banned, the keycap bases (a keycap match starts at one).
+    """
+    specs = list(specs)
+    merged = BannedSpec(
+        tuple(r for spec in specs for r in spec.ranges),
+        tuple(lit for spec in specs for lit in spec.literals),
+    )
+    banned = build_regex(merged)
+    if sequences and (banned.match("\u20E3") or banned.match("\uFE0F")):
+        merged = BannedSpec(merged.ranges, merged.literals + tuple("0123456789#*"))
+        banned = build_regex(merged)
+    return banned
+
+
+def build_profile_regex(
+    profiles: Dict[str, BannedSpec], sequences: bool = False
+) -> Tuple[re.Pattern[str], Dict[str, str]]:
+    """
+    Combine several named specs into one regex with a named group per profile.
+
+    Returns (pattern, group name -> profile name); use ``m.lastgroup`` to tag a
+    match. When profiles overlap, the earlier profile wins.
+    """
+    build = build_sequence_regex if sequences else build_regex
+    parts: List[str] = []
+    groups: Dict[str, str] = {}
+    for i, (name, spec) in enumerate(profiles.items()):
+        group = f"p{i}"
+        groups[group] = name
+        parts.append(f"(?P<{group}>{build(spec).pattern})")
+    if not parts:
+        return re.compile(r"(?!x)x"), groups
+    return re.compile("|".join(parts)), groups
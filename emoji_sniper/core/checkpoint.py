@@ -0,0 +1,152 @@
+"""
+Append-only checkpoints for resumable scans.
+
+A checkpoint is a JSON Lines file. The first line names the scan it belongs to
+(a hash of the rule files, the root and every option that changes results);
+each further line records one finished discovered file: its size and mtime,
+the occurrences it produced, its contribution to the counters and its report
+metadata. A file is only recorded once it has been scanned to the end, so an
+interrupted file is simply scanned again.
+
+Lines are buffered and flushed and fsynced in batches (every ``SYNC_EVERY``
+files or ``SYNC_SECONDS``), so checkpointing costs a few syscalls per batch
+rather than per file. A torn last line from a crash is ignored and cut off
+before appending resumes.
+"""
+from __future__ import annotations
+
+from dataclasses import asdict
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, List, Tuple
+import json
+import logging
+import os
+import time
+
+from .engine import Occurrence
+
+
+logger = logging.getLogger(__name__)
+
+# Bump when the line layout changes
+CHECKPOINT_FORMAT = 1
+
+SYNC_EVERY = 256
+SYNC_SECONDS = 2.0
+
+StatKey = Tuple[int | None, int | None]
+
+
+def stat_key(path: Path) -> StatKey:
+    """(size, mtime_ns) of ``path``, or (None, None) when it cannot be stat'ed."""
+    try:
+        st = Path(path).stat()
+    except OSError:
+        return None, None
+    return st.st_size, st.st_mtime_ns
+
+
+def _occurrence(d: Dict[str, Any]) -> Occurrence:
+    if d.get("codepoints") is not None:
+        d["codepoints"] = tuple(d["codepoints"])
+    return Occurrence(**d)
+
+
+class Checkpoint:
+    """Completed files of one scan, persisted to ``path``."""
+
+    def __init__(self, path: Path, key: str) -> None:
+        self.path = Path(path)
+        self.key = key
+        self._f: IO[str] | None = None
+        self._pending = 0
+        self._synced = 0.0
+        # Fail early on a checkpoint written for a different scan
+        self._load()
+
+    def _load(self) -> Tuple[Dict[str, Dict[str, Any]], int]:
+        """Records by file, and the byte offset just past the last whole line."""
+        done: Dict[str, Dict[str, Any]] = {}
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return done, 0
+        end = 0
+        with f:
+            for n, raw in enumerate(f):
+                if not raw.endswith(b"\n"):
+                    break
+                try:
+                    rec = json.loads(raw)
+                except ValueError:
+                    break
+                if n == 0:
+                    if rec.get("checkpoint") != CHECKPOINT_FORMAT or rec.get("key") != self.key:
+                        raise ValueError(
+                            f"Checkpoint {self.path} belongs to a different scan "
+                            "(rules, root or options changed); delete it to start over"
+                        )
+                else:
+                    done[rec["file"]] = rec
+                end += len(raw)
+        return done, end
+
+    def begin(self) -> Dict[str, Dict[str, Any]]:
+        """Open for appending; returns the files already completed."""
+        done, end = self._load()
+        f = open(self.path, "a+", encoding="utf-8")
+        f.truncate(end)
+        f.seek(end)
+        if end == 0:
+            f.write(json.dumps({"checkpoint": CHECKPOINT_FORMAT, "key": self.key}) + "\n")
+        self._f = f
+        self._pending = 0
+        self._synced = time.monotonic()
+        if done:
+            logger.info("Resuming from %s: %d files already scanned", self.path, len(done))
+        return done
+
+    def add(
+        self,
+        file: str,
+        stat: StatKey,
+        hits: Iterable[Occurrence],
+        counts: Dict[str, int],
+        meta: List[Dict[str, Any]],
+    ) -> None:
+        """Record one finished file."""
+        assert self._f is not None
+        rec = {
+            "file": file,
+            "size": stat[0],
+            "mtime_ns": stat[1],
+            "counts": counts,
+            "meta": meta,
+            "hits": [asdict(o) for o in hits],
+        }
+        self._f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        self._pending += 1
+        if self._pending >= SYNC_EVERY or time.monotonic() - self._synced >= SYNC_SECONDS:
+            self.sync()
+
+    def sync(self) -> None:
+        if self._f is None or not self._pending:
+            return
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self._pending = 0
+        self._synced = time.monotonic()
+
+    def close(self) -> None:
+        if self._f is None:
+            return
+        try:
+            self.sync()
+        finally:
+            self._f.close()
+            self._f = None
+
+    @staticmethod
+    def replay(rec: Dict[str, Any]) -> List[Occurrence]:
+        """Occurrences of a recorded file."""
+        return [_occurrence(d) for d in rec["hits"]]
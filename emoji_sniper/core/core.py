@@ -1,28 +1,21 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Iterable, List, Set, Tuple
+from typing import IO, Dict, Generator, Iterable, Iterator, List, Set, Tuple
 import logging
 import re
-import unicodedata as ud
 
-from ..utils.file_discovery import find_files
-from .banned_parser import parse_banned_file, build_regex
-from .allowed_parser import parse_allowed_file, build_allowed_regex
+from ..utils.archives import ARCHIVE_SUFFIXES, is_archive, iter_archive_members, iter_member_lines
+from ..utils.file_discovery import find_files, select_shard
+from .allowed_parser import AllowedMatcher
+from .engine import Occurrence, Sniper
 
 
 logger = logging.getLogger(__name__)
 
-
-@dataclass
-class Occurrence:
-    file: str
-    line: int
-    col: int
-    char: str
-    codepoint: str
-    name: str | None
+# When a capped file has at most this many unread bytes, its remaining hits are
+# counted exactly instead of extrapolated
+EXACT_TAIL_BYTES = 64 * 1024
 
 
 class SniperScanner:
@@ -34,6 +27,17 @@ class SniperScanner:
         exclude_patterns: Set[str] | None = None,
         extensions: Set[str] | None = None,
         include_names: bool = False,
+        shard: Tuple[int, int] | None = None,
+        respect_ignore: bool = False,
+        sequences: bool = False,
+        banned_profiles: Dict[str, Path] | None = None,
+        archives: bool = False,
+        max_per_file: int | None = None,
+        max_total: int | None = None,
+        skip_regions: Iterable[str] = (),
+        engine: str = "regex",
+        result_cache: Path | None = None,
+        checkpoint: Path | None = None,
     ) -> None:
         self.vault_path = Path(vault_path)
         self.banned_path = Path(banned_path)
@@ -41,13 +45,97 @@ class SniperScanner:
         self.exclude_patterns = exclude_patterns or set()
         self.extensions = extensions or {".md", ".txt"}
         self.include_names = include_names
+        self.shard = shard
+        self.respect_ignore = respect_ignore
+        self.sequences = sequences
+        self.archives = archives
+        # Result caps: a capped file (or run) stops being read once it is hit
+        self.max_per_file = max_per_file
+        self.max_total = max_total
+        # Size/mtime of files with hits from the last scan(), for report staleness checks
+        self.file_meta: List[Dict[str, int | str]] = []
+        # Stats of the last scan, complete once iter_scan() is exhausted
+        self.stats: Dict[str, int | str] = {}
+
+        # Named profiles come from repeated name=path banlists or from [name]
+        # sections in one banlist; all are compiled into a single matcher whose
+        # named groups tag each occurrence with its profile.
+        self.sniper = Sniper.from_files(
+            self.banned_path,
+            self.allowed_path,
+            banned_profiles=banned_profiles,
+            sequences=sequences,
+            include_names=include_names,
+            skip_regions=skip_regions,
+        )
+        self.pattern: re.Pattern[str] = self.sniper.pattern
+        self.profile_groups: Dict[str, str] | None = self.sniper.profile_groups
+        self.profiles: List[str] = self.sniper.profiles
+        self.allowed: AllowedMatcher | None = self.sniper.allowed
+
+        # The numpy engine classifies whole files at once; archive members
+        # and capped files (which stop mid-file) stay on the regex path
+        self.engine = engine
+        self.numpy_engine = None
+        if engine == "numpy":
+            if max_per_file is not None or max_total is not None:
+                raise ValueError("The numpy engine does not support --max-per-file/--max-total")
+            from .numpy_engine import NumpyEngine
+
+            self.numpy_engine = NumpyEngine(self.sniper)
+        elif engine != "regex":
+            raise ValueError(f"Unknown engine: {engine}")
+
+        # Results keyed by file content; capped files stop mid-file, so
+        # their results are never complete enough to cache
+        self.result_cache = None
+        if result_cache is not None:
+            if max_per_file is not None or max_total is not None:
+                raise ValueError("--result-cache does not support --max-per-file/--max-total")
+            from .result_cache import ResultCache, rule_key
+
+            rules = rule_key(
+                self.banned_path,
+                self.allowed_path,
+                banned_profiles=banned_profiles,
+                sequences=sequences,
+            )
+            self.result_cache = ResultCache(result_cache, self.sniper, rules)
+
+        # Completed files survive an interrupted scan; capped scans stop at
+        # run-wide limits, so a partial replay could not reproduce them
+        self.checkpoint = None
+        if checkpoint is not None:
+            if max_per_file is not None or max_total is not None:
+                raise ValueError("--checkpoint does not support --max-per-file/--max-total")
+            from .checkpoint import Checkpoint
 
-        spec = parse_banned_file(self.banned_path)
-        self.pattern: re.Pattern[str] = build_regex(spec)
-        self.allowed_pattern: re.Pattern[str] | None = None
-        if self.allowed_path and self.allowed_path.exists():
-            aspec = parse_allowed_file(self.allowed_path)
-            self.allowed_pattern = build_allowed_regex(aspec)
+            self.checkpoint = Checkpoint(checkpoint, self._checkpoint_key(banned_profiles))
+
+    def _checkpoint_key(self, banned_profiles: Dict[str, Path] | None) -> str:
+        """Identifies everything that decides which files are scanned and what they yield."""
+        import hashlib
+        import json
+
+        from .result_cache import rule_key
+
+        options = {
+            "rules": rule_key(
+                self.banned_path,
+                self.allowed_path,
+                banned_profiles=banned_profiles,
+                sequences=self.sequences,
+            ),
+            "root": str(self.vault_path.resolve()),
+            "extensions": sorted(self.extensions),
+            "exclude": sorted(self.exclude_patterns),
+            "shard": list(self.shard) if self.shard is not None else None,
+            "respect_ignore": self.respect_ignore,
+            "archives": self.archives,
+            "include_names": self.include_names,
+            "skip_regions": sorted(self.sniper.skip_regions),
+        }
+        return hashlib.sha256(json.dumps(options, sort_keys=True).encode()).hexdigest()
 
     def _iter_file_lines(self, path: Path) -> Iterable[Tuple[int, str]]:
         try:
@@ -55,58 +143,240 @@ class SniperScanner:
                 for i, line in enumerate(f, start=1):
                     yield i, line.rstrip("\n")
         except Exception as e:
-            logger.debug(f"Failed reading {path}: {e}")
+            logger.debug("Failed reading %s: %s", path, e)
             return
 
+    def match_line(self, text: str) -> Iterator[Tuple[int, str, str | None]]:
+        """See ``Sniper.match_line``."""
+        return self.sniper.match_line(text)
+
+    def discover(self) -> List[Path]:
+        """Files this scanner would visit, in scan order."""
+        extensions = self.extensions
+        if self.archives:
+            # Archives are picked up regardless of --ext; members are filtered instead
+            extensions = set(extensions) | ARCHIVE_SUFFIXES
+        files = find_files(
+            self.vault_path, extensions, self.exclude_patterns, self.respect_ignore
+        )
+        return select_shard(files, self.vault_path, self.shard)
+
+    def _scan_lines(self, label: str, lines: Iterable[Tuple[int, str]]) -> Iterator[Occurrence]:
+        return self.sniper.scan_lines(label, lines)
+
+    def _scan_text(self, text: str, label: str) -> Iterable[Occurrence]:
+        """Scan a whole decoded file with the configured engine."""
+        if self.numpy_engine is not None:
+            return self.numpy_engine.scan_chunk(text, label)
+        return self.sniper.scan_text(text, label)
+
+    def _remaining_hits(self, f: IO[str], size: int, hits: int) -> Tuple[int, bool]:
+        """
+        Hits left in a capped file after the current read position, and
+        whether that is an exact count (short tails) or an extrapolation from
+        the hit density so far.
+        """
+        pos = f.tell()
+        tail = size - pos
+        if tail <= 0:
+            return 0, True
+        # Region state is gone once scanning stopped, so only count exactly
+        # when no regions are skipped
+        if tail <= EXACT_TAIL_BYTES and not self.sniper.skip_regions:
+            return sum(1 for line in f for _ in self.match_line(line.rstrip("\n"))), True
+        return (round(hits * tail / pos) if pos else 0), False
+
     def scan(self) -> Tuple[List[Occurrence], Dict[str, int | str]]:
-        files = find_files(self.vault_path, self.extensions, self.exclude_patterns)
-        occurrences: List[Occurrence] = []
+        occurrences = list(self.iter_scan())
+        return occurrences, self.stats
+
+    def iter_scan(self) -> Iterator[Occurrence]:
+        """
+        Yield occurrences file by file as they are found. ``stats`` (and
+        ``file_meta``) are complete once the iterator is exhausted.
+        """
+        files = self.discover()
+        found = 0
         file_count = 0
         error_count = 0
+        truncated_count = 0
+        self.file_meta = []
+        self.stats = {}
+        if self.result_cache is not None:
+            self.result_cache.reset()
+        groups = self.profile_groups
+        per_profile: Dict[str, int] = dict.fromkeys(self.profiles, 0)
+        capped = self.max_per_file is not None or self.max_total is not None
+
+        archive_count = 0
+
+        def cap() -> int | None:
+            """Hits the next file may still add, or None when uncapped."""
+            limit = self.max_per_file
+            if self.max_total is not None:
+                left = self.max_total - found
+                limit = left if limit is None else min(limit, left)
+            return limit
+
+        def collect(
+            label: str, lines: Iterable[Tuple[int, str]]
+        ) -> Generator[Occurrence, None, Tuple[int, bool]]:
+            """Scan lines; returns (hits, whether the cap stopped the scan)."""
+            return absorb(self._scan_lines(label, lines))
+
+        def absorb(
+            hits: Iterable[Occurrence],
+        ) -> Generator[Occurrence, None, Tuple[int, bool]]:
+            nonlocal found
+            limit = cap()
+            if limit is not None and limit <= 0:
+                return 0, True
+            n = 0
+            for occ in hits:
+                if occ.profile is not None:
+                    per_profile[occ.profile] += 1
+                found += 1
+                n += 1
+                yield occ
+                if n == limit:
+                    return n, True
+            return n, False
+
+        def total_reached() -> bool:
+            return self.max_total is not None and found >= self.max_total
+
+        debug = logger.isEnabledFor(logging.DEBUG)
+
+        def scan_one(fp: Path) -> Iterator[Occurrence]:
+            nonlocal archive_count, file_count, error_count, truncated_count
+            if self.archives and is_archive(fp):
+                # Each matching member counts as one scanned file
+                archive_count += 1
+                try:
+                    for member, stream in iter_archive_members(
+                        fp, self.extensions, self.exclude_patterns
+                    ):
+                        if total_reached():
+                            break
+                        file_count += 1
+                        label = f"{fp}!/{member}"
+                        if debug:
+                            logger.debug("Scanning %s", label, extra={"file_index": file_count})
+                        try:
+                            if (yield from collect(label, iter_member_lines(stream)))[1]:
+                                truncated_count += 1
+                        except Exception as e:
+                            logger.debug("Error scanning %s: %s", label, e)
+                            error_count += 1
+                except Exception as e:
+                    logger.debug("Error reading archive %s: %s", fp, e)
+                    error_count += 1
+                return
 
-        for fp in files:
             file_count += 1
+            if debug:
+                logger.debug("Scanning %s", fp, extra={"file_index": file_count})
             try:
-                for ln, text in self._iter_file_lines(fp):
-                    allowed_spans: List[Tuple[int, int]] = []
-                    if self.allowed_pattern is not None:
-                        for am in self.allowed_pattern.finditer(text):
-                            allowed_spans.append((am.start(), am.end()))
-
-                    for m in self.pattern.finditer(text):
-                        idx = m.start()
-                        # Skip if within an allowed span
-                        if allowed_spans and any(s <= idx < e for s, e in allowed_spans):
-                            continue
-
-                        ch = m.group(0)
-                        col = idx + 1  # 1-based
-                        cp = f"U+{ord(ch):04X}"
-                        name = None
-                        if self.include_names:
-                            try:
-                                name = ud.name(ch)
-                            except ValueError:
-                                name = "<unnamed>"
-
-                        occurrences.append(
-                            Occurrence(
-                                file=str(fp),
-                                line=ln,
-                                col=col,
-                                char=ch,
-                                codepoint=cp,
-                                name=name,
-                            )
+                st = fp.stat()
+                meta: Dict[str, int | str | bool] = {
+                    "file": str(fp),
+                    "size": st.st_size,
+                    "mtime_ns": st.st_mtime_ns,
+                }
+                if self.result_cache is not None:
+                    hits = self.result_cache.scan_file(fp, str(fp), self._scan_text)
+                    n = (yield from absorb(hits))[0]
+                elif self.numpy_engine is not None:
+                    n = (yield from absorb(self.numpy_engine.scan_file(fp)))[0]
+                elif not capped:
+                    n = (yield from collect(str(fp), self._iter_file_lines(fp)))[0]
+                else:
+                    # readline() (unlike iteration) keeps f.tell() usable
+                    with open(fp, "r", encoding="utf-8", errors="replace") as f:
+                        lines = (
+                            (ln, line.rstrip("\n"))
+                            for ln, line in enumerate(iter(f.readline, ""), start=1)
                         )
+                        n, truncated = yield from collect(str(fp), lines)
+                        if truncated:
+                            remaining, exact = self._remaining_hits(f, st.st_size, n)
+                            # A cap that landed exactly on the last hit cut nothing
+                            if remaining or not exact:
+                                truncated_count += 1
+                                meta["truncated"] = True
+                                meta["estimated_remaining"] = remaining
+                if n:
+                    self.file_meta.append(meta)  # type: ignore[arg-type]
             except Exception as e:
-                logger.debug(f"Error scanning {fp}: {e}")
+                logger.debug("Error scanning %s: %s", fp, e)
                 error_count += 1
 
+        checkpoint = self.checkpoint
+        done = {}
+        if checkpoint is not None:
+            from .checkpoint import stat_key
+
+            done = checkpoint.begin()
+        skipped = 0
+        try:
+            for i, fp in enumerate(files):
+                if total_reached():
+                    skipped = len(files) - i
+                    logger.info("Stopping scan: --max-total %d reached", self.max_total)
+                    break
+                if checkpoint is None:
+                    yield from scan_one(fp)
+                    continue
+
+                # Files changed since they were recorded are scanned again
+                st_key = stat_key(fp)
+                rec = done.get(str(fp))
+                if rec is not None and (rec["size"], rec["mtime_ns"]) == st_key:
+                    yield from absorb(checkpoint.replay(rec))
+                    counts = rec["counts"]
+                    file_count += counts["files"]
+                    error_count += counts["errors"]
+                    archive_count += counts["archives"]
+                    self.file_meta.extend(rec["meta"])
+                    continue
+                before = (file_count, error_count, archive_count, len(self.file_meta))
+                file_hits: List[Occurrence] = []
+                for occ in scan_one(fp):
+                    file_hits.append(occ)
+                    yield occ
+                checkpoint.add(
+                    str(fp),
+                    st_key,
+                    file_hits,
+                    {
+                        "files": file_count - before[0],
+                        "errors": error_count - before[1],
+                        "archives": archive_count - before[2],
+                    },
+                    self.file_meta[before[3] :],  # type: ignore[arg-type]
+                )
+        finally:
+            if checkpoint is not None:
+                checkpoint.close()
+
         stats = {
             "vault_path": str(self.vault_path),
             "files_scanned": file_count,
             "errors": error_count,
-            "occurrences": len(occurrences),
+            "occurrences": found,
         }
-        return occurrences, stats
+        if groups is not None:
+            stats["profiles"] = per_profile
+        if self.archives:
+            stats["archives_scanned"] = archive_count
+        if capped:
+            stats["files_truncated"] = truncated_count
+            stats["files_skipped"] = skipped
+            stats["truncated"] = truncated_count > 0 or skipped > 0
+        if self.result_cache is not None:
+            stats["cache_hits"] = self.result_cache.hits
+            stats["cache_misses"] = self.result_cache.misses
+            stats["cache_bytes"] = self.result_cache.bytes_served
+        if self.shard is not None:
+            stats["shard"] = f"{self.shard[0]}/{self.shard[1]}"
+        self.stats = stats
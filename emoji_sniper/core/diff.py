@@ -0,0 +1,101 @@
+"""
+Streaming unified diffs for in-place line rewrites.
+
+Substitution never adds or removes lines, so a diff is built in one pass over
+(old, new, line ending) triples: unchanged lines go to a ``context``-sized
+ring buffer, and a hunk is opened at the first changed line and closed once
+``2 * context`` unchanged lines follow it. Only the open hunk and the ring
+buffer are ever held, and each hunk is yielded as soon as it closes.
+
+Output follows ``git diff`` conventions (``diff --git`` header, ``a/`` and
+``b/`` prefixes, ``\\ No newline at end of file``), and line endings are kept
+byte for byte, so ``git apply`` accepts it as is.
+"""
+from __future__ import annotations
+
+from collections import deque
+from typing import Deque, Iterable, Iterator, List, Tuple
+
+
+NO_NEWLINE = "\\ No newline at end of file\n"
+
+# Characters that make git quote a path in diff headers
+_QUOTE_CHARS = {'"': '\\"', "\\": "\\\\", "\n": "\\n", "\t": "\\t"}
+
+
+def quote_path(path: str) -> str:
+    """Quote a ``a/...``/``b/...`` header path the way git does, when needed."""
+    if not any(c in path for c in _QUOTE_CHARS):
+        return path
+    return '"' + "".join(_QUOTE_CHARS.get(c, c) for c in path) + '"'
+
+
+def _line(prefix: str, text: str, ending: str) -> str:
+    # ``ending`` is "\n", "\r\n" or "" (last line without a newline)
+    return f"{prefix}{text}{ending}" if ending else f"{prefix}{text}\n{NO_NEWLINE}"
+
+
+def unified_diff(
+    path: str, lines: Iterable[Tuple[str, str, str]], context: int = 3
+) -> Iterator[str]:
+    """
+    Yield the diff of one file, hunk by hunk, from (old, new, ending) per
+    line. Yields nothing when no line changed.
+    """
+    before: Deque[str] = deque(maxlen=context)
+    hunk: List[str] = []
+    minus: List[str] = []
+    plus: List[str] = []
+    start = 0  # 1-based first line of the open hunk, 0 when none is open
+    size = 0  # lines covered by the open hunk
+    tail = 0  # unchanged lines since the last change in the open hunk
+    header = False
+
+    def flush_changes() -> None:
+        hunk.extend(minus)
+        hunk.extend(plus)
+        minus.clear()
+        plus.clear()
+
+    def close(keep: int) -> str:
+        nonlocal header
+        # Drop unchanged lines past ``keep`` at the end of the hunk
+        body = hunk[: len(hunk) - (tail - keep)] if tail > keep else hunk
+        count = size - max(tail - keep, 0)
+        out = f"@@ -{start},{count} +{start},{count} @@\n" + "".join(body)
+        if not header:
+            header = True
+            quoted_a, quoted_b = quote_path(f"a/{path}"), quote_path(f"b/{path}")
+            out = f"diff --git {quoted_a} {quoted_b}\n--- {quoted_a}\n+++ {quoted_b}\n" + out
+        return out
+
+    for ln, (old, new, ending) in enumerate(lines, start=1):
+        if old == new:
+            ctx = _line(" ", old, ending)
+            if not start:
+                before.append(ctx)
+                continue
+            flush_changes()
+            hunk.append(ctx)
+            size += 1
+            tail += 1
+            if tail >= 2 * context:
+                # The next change is far enough away for a hunk of its own
+                yield close(context)
+                before.clear()
+                before.extend(hunk[len(hunk) - context :] if context else ())
+                hunk.clear()
+                start = size = tail = 0
+            continue
+        if not start:
+            start = ln - len(before)
+            hunk.extend(before)
+            size = len(before)
+            before.clear()
+        tail = 0
+        size += 1
+        minus.append(_line("-", old, ending))
+        plus.append(_line("+", new, ending))
+    if start:
+        flush_changes()
+        yield close(context)
@@ -0,0 +1,493 @@
+"""
+Compiled, filesystem-free matching and substitution.
+
+A ``Sniper`` holds everything derived from the rule files: the banned pattern
+(optionally with one named group per profile), the allowlist matcher and the
+substitution trie, regex rules and rule prefilter. Build it once and reuse it
+for any number of strings; ``SniperScanner`` and ``Substitutor`` are file
+walkers on top of it.
+
+Text is matched line by line (allowlist spans and regex rules never cross a
+newline), exactly as files are. When no banned code point is ASCII, pure
+ASCII input is ruled out without running a regex at all.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Mapping, Tuple
+import re
+import unicodedata as ud
+
+from .allowed_parser import (
+    AllowedMatcher,
+    AllowedSpec,
+    build_allowed_matcher,
+    parse_allowed_file,
+)
+from .regions import RegionTracker, parse_skip_regions
+from .banned_parser import (
+    DEFAULT_PROFILE,
+    BannedSpec,
+    build_profile_regex,
+    build_regex,
+    build_sequence_regex,
+    build_trigger_regex,
+    parse_banned_file,
+    parse_banned_profiles,
+)
+from .substitution_map import RulePrefilter, SubstitutionMap
+
+
+@dataclass
+class Occurrence:
+    file: str
+    line: int
+    col: int
+    char: str
+    codepoint: str
+    name: str | None
+    # Set in sequence mode: every code point of the matched sequence
+    codepoints: Tuple[str, ...] | None = None
+    length: int = 1
+    # Name of the banned profile that matched (None for a single unnamed banlist)
+    profile: str | None = None
+    # Set by ``fix``: "replaced" or "unmapped"
+    fix: str | None = None
+
+
+_SEQUENCE_JOINERS = frozenset("\u200d\ufe0e\ufe0f")
+
+# Universal newlines, as used when reading files in text mode
+_NEWLINE_RE = re.compile(r"\r\n|\r|\n")
+
+
+def _char_name(ch: str) -> str:
+    try:
+        return ud.name(ch)
+    except ValueError:
+        return "<unnamed>"
+
+
+def _sequence_name(seq: str) -> str:
+    """Name a sequence by its visible components, e.g. 'MAN + WOMAN + GIRL'."""
+    if len(seq) == 1:
+        return _char_name(seq)
+    return " + ".join(_char_name(c) for c in seq if c not in _SEQUENCE_JOINERS)
+
+
+def split_lines(text: str) -> List[str]:
+    """Split like text-mode file reading: universal newlines, no trailing empty line."""
+    if "\n" not in text and "\r" not in text:
+        return [text] if text else []
+    lines = _NEWLINE_RE.split(text)
+    if lines[-1] == "":
+        lines.pop()
+    return lines
+
+
+def _ascii_free(spec: BannedSpec) -> bool:
+    """True if no banned code point is ASCII (so ASCII text can never match)."""
+    return all(lo >= 0x80 for lo, _ in spec.ranges) and all(
+        ord(ch) >= 0x80 for lit in spec.literals for ch in lit
+    )
+
+
+def load_allowed(path: Path | None) -> AllowedSpec | None:
+    """Parse an allowlist; a missing file means no allowlist."""
+    if path is None or not Path(path).exists():
+        return None
+    return parse_allowed_file(Path(path))
+
+
+def _overlaps_allowed(span: Tuple[int, int], allowed_spans: List[Tuple[int, int]]) -> bool:
+    s, e = span
+    for as_, ae in allowed_spans:
+        if not (e <= as_ or s >= ae):
+            return True
+    return False
+
+
+class Sniper:
+    """
+    Reusable compiled rules for scanning and substituting in-memory text.
+
+    ``banned`` is either one ``BannedSpec`` or a mapping of profile name to
+    spec; with a mapping each hit is tagged with the profile that matched.
+    ``subs`` is only needed for the substitute methods.
+    """
+
+    def __init__(
+        self,
+        banned: BannedSpec | Mapping[str, BannedSpec],
+        allowed: AllowedSpec | None = None,
+        subs: SubstitutionMap | None = None,
+        *,
+        sequences: bool = False,
+        include_names: bool = False,
+        skip_regions: Iterable[str] = (),
+    ) -> None:
+        self.sequences = sequences
+        self.include_names = include_names
+        # Markdown regions (fences, front matter, inline code) never matched
+        self.skip_regions = parse_skip_regions(skip_regions)
+
+        self.profile_groups: Dict[str, str] | None = None
+        specs = [banned] if isinstance(banned, BannedSpec) else list(banned.values())
+        # Kept for engines that classify code points without the regex
+        self.banned_specs: List[BannedSpec] = specs
+        # Every match contains a banned code point (or a keycap mark), so pure
+        # ASCII input can be ruled out by str.isascii(), which is O(1)
+        self.ascii_safe = all(_ascii_free(spec) for spec in specs)
+        if isinstance(banned, BannedSpec):
+            self.pattern: re.Pattern[str] = (
+                build_sequence_regex(banned) if sequences else build_regex(banned)
+            )
+        else:
+            self.pattern, self.profile_groups = build_profile_regex(dict(banned), sequences)
+        self.profiles: List[str] = list(banned) if self.profile_groups is not None else []  # type: ignore[arg-type]
+
+        self.allowed: AllowedMatcher | None = (
+            build_allowed_matcher(allowed) if allowed is not None else None
+        )
+
+        self.subs = subs
+        self.regex_rules: List[Tuple[re.Pattern[str], str]] = (
+            subs.compiled_regex_rules() if subs is not None else []
+        )
+        # Triggers are single code points even when whole sequences are matched
+        self.rule_prefilter = RulePrefilter(
+            self.regex_rules, build_trigger_regex(specs, sequences)
+        )
+
+    @classmethod
+    def from_files(
+        cls,
+        banned_path: Path,
+        allowed_path: Path | None = None,
+        subs_path: Path | None = None,
+        *,
+        banned_profiles: Mapping[str, Path] | None = None,
+        sequences: bool = False,
+        include_names: bool = False,
+        profiles: bool = True,
+        skip_regions: Iterable[str] = (),
+    ) -> "Sniper":
+        """
+        Compile rule files. ``banned_profiles`` (name -> banlist) replaces
+        ``banned_path``; otherwise ``[name]`` sections in the banlist become
+        profiles unless ``profiles`` is False, in which case they are merged.
+        """
+        banned: BannedSpec | Dict[str, BannedSpec]
+        if banned_profiles:
+            banned = {name: parse_banned_file(Path(p)) for name, p in banned_profiles.items()}
+        elif profiles:
+            specs = parse_banned_profiles(Path(banned_path))
+            banned = specs[DEFAULT_PROFILE] if list(specs) == [DEFAULT_PROFILE] else specs
+        else:
+            banned = parse_banned_file(Path(banned_path))
+        allowed = load_allowed(allowed_path)
+        subs = SubstitutionMap.load(Path(subs_path)) if subs_path is not None else None
+        return cls(
+            banned,
+            allowed,
+            subs,
+            sequences=sequences,
+            include_names=include_names,
+            skip_regions=skip_regions,
+        )
+
+    # -- matching ------------------------------------------------------------
+
+    def _allowed_spans(self, text: str) -> List[Tuple[int, int]]:
+        if self.allowed is None:
+            return []
+        return self.allowed.spans(text)
+
+    def regions(self) -> RegionTracker | None:
+        """A fresh region tracker for one document, or None if none are skipped."""
+        return RegionTracker(self.skip_regions) if self.skip_regions else None
+
+    def visible_lines(
+        self, lines: Iterable[Tuple[int, str]]
+    ) -> Iterator[Tuple[int, str, List[Tuple[int, int]] | None]]:
+        """
+        Yield (line number, text, spans to skip) for lines of one document,
+        leaving out lines inside skipped regions.
+        """
+        tracker = self.regions()
+        if tracker is None:
+            for ln, text in lines:
+                yield ln, text, None
+            return
+        for ln, text in lines:
+            skip = tracker.feed(text)
+            if skip is not None:
+                yield ln, text, skip
+
+    def _finditer(self, text: str, skip: List[Tuple[int, int]] | None) -> Iterator[re.Match[str]]:
+        if not skip:
+            yield from self.pattern.finditer(text)
+            return
+        # Only search the gaps between skipped spans
+        pos = 0
+        for s, e in skip:
+            if s > pos:
+                yield from self.pattern.finditer(text, pos, s)
+            pos = max(pos, e)
+        yield from self.pattern.finditer(text, pos)
+
+    def match_line(
+        self, text: str, skip: List[Tuple[int, int]] | None = None
+    ) -> Iterator[Tuple[int, str, str | None]]:
+        """
+        Yield (index, matched text, profile) for banned matches on one line,
+        skipping any that start inside an allowed span. ``skip`` spans (from
+        a region tracker) are not searched at all.
+        """
+        allowed_spans = self._allowed_spans(text)
+        groups = self.profile_groups
+        for m in self._finditer(text, skip):
+            idx = m.start()
+            if allowed_spans and any(s <= idx < e for s, e in allowed_spans):
+                continue
+            profile = groups[m.lastgroup] if groups is not None else None  # type: ignore[index]
+            yield idx, m.group(0), profile
+
+    def scan_lines(self, label: str, lines: Iterable[Tuple[int, str]]) -> Iterator[Occurrence]:
+        """Occurrences for (line number, text) pairs, reported under ``label``."""
+        for ln, text, skip in self.visible_lines(lines):
+            for idx, ch, profile in self.match_line(text, skip):
+                yield self._occurrence(label, ln, idx + 1, ch, profile)  # 1-based col
+
+    def _occurrence(
+        self, label: str, line: int, col: int, ch: str, profile: str | None
+    ) -> Occurrence:
+        """Build an occurrence; everything besides the position follows from ``ch``."""
+        codepoints = None
+        if self.sequences:
+            codepoints = tuple(f"U+{ord(c):04X}" for c in ch)
+        return Occurrence(
+            file=label,
+            line=line,
+            col=col,
+            char=ch,
+            codepoint=f"U+{ord(ch[0]):04X}",
+            name=_sequence_name(ch) if self.include_names else None,
+            codepoints=codepoints,
+            length=len(ch),
+            profile=profile,
+        )
+
+    def _clean(self, text: str) -> bool:
+        """Cheap check that ``text`` has no banned match at all."""
+        if self.ascii_safe and text.isascii():
+            return True
+        return self.pattern.search(text) is None
+
+    def scan_text(self, text: str, label: str = "<text>") -> List[Occurrence]:
+        if self._clean(text):
+            return []
+        return list(self.scan_lines(label, enumerate(split_lines(text), start=1)))
+
+    def scan_bytes(
+        self, data: bytes, label: str = "<bytes>", encoding: str = "utf-8"
+    ) -> List[Occurrence]:
+        """Decode (undecodable bytes become U+FFFD) and scan."""
+        return self.scan_text(data.decode(encoding, errors="replace"), label)
+
+    def has_banned(self, text: str) -> bool:
+        """True if ``text`` has any banned match outside allowed spans."""
+        if self._clean(text):
+            return False
+        if self.allowed is None and not self.skip_regions:
+            return True
+        for _, line, skip in self.visible_lines(enumerate(split_lines(text), start=1)):
+            for _ in self.match_line(line, skip):
+                return True
+        return False
+
+    # -- substitution --------------------------------------------------------
+
+    def _plan(
+        self, text: str, skip: List[Tuple[int, int]] | None
+    ) -> Tuple[List[re.Match[str]], List[Tuple[int, int, str]], List[Tuple[int, int]], int]:
+        """
+        Banned matches, resolved edits (start, end, replacement), spans left
+        alone (allowed and ``skip``) and rule evaluations skipped for one line.
+        """
+        if self.subs is None:
+            raise ValueError("Sniper was built without a substitution map")
+        matches = list(self.pattern.finditer(text))
+        if not matches:
+            return matches, [], [], len(self.regex_rules)
+        starts = [m.start() for m in matches]
+        ends = [m.end() for m in matches]
+
+        allowed_spans = self._allowed_spans(text)
+        if skip:
+            allowed_spans = allowed_spans + skip
+
+        def covers_banned(s: int, e: int) -> bool:
+            # At least one banned match overlaps the edit, and every one that
+            # does lies wholly inside it, so no part of a sequence (say a skin
+            # tone modifier after a mapped base emoji) is left behind
+            i = bisect_right(ends, s)
+            j = bisect_left(starts, e)
+            return i < j and starts[i] >= s and ends[j - 1] <= e
+
+        edits: List[Tuple[int, int, str]] = []  # (start, end, replacement)
+
+        # Apply regex rules first (if they include banned content), running only
+        # those whose trigger characters occur on this line
+        selected = self.rule_prefilter.select(c for m in matches for c in m.group(0))
+        skipped = len(self.regex_rules) - len(selected)
+        for ri in selected:
+            rx, rep = self.regex_rules[ri]
+            for m in rx.finditer(text):
+                span = (m.start(), m.end())
+                if _overlaps_allowed(span, allowed_spans):
+                    continue
+                if not covers_banned(*span):
+                    continue
+                edits.append((span[0], span[1], rep))
+
+        # Then literal keys (longest match, possibly multi-code-point)
+        for s, e, rep in self.subs.trie.finditer(text):
+            if not covers_banned(s, e) or _overlaps_allowed((s, e), allowed_spans):
+                continue
+            edits.append((s, e, rep))
+
+        # Resolve overlapping edits by keeping the first occurrence of a region
+        # Prefer longer spans at the same start so regex rules win over shorter keys
+        edits.sort(key=lambda t: (t[0], -(t[1] - t[0])))
+        resolved: List[Tuple[int, int, str]] = []
+        last_end = -1
+        for s, e, rep in edits:
+            if s < last_end:
+                # overlaps previous edit; skip to avoid conflicts
+                continue
+            resolved.append((s, e, rep))
+            last_end = e
+        return matches, resolved, allowed_spans, skipped
+
+    @staticmethod
+    def _hit_status(
+        matches: List[re.Match[str]],
+        resolved: List[Tuple[int, int, str]],
+        allowed_spans: List[Tuple[int, int]],
+    ) -> Iterator[Tuple[re.Match[str], bool]]:
+        """
+        (match, replaced) for banned matches outside allowed spans. A match
+        counts as replaced only when one edit covers all of it; anything the
+        edits leave behind is reported as not replaced.
+        """
+        j = 0
+        for m in matches:
+            idx = m.start()
+            while j < len(resolved) and resolved[j][1] <= idx:
+                j += 1
+            if j < len(resolved) and resolved[j][0] <= idx and resolved[j][1] >= m.end():
+                yield m, True
+            elif not _overlaps_allowed((idx, idx + 1), allowed_spans):
+                yield m, False
+
+    @staticmethod
+    def _splice(text: str, resolved: List[Tuple[int, int, str]]) -> str:
+        parts: List[str] = []
+        pos = 0
+        for s, e, rep in resolved:
+            parts.append(text[pos:s])
+            parts.append(rep)
+            pos = e
+        parts.append(text[pos:])
+        return "".join(parts)
+
+    def substitute_line(
+        self, text: str, skip: List[Tuple[int, int]] | None = None
+    ) -> Tuple[str, int, int, int]:
+        """
+        Apply regex rules and literal map keys to one line. ``skip`` spans are
+        left untouched, like allowed spans.
+
+        Returns (new_text, replacements, unmapped_banned, rule_evals_skipped).
+        """
+        matches, resolved, allowed_spans, skipped = self._plan(text, skip)
+        if not matches:
+            return text, 0, 0, skipped
+        # Banned code points outside allowed spans that no edit covers
+        unmapped = sum(
+            1 for _, covered in self._hit_status(matches, resolved, allowed_spans) if not covered
+        )
+        if not resolved:
+            return text, 0, unmapped, skipped
+        return self._splice(text, resolved), len(resolved), unmapped, skipped
+
+    def fix_line(
+        self, text: str, skip: List[Tuple[int, int]] | None = None
+    ) -> Tuple[str, List[Tuple[int, str, str | None, bool]], int, int]:
+        """
+        ``substitute_line`` that also reports what it found, from the same
+        matches: (new_text, hits, replacements, rule_evals_skipped), where each
+        hit is (index, matched text, profile, replaced). Hits not replaced are
+        exactly the ones counted as unmapped.
+        """
+        matches, resolved, allowed_spans, skipped = self._plan(text, skip)
+        if not matches:
+            return text, [], 0, skipped
+        groups = self.profile_groups
+        hits = [
+            (
+                m.start(),
+                m.group(0),
+                groups[m.lastgroup] if groups is not None else None,  # type: ignore[index]
+                covered,
+            )
+            for m, covered in self._hit_status(matches, resolved, allowed_spans)
+        ]
+        if not resolved:
+            return text, hits, 0, skipped
+        return self._splice(text, resolved), hits, len(resolved), skipped
+
+    def substitute_text(self, text: str) -> str:
+        """Substitute line by line; line endings are kept as they were."""
+        if self.subs is None:
+            raise ValueError("Sniper was built without a substitution map")
+        if self._clean(text):
+            return text
+        parts = _NEWLINE_RE.split(text)
+        seps = _NEWLINE_RE.findall(text)
+        tracker = self.regions()
+        out: List[str] = []
+        for i, line in enumerate(parts):
+            skip = tracker.feed(line) if tracker is not None else None
+            if tracker is not None and skip is None:
+                out.append(line)
+            else:
+                out.append(self.substitute_line(line, skip)[0])
+            if i < len(seps):
+                out.append(seps[i])
+        return "".join(out)
+
+    # -- batches -------------------------------------------------------------
+    #
+    # Attribute lookups are hoisted out of the loop and clean inputs (pure
+    # ASCII, or no regex hit) never reach the line splitter, so a batch of
+    # mostly clean strings costs little more than one search per string.
+
+    def scan_texts(self, texts: Iterable[str], label: str = "<text>") -> List[List[Occurrence]]:
+        """``scan_text`` for each input; labels are ``label[i]``."""
+        clean, scan = self._clean, self.scan_text
+        return [[] if clean(t) else scan(t, f"{label}[{i}]") for i, t in enumerate(texts)]
+
+    def has_banned_batch(self, texts: Iterable[str]) -> List[bool]:
+        clean = self._clean
+        if self.allowed is None and not self.skip_regions:
+            return [not clean(t) for t in texts]
+        check = self.has_banned
+        return [check(t) for t in texts]
+
+    def substitute_texts(self, texts: Iterable[str]) -> List[str]:
+        clean, sub = self._clean, self.substitute_text
+        return [t if clean(t) else sub(t) for t in texts]
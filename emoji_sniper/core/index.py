@@ -0,0 +1,229 @@
+"""
+Persistent inverted index from banned code point to files and positions.
+
+The index is a SQLite database (stdlib, no extra dependency):
+
+- ``files``: one row per indexed file with its size and mtime at index time
+- ``postings``: (codepoint, file_id, line, col), clustered by code point so a
+  code point, range or block lookup is a single index range scan
+- ``meta``: vault root and a hash of the rule files the index was built with
+
+``update`` only re-reads files whose size or mtime changed, drops postings for
+files that disappeared, and rebuilds from scratch when the rules changed.
+Queries never touch the vault files.
+"""
+from __future__ import annotations
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+import hashlib
+import logging
+import sqlite3
+
+from .core import Occurrence, SniperScanner
+from .unicode_blocks import BLOCKS
+
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = "1"
+
+
+def _loose(name: str) -> str:
+    # UAX #44 loose matching: ignore case, whitespace, hyphens and underscores
+    return "".join(c for c in name.lower() if c not in " \t-_")
+
+
+_BLOCK_STARTS = [lo for lo, _, _ in BLOCKS]
+_BLOCK_BY_NAME = {_loose(name): (lo, hi) for lo, hi, name in BLOCKS}
+
+
+def block_range(name: str) -> Tuple[int, int]:
+    """Look up a Unicode block by name, e.g. 'Latin-1 Supplement' or 'latin_1_supplement'."""
+    try:
+        return _BLOCK_BY_NAME[_loose(name)]
+    except KeyError:
+        raise ValueError(f"Unknown Unicode block: {name!r}") from None
+
+
+def block_of(cp: int) -> str | None:
+    """Name of the Unicode block containing ``cp``, if any."""
+    i = bisect_right(_BLOCK_STARTS, cp) - 1
+    if i >= 0 and cp <= BLOCKS[i][1]:
+        return BLOCKS[i][2]
+    return None
+
+
+def parse_codepoint(text: str) -> int:
+    """Parse 'U+1F680', '1F680', '0x1F680' or a single character."""
+    s = text.strip()
+    if len(s) == 1:
+        return ord(s)
+    for prefix in ("U+", "u+", "0x", "0X"):
+        if s.startswith(prefix):
+            s = s[len(prefix) :]
+            break
+    return int(s, 16)
+
+
+def rules_hash(paths: Iterable[Path | None]) -> str:
+    h = hashlib.sha256(SCHEMA_VERSION.encode("ascii"))
+    for p in paths:
+        h.update(b"\0")
+        if p is not None and Path(p).exists():
+            h.update(Path(p).read_bytes())
+    return h.hexdigest()
+
+
+@dataclass
+class IndexStats:
+    files_indexed: int
+    files_unchanged: int
+    files_removed: int
+    postings: int
+    errors: int
+    rebuilt: bool
+
+
+class CodepointIndex:
+    def __init__(self, db_path: Path) -> None:
+        self.db_path = Path(db_path)
+        self.db = sqlite3.connect(self.db_path)
+        self.db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS files (
+                id INTEGER PRIMARY KEY,
+                path TEXT UNIQUE NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS postings (
+                cp INTEGER NOT NULL,
+                file_id INTEGER NOT NULL,
+                line INTEGER NOT NULL,
+                col INTEGER NOT NULL,
+                PRIMARY KEY (cp, file_id, line, col)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS postings_file ON postings (file_id);
+            """
+        )
+
+    def close(self) -> None:
+        self.db.close()
+
+    def _meta(self, key: str) -> str | None:
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _clear(self) -> None:
+        self.db.execute("DELETE FROM postings")
+        self.db.execute("DELETE FROM files")
+
+    def update(self, scanner: SniperScanner, rebuild: bool = False) -> IndexStats:
+        """
+        Bring the index in line with the vault; only changed files are read.
+
+        A full rebuild happens when ``rebuild`` is set or when the vault root or
+        rule files differ from those the index was built with.
+        """
+        root = str(scanner.vault_path.resolve())
+        rhash = rules_hash([scanner.banned_path, scanner.allowed_path])
+        if self._meta("root") != root or self._meta("rules") != rhash:
+            rebuild = True
+
+        stats = IndexStats(0, 0, 0, 0, 0, rebuild)
+        with self.db:
+            if rebuild:
+                self._clear()
+            self.db.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                [("root", root), ("rules", rhash), ("schema", SCHEMA_VERSION)],
+            )
+
+            known: Dict[str, Tuple[int, int, int]] = {
+                path: (fid, size, mtime)
+                for fid, path, size, mtime in self.db.execute(
+                    "SELECT id, path, size, mtime_ns FROM files"
+                )
+            }
+            seen = set()
+            for fp in scanner.discover():
+                path = str(fp)
+                seen.add(path)
+                try:
+                    st = fp.stat()
+                    prev = known.get(path)
+                    if prev is not None and prev[1:] == (st.st_size, st.st_mtime_ns):
+                        stats.files_unchanged += 1
+                        continue
+                    if prev is not None:
+                        self.db.execute("DELETE FROM postings WHERE file_id = ?", (prev[0],))
+                        self.db.execute(
+                            "UPDATE files SET size = ?, mtime_ns = ? WHERE id = ?",
+                            (st.st_size, st.st_mtime_ns, prev[0]),
+                        )
+                        fid = prev[0]
+                    else:
+                        cur = self.db.execute(
+                            "INSERT INTO files (path, size, mtime_ns) VALUES (?, ?, ?)",
+                            (path, st.st_size, st.st_mtime_ns),
+                        )
+                        fid = cur.lastrowid
+                    rows = [
+                        (ord(c), fid, ln, idx + 1 + k)
+                        for ln, text in scanner._iter_file_lines(fp)
+                        for idx, match, _ in scanner.match_line(text)
+                        for k, c in enumerate(match)
+                    ]
+                    self.db.executemany(
+                        "INSERT OR IGNORE INTO postings (cp, file_id, line, col)"
+                        " VALUES (?, ?, ?, ?)",
+                        rows,
+                    )
+                    stats.files_indexed += 1
+                    stats.postings += len(rows)
+                except Exception as e:
+                    logger.debug("Error indexing %s: %s", fp, e)
+                    stats.errors += 1
+
+            for path, (fid, _, _) in known.items():
+                if path not in seen:
+                    self.db.execute("DELETE FROM postings WHERE file_id = ?", (fid,))
+                    self.db.execute("DELETE FROM files WHERE id = ?", (fid,))
+                    stats.files_removed += 1
+        return stats
+
+    def query(self, lo: int, hi: int | None = None) -> List[Occurrence]:
+        """Occurrences of code points in [lo, hi], ordered like a scan."""
+        hi = lo if hi is None else hi
+        rows = self.db.execute(
+            """
+            SELECT f.path, p.line, p.col, p.cp
+            FROM postings p JOIN files f ON f.id = p.file_id
+            WHERE p.cp BETWEEN ? AND ?
+            """,
+            (lo, hi),
+        ).fetchall()
+        rows.sort(key=lambda r: (Path(r[0]), r[1], r[2]))
+        return [
+            Occurrence(
+                file=path, line=line, col=col, char=chr(cp), codepoint=f"U+{cp:04X}", name=None
+            )
+            for path, line, col, cp in rows
+        ]
+
+    def query_files(self, lo: int, hi: int | None = None) -> List[str]:
+        """Distinct files containing any code point in [lo, hi]."""
+        hi = lo if hi is None else hi
+        rows = self.db.execute(
+            """
+            SELECT DISTINCT f.path
+            FROM postings p JOIN files f ON f.id = p.file_id
+            WHERE p.cp BETWEEN ? AND ?
+            """,
+            (lo, hi),
+        ).fetchall()
+        return sorted((r[0] for r in rows), key=Path)
@@ -0,0 +1,208 @@
+"""
+Merge shard reports written by `scan --shard K/N --report` into one report.
+
+Each shard report lists results in discovery order (sorted paths, then line
+and column), so the combined results are produced with a k-way merge and
+written out incrementally, in the same order a single-node run would give.
+
+Shard reports are never loaded whole: the ``files`` and ``results`` arrays
+are decoded one element at a time from a small read buffer, so memory is
+bounded by one buffer and one pending element per shard, not by the size of
+the shards.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, List, TextIO
+import heapq
+import json
+
+# Characters read from a shard report at a time
+READ_CHUNK = 64 * 1024
+
+_decoder = json.JSONDecoder()
+
+
+class _JsonStream:
+    """Just enough of an incremental JSON reader to walk a top-level object."""
+
+    def __init__(self, f: IO[str]) -> None:
+        self.f = f
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        data = self.f.read(READ_CHUNK)
+        if not data:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos :] + data
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character without consuming it ("" at the end)."""
+        while True:
+            n = len(self.buf)
+            while self.pos < n and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < n or not self._fill():
+                return self.buf[self.pos : self.pos + 1]
+
+    def expect(self, ch: str) -> None:
+        if self.peek() != ch:
+            raise ValueError(f"Malformed report: expected {ch!r} at {self.peek()!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode one complete value, reading more as needed."""
+        self.peek()
+        while True:
+            try:
+                obj, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number could continue in the next chunk
+            if end == len(self.buf) and self._fill():
+                continue
+            self.pos = end
+            return obj
+
+    def elements(self) -> Iterator[Any]:
+        """Decode an array element by element."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() == ",":
+                self.pos += 1
+                continue
+            self.expect("]")
+            return
+
+    def members(self) -> Iterator[str]:
+        """
+        Keys of a top-level object. After each key, the caller must consume
+        its value (``value``, or ``elements`` for arrays) before resuming.
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self.peek() == ",":
+                self.pos += 1
+                continue
+            self.expect("}")
+            return
+
+    def skip(self) -> None:
+        """Consume a value; arrays go element by element."""
+        if self.peek() == "[":
+            for _ in self.elements():
+                pass
+        else:
+            self.value()
+
+
+def _read_stats(path: Path) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        stream = _JsonStream(f)
+        for key in stream.members():
+            if key == "stats":
+                return stream.value()
+            stream.skip()
+    return {}
+
+
+def _has_array(path: Path, name: str) -> bool:
+    with open(path, "r", encoding="utf-8") as f:
+        stream = _JsonStream(f)
+        for key in stream.members():
+            if key == name:
+                return True
+            stream.skip()
+    return False
+
+
+def _iter_array(path: Path, name: str) -> Iterator[Dict[str, Any]]:
+    """Elements of the top-level array ``name`` in the report at ``path``."""
+    with open(path, "r", encoding="utf-8") as f:
+        stream = _JsonStream(f)
+        for key in stream.members():
+            if key == name:
+                yield from stream.elements()
+                return
+            stream.skip()
+
+
+def _result_key(r: Dict[str, Any]):
+    return (Path(r["file"]), r["line"], r["col"])
+
+
+def _file_key(m: Dict[str, Any]):
+    return Path(m["file"])
+
+
+def merge_stats(stats_list: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Sum integer stats (recursing into nested counters such as per-profile
+    counts), OR boolean flags; keep other values from the first report that
+    has them.
+    """
+    merged: Dict[str, Any] = {}
+    for stats in stats_list:
+        for key, value in stats.items():
+            if key == "shard":
+                continue
+            if isinstance(value, bool):
+                # Flags such as "truncated" hold if any shard set them
+                merged[key] = merged.get(key, False) or value
+            elif isinstance(value, int):
+                merged[key] = merged.get(key, 0) + value
+            elif isinstance(value, dict):
+                merged[key] = merge_stats([merged.get(key, {}), value])
+            else:
+                merged.setdefault(key, value)
+    return merged
+
+
+def _write_array(out: TextIO, name: str, items: Iterator[Dict[str, Any]], last: bool) -> None:
+    out.write(f'  "{name}": [')
+    first = True
+    for item in items:
+        out.write("\n    " if first else ",\n    ")
+        out.write(json.dumps(item, ensure_ascii=False))
+        first = False
+    out.write("\n  ]" if not first else "]")
+    out.write("\n" if last else ",\n")
+
+
+def merge_reports(paths: List[Path], out: TextIO) -> Dict[str, Any]:
+    """
+    Merge shard reports at ``paths`` and write the combined JSON to ``out``.
+
+    Returns the merged stats.
+    """
+    # Stats lead each report, so reading them touches only the first chunk
+    stats = merge_stats(_read_stats(p) for p in paths)
+    has_files = any(_has_array(p, "files") for p in paths)
+
+    out.write("{\n")
+    out.write(f'  "stats": {json.dumps(stats, ensure_ascii=False)},\n')
+    if has_files:
+        files = heapq.merge(*(_iter_array(p, "files") for p in paths), key=_file_key)
+        _write_array(out, "files", files, last=False)
+    results = heapq.merge(*(_iter_array(p, "results") for p in paths), key=_result_key)
+    _write_array(out, "results", results, last=True)
+    out.write("}\n")
+    return stats
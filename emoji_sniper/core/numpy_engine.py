@@ -0,0 +1,136 @@
+"""
+Optional NumPy engine: classify every code point of a file at once.
+
+Files are read in newline-aligned chunks of ``CHUNK_BYTES``, decoded and
+viewed as a UTF-32 ``uint32`` array. A lookup table indexed by code point
+(0 = allowed, k = banned by profile k) classifies the whole chunk in one
+vectorized gather; ``np.flatnonzero`` gives hit offsets and a
+``searchsorted`` over newline offsets turns them into line/column pairs.
+Allowlist spans are applied afterwards, only on lines that have hits.
+
+Only single code point matching is supported; whole-sequence matching and
+region skipping need the regex engine. Results are identical to the regex
+engine's for the same rules.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterator, List
+import re
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None  # type: ignore[assignment]
+
+from .engine import Occurrence, Sniper, _char_name
+
+
+CHUNK_BYTES = 16 * 1024 * 1024
+
+_CR_RE = re.compile(r"\r\n?")
+
+
+def available() -> bool:
+    return np is not None
+
+
+class NumpyEngine:
+    """Vectorized scanner built from a Sniper's banned specs and allowlist."""
+
+    def __init__(self, sniper: Sniper) -> None:
+        if np is None:
+            raise ValueError("The numpy engine needs NumPy (pip install emoji-sniper[numpy])")
+        if sniper.sequences or sniper.skip_regions:
+            raise ValueError(
+                "The numpy engine matches single code points only; "
+                "--sequences and --skip-regions need the regex engine"
+            )
+        self.sniper = sniper
+        self.profiles: List[str | None] = (
+            list(sniper.profiles) if sniper.profile_groups is not None else [None]
+        )
+        # Later assignments win, so fill profiles in reverse: like the regex
+        # alternation, the earliest profile that bans a code point owns it
+        table = np.zeros(0x110000, dtype=np.uint8)
+        specs = sniper.banned_specs
+        for i in range(len(specs) - 1, -1, -1):
+            spec = specs[i]
+            for lo, hi in spec.ranges:
+                table[lo : hi + 1] = i + 1
+            for lit in spec.literals:
+                for ch in lit:
+                    table[ord(ch)] = i + 1
+        # Lines never include their terminator
+        table[0x0A] = table[0x0D] = 0
+        self.table = table
+
+    def scan_file(self, path: Path, label: str | None = None) -> Iterator[Occurrence]:
+        label = str(path) if label is None else label
+        line_base = 0
+        with open(path, "rb") as f:
+            carry = b""
+            while True:
+                block = f.read(CHUNK_BYTES)
+                data = carry + block
+                if block:
+                    # Cut after the last newline so no line (or code point) is split
+                    cut = data.rfind(b"\n") + 1
+                    if cut == 0:
+                        carry = data
+                        continue
+                    data, carry = data[:cut], data[cut:]
+                if data:
+                    text = data.decode("utf-8", errors="replace")
+                    line_base = yield from self.scan_chunk(text, label, line_base)
+                if not block:
+                    return
+
+    def scan_chunk(self, text: str, label: str, line_base: int = 0) -> Iterator[Occurrence]:
+        """
+        Yield occurrences in ``text`` (whole lines), numbering lines after
+        ``line_base``. Returns the line count after this chunk.
+        """
+        if "\r" in text:
+            # Universal newlines, as in text-mode reads
+            text = _CR_RE.sub("\n", text)
+        cps = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+        newlines = np.flatnonzero(cps == 0x0A)
+        n_lines = len(newlines) + (0 if text.endswith("\n") or not text else 1)
+
+        classes = self.table[cps]
+        hits = np.flatnonzero(classes)
+        if not hits.size:
+            return line_base + n_lines
+
+        line_idx = np.searchsorted(newlines, hits)
+        line_starts = np.concatenate(([0], newlines + 1))
+        cols = hits - line_starts[line_idx]
+
+        allowed = self.sniper.allowed
+        spans_cache: dict = {}
+        include_names = self.sniper.include_names
+        profiles = self.profiles
+        for h, li, col, k in zip(
+            hits.tolist(), line_idx.tolist(), cols.tolist(), classes[hits].tolist(), strict=True
+        ):
+            if allowed is not None:
+                spans = spans_cache.get(li)
+                if spans is None:
+                    start = h - col
+                    end = text.find("\n", start)
+                    spans = allowed.spans(text[start : end if end >= 0 else len(text)])
+                    spans_cache[li] = spans
+                if any(s <= col < e for s, e in spans):
+                    continue
+            ch = text[h]
+            yield Occurrence(
+                file=label,
+                line=line_base + li + 1,
+                col=col + 1,
+                char=ch,
+                codepoint=f"U+{ord(ch):04X}",
+                name=_char_name(ch) if include_names else None,
+                profile=profiles[k - 1],
+            )
+        return line_base + n_lines
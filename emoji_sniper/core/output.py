@@ -1,13 +1,22 @@
 from __future__ import annotations
 
-from typing import Dict, List
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Sequence, TextIO, Tuple
+import json
 
-from .core import Occurrence
+if TYPE_CHECKING:
+    from .engine import Occurrence
+    from .records import RecordOccurrence
 
 
-def format_results_as_json(results: List[Occurrence], stats: Dict[str, int | str]):
+def format_results_as_json(
+    results: List[Occurrence],
+    stats: Dict[str, int | str],
+    files: Sequence[Dict[str, int | str]] | None = None,
+):
     return {
         "stats": stats,
+        **({"files": list(files)} if files is not None else {}),
         "results": [
             {
                 "file": r.file,
@@ -16,6 +25,13 @@ def format_results_as_json(results: List[Occurrence], stats: Dict[str, int | str
                 "char": r.char,
                 "codepoint": r.codepoint,
                 **({"name": r.name} if r.name is not None else {}),
+                **({"profile": r.profile} if r.profile is not None else {}),
+                **({"fix": r.fix} if r.fix is not None else {}),
+                **(
+                    {"codepoints": list(r.codepoints), "length": r.length}
+                    if r.codepoints is not None
+                    else {}
+                ),
             }
             for r in results
         ],
@@ -27,16 +43,203 @@ def format_results_as_text(results: List[Occurrence]) -> str:
         return "No banned characters found."
     lines = []
     for r in results:
-        base = f"{r.file}:{r.line}:{r.col} {r.codepoint} '{r.char}'"
+        cps = " ".join(r.codepoints) if r.codepoints else r.codepoint
+        base = f"{r.file}:{r.line}:{r.col} {cps} '{r.char}'"
+        if r.profile:
+            base += f" [{r.profile}]"
         if r.name:
             base += f" {r.name}"
+        if r.fix:
+            base += f" ({r.fix})"
         lines.append(base)
     return "\n".join(lines)
 
 
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+TOOL_NAME = "emoji-sniper"
+
+
+def _rule_id(r: Occurrence) -> str:
+    """One rule per distinct code point (or sequence, with --sequences)."""
+    return "-".join(r.codepoints) if r.codepoints else r.codepoint
+
+
+def _rule(r: Occurrence, rule_id: str) -> Dict[str, Any]:
+    from .engine import _sequence_name
+    from .index import block_of
+
+    name = _sequence_name(r.char)
+    props: Dict[str, Any] = {"char": r.char, "name": name}
+    block = block_of(ord(r.char[0]))
+    if block is not None:
+        props["block"] = block
+    if r.codepoints is not None:
+        props["codepoints"] = list(r.codepoints)
+    return {
+        "id": rule_id,
+        "shortDescription": {"text": f"Banned character {rule_id} ({name})"},
+        "properties": props,
+    }
+
+
+def _artifact_uri(label: str, root: Path | None) -> Tuple[str, bool]:
+    """(URI, relative to the scan root) for a result's file label."""
+    from urllib.parse import quote
+
+    path = Path(label.partition("!/")[0])
+    if root is not None:
+        try:
+            rel = path.resolve().relative_to(root)
+        except ValueError:
+            pass
+        else:
+            return quote(rel.as_posix() + label[len(str(path)) :], safe="/!"), True
+    return quote(label.replace("\\", "/"), safe="/!:"), False
+
+
+def write_sarif(
+    results: Iterable[Occurrence],
+    out: TextIO,
+    root: Path | None = None,
+    stats: Callable[[], Dict[str, Any]] | None = None,
+) -> None:
+    """
+    Stream results as a SARIF 2.1.0 log, one result per line as they arrive.
+
+    Rule metadata (code point, name, Unicode block) is collected once per
+    distinct rule and written after the results, along with the file table,
+    so memory grows with distinct characters and files, not hits. Paths under
+    ``root`` are written relative to it (uriBaseId ``SRCROOT``). ``stats`` is
+    called once the results are exhausted and stored on the invocation.
+    """
+    rules: Dict[str, int] = {}
+    rule_list: List[Dict[str, Any]] = []
+    artifacts: Dict[str, int] = {}
+    artifact_list: List[Dict[str, Any]] = []
+    root = Path(root).resolve() if root is not None else None
+
+    out.write(f'{{"$schema": "{SARIF_SCHEMA}", "version": "2.1.0", "runs": [{{\n')
+    out.write('"columnKind": "unicodeCodePoints",\n"results": [')
+    sep = "\n"
+    for r in results:
+        rule_id = _rule_id(r)
+        rule_index = rules.get(rule_id)
+        if rule_index is None:
+            rule_index = rules[rule_id] = len(rule_list)
+            rule_list.append(_rule(r, rule_id))
+        file_index = artifacts.get(r.file)
+        if file_index is None:
+            uri, relative = _artifact_uri(r.file, root)
+            location: Dict[str, str] = {"uri": uri}
+            if relative:
+                location["uriBaseId"] = "SRCROOT"
+            file_index = artifacts[r.file] = len(artifact_list)
+            artifact_list.append({"location": location})
+        # Without endColumn a region runs to the end of the line
+        region = {"startLine": r.line, "startColumn": r.col, "endColumn": r.col + r.length}
+        artifact = {**artifact_list[file_index]["location"], "index": file_index}
+        result: Dict[str, Any] = {
+            "ruleId": rule_id,
+            "ruleIndex": rule_index,
+            "level": "warning",
+            "message": {"text": f"Banned character {rule_id} '{r.char}'"},
+            "locations": [{"physicalLocation": {"artifactLocation": artifact, "region": region}}],
+        }
+        if r.profile is not None:
+            result["properties"] = {"profile": r.profile}
+        out.write(sep + json.dumps(result, ensure_ascii=False))
+        sep = ",\n"
+    out.write("\n],\n")
+
+    run: Dict[str, Any] = {
+        "tool": {"driver": {"name": TOOL_NAME, "rules": rule_list}},
+        "artifacts": artifact_list,
+    }
+    if root is not None:
+        run["originalUriBaseIds"] = {"SRCROOT": {"uri": root.as_uri() + "/"}}
+    invocation: Dict[str, Any] = {"executionSuccessful": True}
+    if stats is not None:
+        invocation["properties"] = stats()
+    run["invocations"] = [invocation]
+    # The rest of the run object, after the streamed "results"
+    out.write(",\n".join(f'"{k}": {json.dumps(v, ensure_ascii=False)}' for k, v in run.items()))
+    out.write("\n}]}\n")
+
+
+def write_checkstyle(results: Iterable[Occurrence], out: TextIO) -> None:
+    """
+    Stream results as checkstyle XML, one <file> element per run of results
+    from the same file (scans yield results file by file). Checkstyle has no
+    rule table, so each error names its rule in ``source`` and keeps the
+    message short instead of repeating the character name.
+    """
+    from xml.sax.saxutils import quoteattr
+
+    out.write('<?xml version="1.0" encoding="UTF-8"?>\n<checkstyle version="4.3">\n')
+    current: str | None = None
+    for r in results:
+        if r.file != current:
+            if current is not None:
+                out.write("  </file>\n")
+            out.write(f"  <file name={quoteattr(r.file)}>\n")
+            current = r.file
+        rule_id = _rule_id(r)
+        message = f"Banned character {rule_id} '{r.char}'"
+        if r.profile is not None:
+            message += f" [{r.profile}]"
+        out.write(
+            f'    <error line="{r.line}" column="{r.col}" severity="warning" '
+            f"message={quoteattr(message)} source={quoteattr(f'{TOOL_NAME}.{rule_id}')}/>\n"
+        )
+    if current is not None:
+        out.write("  </file>\n")
+    out.write("</checkstyle>\n")
+
+
+def record_result_as_dict(r: RecordOccurrence) -> Dict[str, Any]:
+    return {
+        "record": r.record,
+        "field": r.field,
+        "line": r.line,
+        "col": r.col,
+        "char": r.char,
+        "codepoint": r.codepoint,
+        **({"name": r.name} if r.name is not None else {}),
+        **({"profile": r.profile} if r.profile is not None else {}),
+        **(
+            {"codepoints": list(r.codepoints), "length": r.length}
+            if r.codepoints is not None
+            else {}
+        ),
+    }
+
+
+def record_result_as_text(r: RecordOccurrence) -> str:
+    cps = " ".join(r.codepoints) if r.codepoints else r.codepoint
+    base = f"{r.record}[{r.field}]:{r.line}:{r.col} {cps} '{r.char}'"
+    if r.profile:
+        base += f" [{r.profile}]"
+    if r.name:
+        base += f" {r.name}"
+    return base
+
+
 def print_summary(stats: Dict[str, int | str]) -> None:
     print(
         f"Files: {stats.get('files_scanned', 0)} | "
         f"Occurrences: {stats.get('occurrences', 0)} | "
         f"Errors: {stats.get('errors', 0)}"
     )
+    if stats.get("truncated"):
+        print(
+            f"Truncated: {stats.get('files_truncated', 0)} files capped, "
+            f"{stats.get('files_skipped', 0)} files not scanned"
+        )
+    if "cache_hits" in stats:
+        print(
+            f"Cache: {stats['cache_hits']} files ({stats.get('cache_bytes', 0)} bytes) "
+            f"from cache, {stats.get('cache_misses', 0)} scanned"
+        )
+    profiles = stats.get("profiles")
+    if isinstance(profiles, dict):
+        print(" | ".join(f"{name}: {count}" for name, count in profiles.items()))
@@ -0,0 +1,127 @@
+"""
+Scan tabular records (rows of JSONL, CSV or SQLite) with a compiled Sniper.
+
+Records arrive as a stream from ``utils.records`` and are processed in
+batches of ``batch_size``. With ``workers > 0`` batches go to a process pool
+(the Sniper is sent to each worker once); at most two batches per worker are
+in flight, so memory stays bounded no matter how large the source is, and
+results come back in input order.
+"""
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Deque, Dict, Iterable, Iterator, List, Tuple
+
+from ..utils.records import Record, batched
+from .engine import Sniper
+
+
+@dataclass
+class RecordOccurrence:
+    record: str
+    field: str
+    line: int
+    col: int
+    char: str
+    codepoint: str
+    name: str | None
+    codepoints: Tuple[str, ...] | None = None
+    length: int = 1
+    profile: str | None = None
+
+
+def _scan_batch(sniper: Sniper, batch: List[Record]) -> Tuple[List[RecordOccurrence], int]:
+    """Occurrences in one batch, plus the number of fields looked at."""
+    out: List[RecordOccurrence] = []
+    n_fields = 0
+    for rid, fields in batch:
+        for name, text in fields.items():
+            n_fields += 1
+            for o in sniper.scan_text(text):
+                out.append(
+                    RecordOccurrence(
+                        record=rid,
+                        field=name,
+                        line=o.line,
+                        col=o.col,
+                        char=o.char,
+                        codepoint=o.codepoint,
+                        name=o.name,
+                        codepoints=o.codepoints,
+                        length=o.length,
+                        profile=o.profile,
+                    )
+                )
+    return out, n_fields
+
+
+# Set once per worker process by the pool initializer
+_worker_sniper: Sniper | None = None
+
+
+def _init_worker(sniper: Sniper) -> None:
+    global _worker_sniper
+    _worker_sniper = sniper
+
+
+def _scan_batch_in_worker(batch: List[Record]) -> Tuple[List[RecordOccurrence], int]:
+    assert _worker_sniper is not None
+    return _scan_batch(_worker_sniper, batch)
+
+
+class RecordScanner:
+    def __init__(self, sniper: Sniper, batch_size: int = 1000, workers: int = 0) -> None:
+        self.sniper = sniper
+        self.batch_size = batch_size
+        self.workers = workers
+        self.stats: Dict[str, int | Dict[str, int]] = {}
+
+    def _batches(
+        self, records: Iterable[Record]
+    ) -> Iterator[Tuple[List[RecordOccurrence], int, int]]:
+        """Yield (occurrences, records, fields) per batch, in input order."""
+        if self.workers <= 0:
+            for batch in batched(records, self.batch_size):
+                occ, n_fields = _scan_batch(self.sniper, batch)
+                yield occ, len(batch), n_fields
+            return
+
+        with ProcessPoolExecutor(
+            self.workers, initializer=_init_worker, initargs=(self.sniper,)
+        ) as pool:
+            pending: Deque[Tuple[Future, int]] = deque()
+            for batch in batched(records, self.batch_size):
+                pending.append((pool.submit(_scan_batch_in_worker, batch), len(batch)))
+                if len(pending) >= 2 * self.workers:
+                    fut, n = pending.popleft()
+                    occ, n_fields = fut.result()
+                    yield occ, n, n_fields
+            while pending:
+                fut, n = pending.popleft()
+                occ, n_fields = fut.result()
+                yield occ, n, n_fields
+
+    def scan(self, records: Iterable[Record]) -> Iterator[RecordOccurrence]:
+        """
+        Yield occurrences as batches complete. ``stats`` is filled in as the
+        stream is consumed.
+        """
+        per_profile: Dict[str, int] = dict.fromkeys(self.sniper.profiles, 0)
+        stats: Dict[str, int | Dict[str, int]] = {
+            "records_scanned": 0,
+            "fields_scanned": 0,
+            "occurrences": 0,
+        }
+        if self.sniper.profile_groups is not None:
+            stats["profiles"] = per_profile
+        self.stats = stats
+        for occ, n_records, n_fields in self._batches(records):
+            stats["records_scanned"] += n_records  # type: ignore[operator]
+            stats["fields_scanned"] += n_fields  # type: ignore[operator]
+            stats["occurrences"] += len(occ)  # type: ignore[operator]
+            for o in occ:
+                if o.profile is not None:
+                    per_profile[o.profile] += 1
+                yield o
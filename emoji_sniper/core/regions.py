@@ -0,0 +1,107 @@
+"""
+Track Markdown regions that should not be scanned: fenced code blocks, YAML
+front matter and inline code spans.
+
+A ``RegionTracker`` is fed one line at a time, in order, and answers for each
+line either "skip it entirely" (inside front matter or a fence, including the
+delimiter lines) or the spans of inline code to leave out. It keeps a few
+fields of state and looks at each line with at most one anchored regex match
+plus a backtick check, so it costs far less than an allowlist ``re:`` rule run
+over every line.
+
+Simplifications compared with CommonMark: inline code spans never cross a
+line break, and fences inside block quotes or list items are not recognized.
+"""
+from __future__ import annotations
+
+from typing import FrozenSet, Iterable, List, Tuple
+import re
+
+
+REGION_KINDS = ("fences", "frontmatter", "inline-code")
+
+# Up to three spaces of indent, then three or more backticks or tildes
+_FENCE_RE = re.compile(r" {0,3}(`{3,}|~{3,})")
+_TICKS_RE = re.compile(r"`+")
+
+
+def parse_skip_regions(value: str | Iterable[str]) -> FrozenSet[str]:
+    """Parse 'fences,frontmatter,inline-code' (or an iterable of names)."""
+    names = value.split(",") if isinstance(value, str) else value
+    kinds = frozenset(n.strip() for n in names if n.strip())
+    unknown = kinds - set(REGION_KINDS)
+    if unknown:
+        raise ValueError(
+            f"Unknown region(s): {', '.join(sorted(unknown))} "
+            f"(choose from {', '.join(REGION_KINDS)})"
+        )
+    return kinds
+
+
+def inline_code_spans(text: str) -> List[Tuple[int, int]]:
+    """
+    Spans of inline code on one line: a run of N backticks up to the next run
+    of exactly N backticks. An unmatched run is literal text.
+    """
+    runs = [m.span() for m in _TICKS_RE.finditer(text)]
+    spans: List[Tuple[int, int]] = []
+    i = 0
+    while i < len(runs):
+        start, end = runs[i]
+        width = end - start
+        for j in range(i + 1, len(runs)):
+            if runs[j][1] - runs[j][0] == width:
+                spans.append((start, runs[j][1]))
+                i = j
+                break
+        i += 1
+    return spans
+
+
+class RegionTracker:
+    """Per-document state machine; create a fresh one for every file or text."""
+
+    def __init__(self, kinds: FrozenSet[str]) -> None:
+        self.fences = "fences" in kinds
+        self.frontmatter = "frontmatter" in kinds
+        self.inline_code = "inline-code" in kinds
+        self._line = 0
+        self._fence: str | None = None
+        self._in_frontmatter = False
+
+    def feed(self, text: str) -> List[Tuple[int, int]] | None:
+        """
+        Advance past one line. Returns None if the whole line is inside a
+        skipped region, otherwise the (possibly empty) spans to skip.
+        """
+        self._line += 1
+        if self._in_frontmatter:
+            if text.rstrip() in ("---", "..."):
+                self._in_frontmatter = False
+            return None
+        if self.frontmatter and self._line == 1 and text.rstrip() == "---":
+            self._in_frontmatter = True
+            return None
+
+        if self._fence is not None:
+            m = _FENCE_RE.match(text)
+            # A closing fence uses the same character, is at least as long
+            # and has nothing but whitespace after it
+            if (
+                m is not None
+                and m.group(1)[0] == self._fence[0]
+                and len(m.group(1)) >= len(self._fence)
+                and not text[m.end() :].strip()
+            ):
+                self._fence = None
+            return None
+        if self.fences:
+            m = _FENCE_RE.match(text)
+            # Backtick fences cannot have backticks in their info string
+            if m is not None and not (m.group(1)[0] == "`" and "`" in text[m.end() :]):
+                self._fence = m.group(1)
+                return None
+
+        if self.inline_code and "`" in text:
+            return inline_code_spans(text)
+        return []
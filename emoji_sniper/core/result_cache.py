@@ -0,0 +1,138 @@
+"""
+Content-addressed cache of per-file scan results.
+
+Entries are keyed by a hash of the file's bytes under a directory named for
+the rule set (rule file contents, options and skipped regions), so they hold
+for any path, checkout or machine with the same content and rules. That also
+makes a cache directory safe to save and restore between CI jobs, where fresh
+clones defeat anything based on mtimes.
+
+Each entry stores the file's hits relative to the file only, as
+``[line, col, char, profile]``; labels, code points and names are rebuilt on
+the way out. Within a run, identical contents are scanned once even if the
+directory cannot be written. Entries for old rule sets are never read again
+and can be deleted with their directory.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Mapping, Tuple
+import hashlib
+import json
+import logging
+import os
+
+from .engine import Occurrence, Sniper
+
+
+logger = logging.getLogger(__name__)
+
+# Bump when the entry layout changes
+CACHE_FORMAT = 1
+
+RelativeHit = Tuple[int, int, str, str | None]
+
+
+def _update(h: hashlib._Hash, data: bytes) -> None:
+    # Length-prefixed so adjacent fields can never run together
+    h.update(len(data).to_bytes(8, "big"))
+    h.update(data)
+
+
+def _file_bytes(path: Path | None) -> bytes:
+    if path is None:
+        return b"\0none"
+    try:
+        return Path(path).read_bytes()
+    except OSError:
+        return b"\0missing"
+
+
+def rule_key(
+    banned_path: Path,
+    allowed_path: Path | None = None,
+    subs_path: Path | None = None,
+    *,
+    banned_profiles: Mapping[str, Path] | None = None,
+    sequences: bool = False,
+    profiles: bool = True,
+) -> str:
+    """Hex digest identifying a rule set: rule file contents and build options."""
+    h = hashlib.sha256()
+    _update(h, f"{sequences}|{profiles}".encode())
+    if banned_profiles:
+        for name, p in banned_profiles.items():
+            _update(h, name.encode("utf-8"))
+            _update(h, _file_bytes(p))
+    else:
+        _update(h, _file_bytes(banned_path))
+    _update(h, _file_bytes(allowed_path))
+    _update(h, _file_bytes(subs_path))
+    return h.hexdigest()
+
+
+class ResultCache:
+    """Per-file results under ``cache_dir``, for one compiled rule set."""
+
+    def __init__(self, cache_dir: Path, sniper: Sniper, rules: str) -> None:
+        self.sniper = sniper
+        h = hashlib.sha256(f"{CACHE_FORMAT}|{rules}|".encode())
+        h.update(",".join(sorted(sniper.skip_regions)).encode())
+        self.dir = Path(cache_dir) / h.hexdigest()[:32]
+        self._seen: Dict[str, List[RelativeHit]] = {}
+        # Counters for the current scan; see reset()
+        self.hits = 0
+        self.misses = 0
+        self.bytes_served = 0
+
+    def reset(self) -> None:
+        self.hits = self.misses = self.bytes_served = 0
+
+    def _entry(self, digest: str) -> Path:
+        return self.dir / digest[:2] / f"{digest}.json"
+
+    def _load(self, digest: str) -> List[RelativeHit] | None:
+        try:
+            with open(self._entry(digest), "r", encoding="utf-8") as f:
+                return [tuple(hit) for hit in json.load(f)]  # type: ignore[misc]
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.debug("Ignoring unreadable result cache entry %s: %s", digest, e)
+            return None
+
+    def _store(self, digest: str, hits: List[RelativeHit]) -> None:
+        path = self._entry(digest)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(hits, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.debug("Could not write result cache entry %s: %s", path, e)
+
+    def scan_file(
+        self, path: Path, label: str, scan: Callable[[str, str], Iterable[Occurrence]]
+    ) -> List[Occurrence]:
+        """
+        Occurrences for one file, from the cache when its content was seen
+        before, otherwise from ``scan(text, label)`` (then stored).
+        """
+        data = Path(path).read_bytes()
+        digest = hashlib.blake2b(data, digest_size=20).hexdigest()
+        rel = self._seen.get(digest)
+        if rel is None:
+            rel = self._load(digest)
+        if rel is not None:
+            self._seen[digest] = rel
+            self.hits += 1
+            self.bytes_served += len(data)
+            return [self.sniper._occurrence(label, *hit) for hit in rel]
+
+        self.misses += 1
+        found = list(scan(data.decode("utf-8", errors="replace"), label))
+        rel = [(o.line, o.col, o.char, o.profile) for o in found]
+        self._seen[digest] = rel
+        self._store(digest, rel)
+        return found
@@ -1,14 +1,19 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, fields
 from pathlib import Path
-from typing import Dict, Iterable, List, Set, Tuple
+from typing import Deque, Dict, Iterable, Iterator, List, Set, TextIO, Tuple
+import json
 import logging
+import os
 import re
 
-from ..utils.file_discovery import find_files
-from .banned_parser import parse_banned_file, build_regex
-from .allowed_parser import parse_allowed_file, build_allowed_regex
+from ..utils.file_discovery import find_files, select_shard
+from .allowed_parser import AllowedMatcher
+from .diff import unified_diff
+from .engine import Occurrence, Sniper
 from .substitution_map import SubstitutionMap
 
 
@@ -22,6 +27,112 @@ class SubstitutionStats:
     replacements: int
     unmapped_banned: int
     errors: int
+    rule_evals_skipped: int = 0
+    stale_files: int = 0
+
+    def add(self, other: "SubstitutionStats") -> None:
+        for f in fields(self):
+            setattr(self, f.name, getattr(self, f.name) + getattr(other, f.name))
+
+
+def _rewrite_lines(
+    sniper: Sniper,
+    lines: Iterable[str],
+    delta: SubstitutionStats,
+    only_lines: Set[int] | None = None,
+    hits: List[Occurrence] | None = None,
+    label: str = "",
+) -> Iterator[Tuple[str, str]]:
+    """
+    Yield (old, new) for every line of one file, counting into ``delta``.
+
+    When ``only_lines`` is given, other lines are copied through untouched.
+    With ``hits``, every banned match is also appended to it (reported under
+    ``label``, marked replaced or unmapped) from the same matching pass.
+    """
+    # Region state must see every line, even ones that are not rewritten
+    tracker = sniper.regions()
+    for ln, text in enumerate(lines, start=1):
+        skip = tracker.feed(text) if tracker is not None else None
+        if (only_lines is not None and ln not in only_lines) or (
+            tracker is not None and skip is None
+        ):
+            yield text, text
+            continue
+        if hits is None:
+            buf, n_rep, n_unmapped, n_skipped = sniper.substitute_line(text, skip)
+        else:
+            buf, found, n_rep, n_skipped = sniper.fix_line(text, skip)
+            n_unmapped = 0
+            for idx, ch, profile, replaced in found:
+                occ = sniper._occurrence(label, ln, idx + 1, ch, profile)
+                occ.fix = "replaced" if replaced else "unmapped"
+                n_unmapped += not replaced
+                hits.append(occ)
+        delta.unmapped_banned += n_unmapped
+        delta.rule_evals_skipped += n_skipped
+        delta.replacements += n_rep
+        yield text, buf
+
+
+def _split_ending(raw: bytes) -> Tuple[str, str]:
+    if raw.endswith(b"\r\n"):
+        return raw[:-2].decode("utf-8", errors="replace"), "\r\n"
+    if raw.endswith(b"\n"):
+        return raw[:-1].decode("utf-8", errors="replace"), "\n"
+    return raw.decode("utf-8", errors="replace"), ""
+
+
+def _iter_file_diff(
+    sniper: Sniper,
+    fp: Path,
+    label: str,
+    delta: SubstitutionStats,
+    only_lines: Set[int] | None,
+    context: int,
+) -> Iterator[str]:
+    """Diff hunks for one file; ``delta`` is complete once exhausted."""
+    file_delta = SubstitutionStats(0, 0, 0, 0, 0)
+    with open(fp, "rb") as f:
+        # Lines end at b"\n" only, as in git; endings are kept byte for byte
+        endings: Deque[str] = deque()
+
+        def texts() -> Iterator[str]:
+            for raw in iter(f.readline, b""):
+                text, ending = _split_ending(raw)
+                endings.append(ending)
+                yield text
+
+        rewritten = (
+            (old, new, endings.popleft())
+            for old, new in _rewrite_lines(sniper, texts(), file_delta, only_lines)
+        )
+        changed = False
+        for hunk in unified_diff(label, rewritten, context):
+            changed = True
+            yield hunk
+    delta.unmapped_banned += file_delta.unmapped_banned
+    delta.rule_evals_skipped += file_delta.rule_evals_skipped
+    if changed:
+        delta.files_changed += 1
+        delta.replacements += file_delta.replacements
+
+
+# Set once per worker process by the pool initializer
+_worker_sniper: Sniper | None = None
+
+
+def _init_worker(sniper: Sniper) -> None:
+    global _worker_sniper
+    _worker_sniper = sniper
+
+
+def _diff_file_in_worker(
+    fp: Path, label: str, only_lines: Set[int] | None, context: int
+) -> Tuple[str, SubstitutionStats]:
+    assert _worker_sniper is not None
+    delta = SubstitutionStats(0, 0, 0, 0, 0)
+    return "".join(_iter_file_diff(_worker_sniper, fp, label, delta, only_lines, context)), delta
 
 
 class Substitutor:
@@ -33,134 +144,289 @@ class Substitutor:
         allowed_path: Path | None = None,
         exclude_patterns: Set[str] | None = None,
         extensions: Set[str] | None = None,
+        shard: Tuple[int, int] | None = None,
+        respect_ignore: bool = False,
+        sequences: bool = False,
+        skip_regions: Iterable[str] = (),
+        include_names: bool = False,
     ) -> None:
         self.vault_path = Path(vault_path)
         self.banned_path = Path(banned_path)
         self.allowed_path = Path(allowed_path) if allowed_path is not None else None
         self.exclude_patterns = exclude_patterns or set()
         self.extensions = extensions or {".md", ".txt"}
+        self.shard = shard
+        self.respect_ignore = respect_ignore
+        self.sequences = sequences
+        # Size/mtime of files with hits after the last fix(), for its report
+        self.file_meta: List[Dict[str, int | str]] = []
 
-        bspec = parse_banned_file(self.banned_path)
-        self.banned_pattern: re.Pattern[str] = build_regex(bspec)
-
-        self.allowed_pattern: re.Pattern[str] | None = None
-        if self.allowed_path and self.allowed_path.exists():
-            aspec = parse_allowed_file(self.allowed_path)
-            self.allowed_pattern = build_allowed_regex(aspec)
-
-        self.subs = SubstitutionMap.load(Path(subs_path))
-        self.regex_rules = self.subs.compiled_regex_rules()
-
-    def _iter_file_lines(self, path: Path) -> Iterable[Tuple[int, str]]:
-        with open(path, "r", encoding="utf-8", errors="replace") as f:
-            for i, line in enumerate(f, start=1):
-                yield i, line.rstrip("\n")
-
-    @staticmethod
-    def _overlaps_allowed(span: Tuple[int, int], allowed_spans: List[Tuple[int, int]]) -> bool:
-        s, e = span
-        for as_, ae in allowed_spans:
-            if not (e <= as_ or s >= ae):
-                return True
-        return False
-
-    def run(self, dry_run: bool = True) -> SubstitutionStats:
-        files = find_files(self.vault_path, self.extensions, self.exclude_patterns)
-        files_scanned = 0
-        files_changed = 0
-        total_replacements = 0
-        unmapped_banned = 0
-        errors = 0
+        # Profiles are merged: substitution does not care which profile a hit
+        # belongs to. In sequence mode each banned "hit" is a whole emoji
+        # sequence, so map keys can target sequences and unmapped counts are
+        # per sequence
+        self.sniper = Sniper.from_files(
+            self.banned_path,
+            self.allowed_path,
+            Path(subs_path),
+            sequences=sequences,
+            profiles=False,
+            include_names=include_names,
+            skip_regions=skip_regions,
+        )
+        self.banned_pattern: re.Pattern[str] = self.sniper.pattern
+        self.allowed: AllowedMatcher | None = self.sniper.allowed
+        self.subs: SubstitutionMap = self.sniper.subs  # type: ignore[assignment]
+        self.regex_rules = self.sniper.regex_rules
+        self.rule_prefilter = self.sniper.rule_prefilter
 
-        for fp in files:
-            files_scanned += 1
+    def _read_lines(self, path: Path) -> Iterator[Tuple[str, str]]:
+        """(text, ending) per line, split and decoded exactly as for ``--diff``."""
+        with open(path, "rb") as f:
+            for raw in f:
+                yield _split_ending(raw)
+
+    def _substitute_line(
+        self, text: str, skip: List[Tuple[int, int]] | None = None
+    ) -> Tuple[str, int, int, int]:
+        """See ``Sniper.substitute_line``."""
+        return self.sniper.substitute_line(text, skip)
+
+    def _process_file(
+        self,
+        fp: Path,
+        stats: SubstitutionStats,
+        dry_run: bool,
+        only_lines: Set[int] | None = None,
+        hits: List[Occurrence] | None = None,
+    ) -> None:
+        """
+        Substitute within one file, accumulating into ``stats``.
+
+        When ``only_lines`` is given, other lines are copied through untouched.
+        With ``hits``, the file's banned matches are collected into it as well.
+        """
+        changed = False
+        delta = SubstitutionStats(0, 0, 0, 0, 0)
+
+        # Each line keeps its own ending (CRLF, LF or none at EOF), so the
+        # written file is byte for byte what the --diff preview shows
+        endings: Deque[str] = deque()
+
+        def texts() -> Iterator[str]:
+            for text, ending in self._read_lines(fp):
+                endings.append(ending)
+                yield text
+
+        new_lines: List[str] = []
+        rewritten = _rewrite_lines(self.sniper, texts(), delta, only_lines, hits, str(fp))
+        for text, buf in rewritten:
+            if buf != text:
+                changed = True
+            new_lines.append(buf + endings.popleft())
+
+        stats.unmapped_banned += delta.unmapped_banned
+        stats.rule_evals_skipped += delta.rule_evals_skipped
+        if changed and not dry_run:
+            Path(fp).write_text("".join(new_lines), encoding="utf-8", newline="")
+        if changed:
+            # Dry run still counts replacements but does not write
+            stats.files_changed += 1
+            stats.replacements += delta.replacements
+
+    def _diff_label(self, fp: Path) -> str:
+        """Patch path: relative to the working directory (the usual place to
+        run ``git apply``), else to the vault root."""
+        for base in (Path.cwd(), self.vault_path if self.vault_path.is_dir() else None):
+            if base is None:
+                continue
             try:
-                lines = [text for _, text in self._iter_file_lines(fp)]
-                changed = False
-                file_replacements = 0
-
-                new_lines: List[str] = []
-                for text in lines:
-                    allowed_spans: List[Tuple[int, int]] = []
-                    if self.allowed_pattern is not None:
-                        for m in self.allowed_pattern.finditer(text):
-                            allowed_spans.append((m.start(), m.end()))
-
-                    edits: List[Tuple[int, int, str]] = []  # (start, end, replacement)
-
-                    # Apply regex rules first (if they include banned content)
-                    for rx, rep in self.regex_rules:
-                        for m in rx.finditer(text):
-                            span = (m.start(), m.end())
-                            if self._overlaps_allowed(span, allowed_spans):
-                                continue
-                            # require that at least one banned match falls within this span
-                            has_banned = any(
-                                self.banned_pattern.search(text, pos, span[1])
-                                for pos in range(span[0], span[1])
-                            )
-                            if not has_banned:
-                                continue
-                            edits.append((span[0], span[1], rep))
-
-                    # Then literal char mapping based on banned matches
-                    for m in self.banned_pattern.finditer(text):
-                        idx = m.start()
-                        span = (idx, idx + 1)
-                        if self._overlaps_allowed(span, allowed_spans):
-                            continue
-                        ch = m.group(0)
-                        rep = self.subs.mapping.get(ch)
-                        if rep is None:
-                            unmapped_banned += 1
-                            continue
-                        edits.append((span[0], span[1], rep))
-
-                    if not edits:
-                        new_lines.append(text)
-                        continue
-
-                    # Resolve overlapping edits by keeping the first occurrence of a region
-                    # Prefer longer spans at the same start so regex rules win over single-char maps
-                    edits.sort(key=lambda t: (t[0], -(t[1] - t[0])))
-                    resolved: List[Tuple[int, int, str]] = []
-                    last_end = -1
-                    for s, e, rep in edits:
-                        if s < last_end:
-                            # overlaps previous edit; skip to avoid conflicts
-                            continue
-                        resolved.append((s, e, rep))
-                        last_end = e
-
-                    # Apply edits right-to-left
-                    buf = text
-                    for s, e, rep in reversed(resolved):
-                        buf = buf[:s] + rep + buf[e:]
-                        file_replacements += 1
-
-                    if buf != text:
-                        changed = True
-                        new_lines.append(buf)
-                    else:
-                        new_lines.append(text)
-
-                if changed and not dry_run:
-                    Path(fp).write_text("\n".join(new_lines) + "\n", encoding="utf-8")
-                    files_changed += 1
-                    total_replacements += file_replacements
-                elif changed:
-                    # Dry run still counts replacements but does not write
-                    files_changed += 1
-                    total_replacements += file_replacements
+                return Path(os.path.relpath(fp.resolve(), base.resolve())).as_posix()
+            except ValueError:
+                continue
+        return fp.as_posix()
+
+    def _write_diffs(
+        self,
+        targets: Iterable[Tuple[Path, Set[int] | None]],
+        stats: SubstitutionStats,
+        out: TextIO,
+        workers: int,
+        context: int,
+    ) -> None:
+        """
+        Write a unified diff per changed file, in target order. Serially each
+        hunk is written as soon as it closes; with workers, each file's diff
+        is built in a worker process and written when its turn comes.
+        """
+        if workers <= 0:
+            for fp, only_lines in targets:
+                try:
+                    for hunk in _iter_file_diff(
+                        self.sniper, fp, self._diff_label(fp), stats, only_lines, context
+                    ):
+                        out.write(hunk)
+                except Exception as e:
+                    logger.debug("Error diffing %s: %s", fp, e)
+                    stats.errors += 1
+            return
 
+        def drain(fut: Future, fp: Path) -> None:
+            try:
+                text, delta = fut.result()
             except Exception as e:
-                logger.debug(f"Error substituting in {fp}: {e}")
-                errors += 1
-
-        return SubstitutionStats(
-            files_scanned=files_scanned,
-            files_changed=files_changed,
-            replacements=total_replacements,
-            unmapped_banned=unmapped_banned,
-            errors=errors,
+                logger.debug("Error diffing %s: %s", fp, e)
+                stats.errors += 1
+                return
+            out.write(text)
+            stats.add(delta)
+
+        with ProcessPoolExecutor(
+            workers, initializer=_init_worker, initargs=(self.sniper,)
+        ) as pool:
+            pending: Deque[Tuple[Future, Path]] = deque()
+            for fp, only_lines in targets:
+                label = self._diff_label(fp)
+                fut = pool.submit(_diff_file_in_worker, fp, label, only_lines, context)
+                pending.append((fut, fp))
+                if len(pending) >= 2 * workers:
+                    drain(*pending.popleft())
+            while pending:
+                drain(*pending.popleft())
+
+    def _discovered(self, stats: SubstitutionStats) -> Iterator[Tuple[Path, Set[int] | None]]:
+        files = find_files(
+            self.vault_path, self.extensions, self.exclude_patterns, self.respect_ignore
         )
+        files = select_shard(files, self.vault_path, self.shard)
+        debug = logger.isEnabledFor(logging.DEBUG)
+        for fp in files:
+            stats.files_scanned += 1
+            if debug:
+                logger.debug("Substituting in %s", fp, extra={"file_index": stats.files_scanned})
+            yield fp, None
+
+    def _apply(
+        self,
+        targets: Iterable[Tuple[Path, Set[int] | None]],
+        stats: SubstitutionStats,
+        dry_run: bool,
+    ) -> None:
+        for fp, only_lines in targets:
+            try:
+                self._process_file(fp, stats, dry_run, only_lines)
+            except Exception as e:
+                logger.debug("Error substituting in %s: %s", fp, e)
+                stats.errors += 1
+
+    def _finish(
+        self,
+        targets: Iterable[Tuple[Path, Set[int] | None]],
+        stats: SubstitutionStats,
+        dry_run: bool,
+        diff: TextIO | None,
+        workers: int,
+        context: int,
+    ) -> SubstitutionStats:
+        if diff is not None:
+            self._write_diffs(targets, stats, diff, workers, context)
+        else:
+            self._apply(targets, stats, dry_run)
+        return stats
+
+    def run(
+        self,
+        dry_run: bool = True,
+        diff: TextIO | None = None,
+        workers: int = 0,
+        context: int = 3,
+    ) -> SubstitutionStats:
+        """
+        Substitute in every discovered file. With ``diff``, nothing is written
+        to the files; a ``git apply``-able unified diff of the changes goes to
+        ``diff`` instead, built in ``workers`` processes when given.
+        """
+        stats = SubstitutionStats(0, 0, 0, 0, 0)
+        return self._finish(self._discovered(stats), stats, dry_run, diff, workers, context)
+
+    def fix(self, dry_run: bool = False) -> Tuple[List[Occurrence], SubstitutionStats]:
+        """
+        Substitute and scan in one pass per file. Returns every banned match
+        found, each marked ``fix="replaced"`` or ``"unmapped"``, with the
+        usual stats; the matches are the ones the rewrite was computed from,
+        so they describe exactly what changed. ``file_meta`` then holds the
+        size and mtime of files with matches as left on disk.
+        """
+        stats = SubstitutionStats(0, 0, 0, 0, 0)
+        results: List[Occurrence] = []
+        self.file_meta = []
+        for fp, _ in self._discovered(stats):
+            hits: List[Occurrence] = []
+            try:
+                self._process_file(fp, stats, dry_run, hits=hits)
+                if hits:
+                    st = fp.stat()
+                    self.file_meta.append(
+                        {"file": str(fp), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+                    )
+            except Exception as e:
+                logger.debug("Error fixing %s: %s", fp, e)
+                stats.errors += 1
+                continue
+            results.extend(hits)
+        return results, stats
+
+    def run_from_report(
+        self,
+        report_path: Path,
+        dry_run: bool = True,
+        diff: TextIO | None = None,
+        workers: int = 0,
+        context: int = 3,
+    ) -> SubstitutionStats:
+        """
+        Substitute only the files and lines listed in a ``scan --report`` file.
+
+        Files whose size or mtime no longer match the report are skipped and
+        counted in ``stale_files``; no discovery or full-tree matching is done.
+        ``diff``, ``workers`` and ``context`` are as for ``run``.
+        """
+        data = json.loads(Path(report_path).read_text(encoding="utf-8"))
+        files_meta = data.get("files")
+        if files_meta is None:
+            raise ValueError(
+                f"Report {report_path} has no file metadata; re-run scan --report"
+            )
+
+        lines_by_file: Dict[str, Set[int]] = {}
+        for r in data.get("results", []):
+            lines_by_file.setdefault(r["file"], set()).add(int(r["line"]))
+
+        stats = SubstitutionStats(0, 0, 0, 0, 0)
+
+        def targets() -> Iterator[Tuple[Path, Set[int] | None]]:
+            debug = logger.isEnabledFor(logging.DEBUG)
+            for meta in files_meta:
+                path = meta["file"]
+                only_lines = lines_by_file.get(path)
+                if not only_lines:
+                    continue
+                stats.files_scanned += 1
+                if debug:
+                    logger.debug(
+                        "Substituting in %s", path, extra={"file_index": stats.files_scanned}
+                    )
+                fp = Path(path)
+                try:
+                    st = fp.stat()
+                except Exception as e:
+                    logger.debug("Error substituting in %s: %s", fp, e)
+                    stats.errors += 1
+                    continue
+                if st.st_size != meta["size"] or st.st_mtime_ns != meta["mtime_ns"]:
+                    logger.warning("Skipping %s: changed since report was written", fp)
+                    stats.stale_files += 1
+                    continue
+                yield fp, only_lines
+
+        return self._finish(targets(), stats, dry_run, diff, workers, context)
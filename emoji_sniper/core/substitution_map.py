@@ -1,11 +1,89 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Set, Tuple
 import json
 import re
 
+try:  # Python 3.11+
+    import re._parser as sre_parse  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - Python 3.10
+    import sre_parse  # type: ignore[no-redef]
+
+
+_END = ""  # Terminal marker in trie nodes (never a real code point)
+
+
+class LiteralTrie:
+    """
+    Prefix trie over the literal keys of a substitution map.
+
+    Keys may span several code points (VS16, skin tones, ZWJ chains, flag
+    pairs). Candidate start positions are located with a compiled character
+    class of first code points, then the trie is walked to find the longest
+    key starting there.
+    """
+
+    def __init__(self, mapping: Dict[str, str]) -> None:
+        self.root: Dict[str, dict] = {}
+        for key, rep in mapping.items():
+            if not key:
+                continue
+            node = self.root
+            for ch in key:
+                node = node.setdefault(ch, {})
+            node[_END] = rep
+        self._starts: re.Pattern[str] | None = None
+        if self.root:
+            self._starts = re.compile(
+                "[" + "".join(re.escape(ch) for ch in sorted(self.root)) + "]"
+            )
+
+    def longest_match(self, text: str, pos: int) -> Tuple[int, str] | None:
+        """Return (end, replacement) for the longest key at ``pos``, or None."""
+        node = self.root
+        best: Tuple[int, str] | None = None
+        i = pos
+        n = len(text)
+        while i < n:
+            node = node.get(text[i])  # type: ignore[assignment]
+            if node is None:
+                break
+            i += 1
+            if _END in node:
+                best = (i, node[_END])
+        return best
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """
+        Yield (start, end, replacement) for the longest key at every candidate
+        start. Matches may overlap; callers resolve conflicts.
+        """
+        if self._starts is None:
+            return
+        for m in self._starts.finditer(text):
+            hit = self.longest_match(text, m.start())
+            if hit is not None:
+                yield m.start(), hit[0], hit[1]
+
+    def spans(self, text: str) -> Iterator[Tuple[int, int]]:
+        """
+        Yield non-overlapping (start, end) of the longest key, left to right,
+        the way ``re.finditer`` reports matches.
+        """
+        if self._starts is None:
+            return
+        search = self._starts.search
+        m = search(text)
+        while m is not None:
+            hit = self.longest_match(text, m.start())
+            if hit is None:
+                m = search(text, m.start() + 1)
+            else:
+                yield m.start(), hit[0]
+                m = search(text, hit[0])
+
 
 @dataclass(frozen=True)
 class RegexRule:
@@ -17,6 +95,11 @@ class RegexRule:
 class SubstitutionMap:
     mapping: Dict[str, str]
     regex_rules: Tuple[RegexRule, ...]
+    trie: LiteralTrie = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        # Compile literal keys once, at load time
+        object.__setattr__(self, "trie", LiteralTrie(self.mapping))
 
     @staticmethod
     def load(path: Path) -> "SubstitutionMap":
@@ -34,3 +117,114 @@ class SubstitutionMap:
     def compiled_regex_rules(self) -> List[tuple[re.Pattern[str], str]]:
         return [(re.compile(r.pattern), r.replacement) for r in self.regex_rules]
 
+
+class _Unanalyzable(Exception):
+    pass
+
+
+def _collect_chars(items, chars: Set[int], ranges: List[Tuple[int, int]]) -> None:
+    """Collect every code point a parsed pattern can consume into chars/ranges."""
+    c = sre_parse
+    for op, av in items:
+        if op is c.LITERAL:
+            chars.add(av)
+        elif op is c.IN:
+            for iop, iav in av:
+                if iop is c.LITERAL:
+                    chars.add(iav)
+                elif iop is c.RANGE:
+                    ranges.append(iav)
+                else:
+                    # NEGATE, CATEGORY (\w, \s, ...) are open-ended
+                    raise _Unanalyzable()
+        elif op in (c.MAX_REPEAT, c.MIN_REPEAT) or op is getattr(c, "POSSESSIVE_REPEAT", None):
+            _collect_chars(av[2], chars, ranges)
+        elif op is c.SUBPATTERN:
+            _collect_chars(av[-1], chars, ranges)
+        elif op is getattr(c, "ATOMIC_GROUP", None):
+            _collect_chars(av, chars, ranges)
+        elif op is c.BRANCH:
+            for alt in av[1]:
+                _collect_chars(alt, chars, ranges)
+        elif op is c.GROUPREF_EXISTS:
+            _collect_chars(av[1], chars, ranges)
+            if av[2] is not None:
+                _collect_chars(av[2], chars, ranges)
+        elif op in (c.AT, c.ASSERT, c.ASSERT_NOT, c.GROUPREF):
+            # Anchors and lookarounds consume nothing; backrefs repeat a group
+            # whose characters were already collected.
+            continue
+        else:
+            # ANY, NOT_LITERAL, and anything unexpected
+            raise _Unanalyzable()
+
+
+def rule_trigger_chars(
+    rx: re.Pattern[str], banned_pattern: re.Pattern[str]
+) -> Tuple[FrozenSet[str], Tuple[Tuple[int, int], ...]] | None:
+    """
+    Determine which banned code points a compiled rule can consume.
+
+    Returns (literal banned chars, class ranges) or None when the rule cannot
+    be analyzed (wildcards, negated or category classes, case-folding).
+    Ranges are kept as written; a line triggers the rule when one of its
+    banned characters falls inside one.
+    """
+    if rx.flags & re.IGNORECASE:
+        return None
+    try:
+        parsed = sre_parse.parse(rx.pattern, rx.flags)
+        chars: Set[int] = set()
+        ranges: List[Tuple[int, int]] = []
+        _collect_chars(parsed, chars, ranges)
+    except (_Unanalyzable, re.error):
+        return None
+    banned = frozenset(ch for ch in map(chr, chars) if banned_pattern.fullmatch(ch))
+    return banned, tuple(ranges)
+
+
+class RulePrefilter:
+    """
+    Dispatch regex rules by the banned code points present on a line.
+
+    Rules whose trigger characters were determined at load time are indexed by
+    code point (or kept in a short list when they contain class ranges);
+    unanalyzable rules go into an always-run bucket.
+    """
+
+    def __init__(
+        self, rules: List[Tuple[re.Pattern[str], str]], banned_pattern: re.Pattern[str]
+    ) -> None:
+        self.total = len(rules)
+        self.always: List[int] = []
+        self.by_char: Dict[str, List[int]] = {}
+        self.ranged: List[Tuple[Tuple[Tuple[int, int], ...], int]] = []
+        for i, (rx, _) in enumerate(rules):
+            triggers = rule_trigger_chars(rx, banned_pattern)
+            if triggers is None:
+                self.always.append(i)
+                continue
+            chars, ranges = triggers
+            for ch in chars:
+                self.by_char.setdefault(ch, []).append(i)
+            if ranges:
+                self.ranged.append((ranges, i))
+
+    def select(self, banned_chars: Iterable[str]) -> List[int]:
+        """Return indices (in rule order) of rules that may apply."""
+        if not self.total:
+            return []
+        picked: Set[int] = set(self.always)
+        present = set(banned_chars)
+        for ch in present:
+            hit = self.by_char.get(ch)
+            if hit:
+                picked.update(hit)
+        if self.ranged:
+            cps = [ord(ch) for ch in present]
+            for ranges, i in self.ranged:
+                if i in picked:
+                    continue
+                if any(lo <= cp <= hi for cp in cps for lo, hi in ranges):
+                    picked.add(i)
+        return sorted(picked)
@@ -0,0 +1,286 @@
+"""
+Language Server Protocol (stdio) front end for editor integrations.
+
+The compiled banned/allowed patterns (and optional substitution map) stay in
+memory for the life of the server. Documents are synced incrementally: each
+didChange edit splices the affected lines and re-matches only those lines
+(allowlist spans are line-scoped, so no wider context is needed). Each hit's
+diagnostic is serialized once when its line is matched, so publishing after a
+keystroke only joins cached fragments.
+
+LSP positions are UTF-16 code unit offsets; matching works on code points, so
+columns are converted at the edges.
+"""
+from __future__ import annotations
+
+from typing import Any, BinaryIO, Callable, Dict, List, Tuple
+import json
+import logging
+
+from .core.core import SniperScanner
+from .core.engine import _sequence_name
+from .core.substitution_map import SubstitutionMap
+
+
+logger = logging.getLogger(__name__)
+
+SEVERITY_WARNING = 2
+TEXT_DOCUMENT_SYNC_INCREMENTAL = 2
+
+
+def utf16_to_index(line: str, units: int) -> int:
+    """Convert a UTF-16 offset within ``line`` to a code point index."""
+    if units <= 0:
+        return 0
+    if line.isascii():
+        return min(units, len(line))
+    acc = 0
+    for i, ch in enumerate(line):
+        if acc >= units:
+            return i
+        acc += 2 if ord(ch) > 0xFFFF else 1
+    return len(line)
+
+
+def index_to_utf16(line: str, idx: int) -> int:
+    """Convert a code point index within ``line`` to a UTF-16 offset."""
+    if line.isascii():
+        return idx
+    return idx + sum(1 for ch in line[:idx] if ord(ch) > 0xFFFF)
+
+
+# A cached hit: (start, end) in UTF-16 units plus the pre-serialized,
+# line-independent tail of its diagnostic object
+LineHit = Tuple[int, int, str]
+
+
+class Document:
+    """Line-split text plus cached diagnostics per line."""
+
+    def __init__(self, text: str, matcher: Callable[[str], List[LineHit]]) -> None:
+        self._match = matcher
+        self.lines: List[str] = text.split("\n")
+        self.hits: List[List[LineHit]] = [self._match(t) for t in self.lines]
+
+    def apply_change(self, change: Dict[str, Any]) -> None:
+        rng = change.get("range")
+        text = change["text"]
+        if rng is None:
+            self.lines = text.split("\n")
+            self.hits = [self._match(t) for t in self.lines]
+            return
+
+        sl, el = rng["start"]["line"], rng["end"]["line"]
+        # Clamp edits past the end of the document
+        last = len(self.lines) - 1
+        sl, el = min(sl, last), min(el, last)
+        head_line, tail_line = self.lines[sl], self.lines[el]
+        sc = utf16_to_index(head_line, rng["start"]["character"])
+        ec = utf16_to_index(tail_line, rng["end"]["character"])
+
+        new_lines = (head_line[:sc] + text + tail_line[ec:]).split("\n")
+        self.lines[sl : el + 1] = new_lines
+        self.hits[sl : el + 1] = [self._match(t) for t in new_lines]
+
+
+class LanguageServer:
+    def __init__(
+        self,
+        scanner: SniperScanner,
+        subs: SubstitutionMap | None,
+        reader: BinaryIO,
+        writer: BinaryIO,
+    ) -> None:
+        self.scanner = scanner
+        self.subs = subs
+        self.reader = reader
+        self.writer = writer
+        self.documents: Dict[str, Document] = {}
+        self._shutdown = False
+        self._names: Dict[str, str] = {}
+
+    # -- transport -----------------------------------------------------------
+
+    def _read_message(self) -> Dict[str, Any] | None:
+        length = None
+        while True:
+            line = self.reader.readline()
+            if not line:
+                return None
+            line = line.strip()
+            if not line:
+                break
+            key, _, value = line.decode("ascii").partition(":")
+            if key.lower() == "content-length":
+                length = int(value.strip())
+        if length is None:
+            return None
+        return json.loads(self.reader.read(length).decode("utf-8"))
+
+    def _write(self, body: bytes) -> None:
+        self.writer.write(f"Content-Length: {len(body)}\r\n\r\n".encode("ascii") + body)
+        self.writer.flush()
+
+    def _send(self, payload: Dict[str, Any]) -> None:
+        self._write(json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+
+    def _respond(self, msg_id: Any, result: Any) -> None:
+        self._send({"jsonrpc": "2.0", "id": msg_id, "result": result})
+
+    # -- matching ------------------------------------------------------------
+
+    def _match(self, line: str) -> List[LineHit]:
+        hits: List[LineHit] = []
+        for idx, text, profile in self.scanner.match_line(line):
+            cp = " ".join(f"U+{ord(c):04X}" for c in text)
+            tail = json.dumps(
+                {
+                    "severity": SEVERITY_WARNING,
+                    "source": "emoji-sniper",
+                    "code": profile or cp.split(" ")[0],
+                    "message": f"Banned character {cp} {self._name(text)}",
+                },
+                ensure_ascii=False,
+            )[1:-1]
+            start = index_to_utf16(line, idx)
+            hits.append((start, start + index_to_utf16(text, len(text)), tail))
+        return hits
+
+    def _name(self, text: str) -> str:
+        name = self._names.get(text)
+        if name is None:
+            name = _sequence_name(text)
+            self._names[text] = name
+        return name
+
+    def _publish(self, uri: str) -> None:
+        # Assembled from cached fragments; only line numbers are filled in here
+        frags: List[str] = []
+        doc = self.documents.get(uri)
+        if doc is not None:
+            for ln, hits in enumerate(doc.hits):
+                if not hits:
+                    continue
+                for start, end, tail in hits:
+                    frags.append(
+                        f'{{"range": {{"start": {{"line": {ln}, "character": {start}}}, '
+                        f'"end": {{"line": {ln}, "character": {end}}}}}, {tail}}}'
+                    )
+        body = (
+            '{"jsonrpc": "2.0", "method": "textDocument/publishDiagnostics", '
+            f'"params": {{"uri": {json.dumps(uri)}, "diagnostics": [{", ".join(frags)}]}}}}'
+        )
+        self._write(body.encode("utf-8"))
+
+    # -- handlers ------------------------------------------------------------
+
+    def _initialize(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "capabilities": {
+                "textDocumentSync": {
+                    "openClose": True,
+                    "change": TEXT_DOCUMENT_SYNC_INCREMENTAL,
+                },
+                "codeActionProvider": self.subs is not None,
+            },
+            "serverInfo": {"name": "emoji-sniper"},
+        }
+
+    def _did_open(self, params: Dict[str, Any]) -> None:
+        td = params["textDocument"]
+        self.documents[td["uri"]] = Document(td["text"], self._match)
+        self._publish(td["uri"])
+
+    def _did_change(self, params: Dict[str, Any]) -> None:
+        uri = params["textDocument"]["uri"]
+        doc = self.documents.get(uri)
+        if doc is None:
+            return
+        for change in params["contentChanges"]:
+            doc.apply_change(change)
+        self._publish(uri)
+
+    def _did_close(self, params: Dict[str, Any]) -> None:
+        uri = params["textDocument"]["uri"]
+        self.documents.pop(uri, None)
+        self._publish(uri)
+
+    def _code_action(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        uri = params["textDocument"]["uri"]
+        doc = self.documents.get(uri)
+        if doc is None or self.subs is None:
+            return []
+        actions: List[Dict[str, Any]] = []
+        for diag in params.get("context", {}).get("diagnostics", []):
+            if diag.get("source") != "emoji-sniper":
+                continue
+            start = diag["range"]["start"]
+            ln = start["line"]
+            if ln >= len(doc.lines):
+                continue
+            line = doc.lines[ln]
+            idx = utf16_to_index(line, start["character"])
+            hit = self.subs.trie.longest_match(line, idx)
+            if hit is None:
+                continue
+            end_idx, rep = hit
+            edit_range = {
+                "start": {"line": ln, "character": index_to_utf16(line, idx)},
+                "end": {"line": ln, "character": index_to_utf16(line, end_idx)},
+            }
+            actions.append(
+                {
+                    "title": f"Replace with '{rep}'",
+                    "kind": "quickfix",
+                    "diagnostics": [diag],
+                    "edit": {"changes": {uri: [{"range": edit_range, "newText": rep}]}},
+                }
+            )
+        return actions
+
+    def serve(self) -> int:
+        """Process messages until exit; returns the process exit code."""
+        requests: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+            "initialize": self._initialize,
+            "textDocument/codeAction": self._code_action,
+        }
+        notifications: Dict[str, Callable[[Dict[str, Any]], None]] = {
+            "textDocument/didOpen": self._did_open,
+            "textDocument/didChange": self._did_change,
+            "textDocument/didClose": self._did_close,
+        }
+        while True:
+            msg = self._read_message()
+            if msg is None:
+                return 0 if self._shutdown else 1
+            method = msg.get("method")
+            params = msg.get("params") or {}
+            msg_id = msg.get("id")
+            try:
+                if method == "shutdown":
+                    self._shutdown = True
+                    self._respond(msg_id, None)
+                elif method == "exit":
+                    return 0 if self._shutdown else 1
+                elif method in requests:
+                    self._respond(msg_id, requests[method](params))
+                elif method in notifications:
+                    notifications[method](params)
+                elif msg_id is not None and method is not None:
+                    self._send(
+                        {
+                            "jsonrpc": "2.0",
+                            "id": msg_id,
+                            "error": {"code": -32601, "message": f"Method not found: {method}"},
+                        }
+                    )
+            except Exception as e:
+                logger.error("Error handling %s: %s", method, e)
+                if msg_id is not None:
+                    self._send(
+                        {
+                            "jsonrpc": "2.0",
+                            "id": msg_id,
+                            "error": {"code": -32603, "message": str(e)},
+                        }
+                    )
@@ -11,15 +11,132 @@ from __future__ import annotations
 import argparse
 import json
 import logging
+import os
+import sys
 from pathlib import Path
-from typing import List, Set
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Set, Tuple
 
-from .core import SniperScanner
-from .core.output import (
-    format_results_as_json,
-    format_results_as_text,
-    print_summary,
-)
+# The scanner, engine and formatters are imported by the subcommands that
+# use them, so other subcommands never pay for loading them
+if TYPE_CHECKING:
+    from .core.engine import Occurrence
+
+
+DEFAULT_INDEX_DB = "emoji-sniper-index.sqlite"
+# ... and the default --result-cache directory
+RESULT_CACHE_ENV = "EMOJI_SNIPER_RESULT_CACHE"
+
+
+def _add_logging_args(p: argparse.ArgumentParser) -> None:
+    p.add_argument(
+        "--verbose",
+        "-v",
+        action="count",
+        default=0,
+        help="Increase verbosity (-v, -vv)",
+    )
+    p.add_argument(
+        "--log-file",
+        type=Path,
+        default=None,
+        help="Also write logs to this rotating file (off by default)",
+    )
+    p.add_argument(
+        "--log-format",
+        choices=["text", "json"],
+        default="text",
+        help="Log record format: text or JSON lines (default: text)",
+    )
+    p.add_argument(
+        "--log-sample",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Keep per-file debug records for every Nth file only (default: 1, all files)",
+    )
+
+
+def _shard_arg(value: str):
+    from .utils.file_discovery import parse_shard
+
+    try:
+        return parse_shard(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
+
+def _regions_arg(value: str):
+    from .core.regions import parse_skip_regions
+
+    try:
+        return parse_skip_regions(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
+
+def _add_skip_regions_arg(p: argparse.ArgumentParser) -> None:
+    p.add_argument(
+        "--skip-regions",
+        type=_regions_arg,
+        default=frozenset(),
+        metavar="KINDS",
+        help=(
+            "Comma-separated Markdown regions to leave alone: fences, frontmatter, "
+            "inline-code"
+        ),
+    )
+
+
+def _positive_int(value: str) -> int:
+    n = int(value)
+    if n < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got {value}")
+    return n
+
+
+def _banned_profiles(values: List[str] | None) -> Tuple[Path, Dict[str, Path] | None]:
+    """
+    Resolve repeated --banned values into (banned_path, named profiles).
+
+    A single plain PATH keeps the classic behavior (its [sections], if any,
+    become profiles). NAME=PATH values, or several plain paths (named by file
+    stem), become explicit profiles.
+    """
+    if not values:
+        return Path("banned.txt"), None
+    named: Dict[str, Path] = {}
+    for value in values:
+        name, sep, path = value.partition("=")
+        if sep and name and "/" not in name and not Path(value).exists():
+            named[name] = Path(path)
+        else:
+            named[Path(value).stem] = Path(value)
+    if len(values) == 1 and "=" not in values[0]:
+        return Path(values[0]), None
+    return next(iter(named.values())), named
+
+
+def _keep(found: Iterable[Occurrence], kept: List[Occurrence]) -> Iterator[Occurrence]:
+    for occ in found:
+        kept.append(occ)
+        yield occ
+
+
+def _write_report(path: Path, payload: Dict[str, Any]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+    logging.info("Report written to %s", path)
+
+
+def _setup_logging(args: argparse.Namespace) -> None:
+    from .utils.logging_setup import setup_logging
+
+    setup_logging(
+        args.verbose,
+        log_path=args.log_file,
+        log_format=args.log_format,
+        sample_every=args.log_sample,
+    )
 
 
 def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
@@ -41,9 +158,13 @@ def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
     )
     scan.add_argument(
         "--banned",
-        type=Path,
-        default=Path("banned.txt"),
-        help="Path to banned list file (default: ./banned.txt)",
+        action="append",
+        default=None,
+        metavar="[NAME=]PATH",
+        help=(
+            "Path to banned list file (default: ./banned.txt). Repeat as NAME=PATH to "
+            "scan several named profiles in one pass"
+        ),
     )
     scan.add_argument(
         "--allowed",
@@ -53,9 +174,10 @@ def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
     )
     scan.add_argument(
         "--format",
-        choices=["json", "txt"],
+        choices=["json", "txt", "sarif", "checkstyle"],
         default="json",
-        help="Output format (default: json)",
+        help="Output format; sarif and checkstyle are written as results stream in "
+        "(default: json)",
     )
     scan.add_argument(
         "--report",
@@ -91,8 +213,14 @@ def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
     )
     scan.add_argument(
         "--fail-on-find",
-        action="store_true",
-        help="Exit with code 1 if any banned characters are found",
+        nargs="?",
+        const="*",
+        default=None,
+        metavar="PROFILES",
+        help=(
+            "Exit with code 1 if any banned characters are found; optionally only "
+            "for a comma-separated list of profiles"
+        ),
     )
     scan.add_argument(
         "--list-files",
@@ -100,12 +228,70 @@ def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
         help="Print only unique file paths that contain banned characters",
     )
     scan.add_argument(
-        "--verbose",
-        "-v",
-        action="count",
-        default=0,
-        help="Increase verbosity (-v, -vv)",
+        "--archives",
+        action="store_true",
+        help="Stream members of .zip/.tar/.tgz/.gz files (filtered by --ext/--exclude)",
+    )
+    scan.add_argument(
+        "--sequences",
+        action="store_true",
+        help="Match whole emoji sequences (ZWJ, modifiers, flags, keycaps) as one occurrence",
+    )
+    scan.add_argument(
+        "--respect-ignore",
+        action="store_true",
+        help="Honor .gitignore/.sniperignore files (ignored directories are not walked)",
+    )
+    scan.add_argument(
+        "--shard",
+        type=_shard_arg,
+        default=None,
+        metavar="K/N",
+        help="Only scan files in shard K of N (stable hash of relative path)",
+    )
+    _add_skip_regions_arg(scan)
+    scan.add_argument(
+        "--result-cache",
+        type=Path,
+        default=os.environ.get(RESULT_CACHE_ENV) or None,
+        metavar="DIR",
+        help=(
+            "Reuse per-file results keyed by file content and rules; safe to share "
+            f"between checkouts and CI jobs (default: ${RESULT_CACHE_ENV}, unset = off)"
+        ),
+    )
+    scan.add_argument(
+        "--checkpoint",
+        type=Path,
+        default=None,
+        metavar="FILE",
+        help=(
+            "Record finished files in FILE and, when rerun after an interruption, "
+            "skip them (removed once the scan completes)"
+        ),
+    )
+    scan.add_argument(
+        "--max-per-file",
+        type=_positive_int,
+        default=None,
+        metavar="N",
+        help="Stop reading a file after N hits and mark it truncated in the report",
+    )
+    scan.add_argument(
+        "--max-total",
+        type=_positive_int,
+        default=None,
+        metavar="N",
+        help="Stop the whole scan after N hits; remaining files are counted as skipped",
+    )
+    scan.add_argument(
+        "--engine",
+        choices=["regex", "numpy"],
+        default="regex",
+        help="Matching engine: regex (default) or numpy (vectorized, needs NumPy; "
+        "single code points only)",
     )
+    _add_logging_args(scan)
     scan.add_argument(
         "--quiet",
         "-q",
@@ -117,109 +303,700 @@ def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
     sub = subparsers.add_parser(
         "substitute", help="Preview or apply substitutions"
     )
-    sub.add_argument("vault_path", type=Path, help="Path to the directory to process")
+    sub.add_argument(
+        "vault_path",
+        type=Path,
+        nargs="?",
+        default=None,
+        help="Path to the directory to process (optional with --from-report)",
+    )
     sub.add_argument("--banned", type=Path, default=Path("banned.txt"), help="Path to banned list file (default: ./banned.txt)")
     sub.add_argument("--allowed", type=Path, default=None, help="Optional allowlist file")
     sub.add_argument("--map", type=Path, required=True, help="Substitution map JSON file")
     sub.add_argument("--ext", default=".md,.txt", help="Comma-separated file extensions to process")
     sub.add_argument("--exclude", action="append", default=[], help="Glob patterns to exclude (repeatable)")
     sub.add_argument("--dry-run", action="store_true", help="Preview without writing changes")
+    sub.add_argument(
+        "--diff",
+        action="store_true",
+        help="Write a git-apply-compatible unified diff to stdout instead of changing files",
+    )
+    sub.add_argument(
+        "--context",
+        "-U",
+        type=int,
+        default=3,
+        metavar="N",
+        help="Context lines around each --diff hunk (default: 3)",
+    )
+    sub.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Build --diff output in this many worker processes (default: 0, in-process)",
+    )
+    sub.add_argument(
+        "--from-report",
+        type=Path,
+        default=None,
+        help="Only process files/lines listed in a scan --report JSON file",
+    )
+    sub.add_argument(
+        "--sequences",
+        action="store_true",
+        help="Match whole emoji sequences (ZWJ, modifiers, flags, keycaps) as one occurrence",
+    )
+    sub.add_argument(
+        "--respect-ignore",
+        action="store_true",
+        help="Honor .gitignore/.sniperignore files (ignored directories are not walked)",
+    )
+    sub.add_argument(
+        "--shard",
+        type=_shard_arg,
+        default=None,
+        metavar="K/N",
+        help="Only process files in shard K of N (stable hash of relative path)",
+    )
+    _add_skip_regions_arg(sub)
+    _add_logging_args(sub)
+
+    # fix subcommand (scan + substitute in one pass)
+    fix = subparsers.add_parser(
+        "fix", help="Substitute and report what was replaced, reading each file once"
+    )
+    fix.add_argument("vault_path", type=Path, help="Path to the directory to process")
+    fix.add_argument(
+        "--banned",
+        type=Path,
+        default=Path("banned.txt"),
+        help="Path to banned list file (default: ./banned.txt)",
+    )
+    fix.add_argument("--allowed", type=Path, default=None, help="Optional allowlist file")
+    fix.add_argument("--map", type=Path, required=True, help="Substitution map JSON file")
+    fix.add_argument("--ext", default=".md,.txt", help="Comma-separated file extensions to process")
+    fix.add_argument(
+        "--exclude", action="append", default=[], help="Glob patterns to exclude (repeatable)"
+    )
+    fix.add_argument("--dry-run", action="store_true", help="Report without writing changes")
+    fix.add_argument(
+        "--format",
+        choices=["txt", "json"],
+        default="txt",
+        help="Output format for the results (default: txt)",
+    )
+    fix.add_argument(
+        "--no-names", action="store_true", help="Do not include Unicode names in results"
+    )
+    fix.add_argument(
+        "--report",
+        action="store_true",
+        help="Write a timestamped JSON report to a directory (default: ./log)",
+    )
+    fix.add_argument(
+        "--report-dir",
+        type=Path,
+        default=Path("log"),
+        help="Directory to write reports when --report is used",
+    )
+    fix.add_argument(
+        "--report-prefix",
+        default="emoji-fix",
+        help="Filename prefix for reports when --report is used",
+    )
+    fix.add_argument(
+        "--sequences",
+        action="store_true",
+        help="Match whole emoji sequences (ZWJ, modifiers, flags, keycaps) as one occurrence",
+    )
+    fix.add_argument(
+        "--respect-ignore",
+        action="store_true",
+        help="Honor .gitignore/.sniperignore files (ignored directories are not walked)",
+    )
+    fix.add_argument(
+        "--shard",
+        type=_shard_arg,
+        default=None,
+        metavar="K/N",
+        help="Only process files in shard K of N (stable hash of relative path)",
+    )
+    _add_skip_regions_arg(fix)
+    _add_logging_args(fix)
+    fix.add_argument("--quiet", "-q", action="store_true", help="Suppress summary output")
+
+    # lsp subcommand
+    lsp = subparsers.add_parser(
+        "lsp", help="Run a Language Server Protocol server on stdio"
+    )
+    lsp.add_argument(
+        "--banned",
+        action="append",
+        default=None,
+        metavar="[NAME=]PATH",
+        help="Path to banned list file (default: ./banned.txt); repeatable as NAME=PATH",
+    )
+    lsp.add_argument("--allowed", type=Path, default=None, help="Optional allowlist file")
+    lsp.add_argument(
+        "--map", type=Path, default=None, help="Substitution map JSON file for quick fixes"
+    )
+    lsp.add_argument(
+        "--sequences",
+        action="store_true",
+        help="Match whole emoji sequences (ZWJ, modifiers, flags, keycaps) as one occurrence",
+    )
+    _add_logging_args(lsp)
+
+    # index subcommand (build | update | query)
+    index = subparsers.add_parser(
+        "index", help="Maintain and query an on-disk code point index"
+    )
+    index_sub = index.add_subparsers(dest="index_command", required=True)
+    for action, help_text in (
+        ("build", "Build the index from scratch"),
+        ("update", "Re-index only files whose size or mtime changed"),
+    ):
+        ip = index_sub.add_parser(action, help=help_text)
+        ip.add_argument("vault_path", type=Path, help="Path to the directory to index")
+        ip.add_argument(
+            "--db", type=Path, default=Path(DEFAULT_INDEX_DB), help="Index database path"
+        )
+        ip.add_argument(
+            "--banned",
+            type=Path,
+            default=Path("banned.txt"),
+            help="Path to banned list file (default: ./banned.txt)",
+        )
+        ip.add_argument("--allowed", type=Path, default=None, help="Optional allowlist file")
+        ip.add_argument(
+            "--ext", default=".md,.txt", help="Comma-separated file extensions to index"
+        )
+        ip.add_argument(
+            "--exclude", action="append", default=[], help="Glob patterns to exclude (repeatable)"
+        )
+        ip.add_argument(
+            "--respect-ignore",
+            action="store_true",
+            help="Honor .gitignore/.sniperignore files (ignored directories are not walked)",
+        )
+        _add_logging_args(ip)
+    iq = index_sub.add_parser("query", help="Look up code points without reading the vault")
+    iq.add_argument(
+        "--db", type=Path, default=Path(DEFAULT_INDEX_DB), help="Index database path"
+    )
+    target = iq.add_mutually_exclusive_group(required=True)
+    target.add_argument("--char", help="A single character, e.g. 🚀")
+    target.add_argument("--codepoint", help="A code point, e.g. U+1F680")
+    target.add_argument("--range", help="An inclusive range, e.g. U+1F1E6-U+1F1FF")
+    target.add_argument(
+        "--block", help="A Unicode block name, e.g. Emoticons or 'Latin-1 Supplement'"
+    )
+    iq.add_argument(
+        "--files-only", action="store_true", help="Print only files that contain matches"
+    )
+    iq.add_argument(
+        "--format", choices=["json", "txt"], default="json", help="Output format (default: json)"
+    )
+    iq.add_argument(
+        "--no-names", action="store_true", help="Do not include Unicode names in results"
+    )
+    _add_logging_args(iq)
+
+    # scan-records subcommand
+    rec = subparsers.add_parser(
+        "scan-records", help="Scan fields of JSONL, CSV or SQLite records"
+    )
+    rec.add_argument("source", type=Path, help="JSONL/CSV file or SQLite database")
+    rec.add_argument(
+        "--input-format",
+        choices=["auto", "jsonl", "csv", "sqlite"],
+        default="auto",
+        help="Input format (default: from the file suffix)",
+    )
+    rec.add_argument("--table", default=None, help="SQLite table to read")
+    rec.add_argument(
+        "--field",
+        action="append",
+        default=None,
+        help="Field/column to scan (repeatable; default: every text field)",
+    )
+    rec.add_argument(
+        "--id-field",
+        default=None,
+        help="Field/column holding the record ID (default: line/row number, or rowid)",
+    )
+    rec.add_argument(
+        "--banned",
+        action="append",
+        default=None,
+        metavar="[NAME=]PATH",
+        help="Path to banned list file (default: ./banned.txt); repeatable as NAME=PATH",
+    )
+    rec.add_argument("--allowed", type=Path, default=None, help="Optional allowlist file")
+    rec.add_argument(
+        "--sequences",
+        action="store_true",
+        help="Match whole emoji sequences (ZWJ, modifiers, flags, keycaps) as one occurrence",
+    )
+    _add_skip_regions_arg(rec)
+    rec.add_argument(
+        "--format",
+        "-f",
+        choices=["json", "jsonl", "txt"],
+        default="json",
+        help="Output format; jsonl and txt are written as results stream in (default: json)",
+    )
+    rec.add_argument(
+        "--no-names", action="store_true", help="Do not include Unicode names in results"
+    )
+    rec.add_argument(
+        "--batch-size",
+        type=int,
+        default=1000,
+        help="Records read and scanned per batch (default: 1000)",
+    )
+    rec.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Scan batches in this many worker processes (default: 0, in-process)",
+    )
+    rec.add_argument("--quiet", "-q", action="store_true", help="Suppress summary output")
+    rec.add_argument(
+        "--fail-on-find", action="store_true", help="Exit with code 1 if any matches are found"
+    )
+    _add_logging_args(rec)
+
+    # merge-reports subcommand
+    merge = subparsers.add_parser(
+        "merge-reports", help="Merge shard reports into one combined report"
+    )
+    merge.add_argument("reports", type=Path, nargs="+", help="Shard report JSON files")
+    merge.add_argument(
+        "--output",
+        "-o",
+        type=Path,
+        default=None,
+        help="Write the merged report here (default: stdout)",
+    )
+    _add_logging_args(merge)
 
     return parser.parse_args(argv)
 
 
 def run_scan(args: argparse.Namespace) -> int:
-    # Configure logging to console and file
-    from .utils.logging_setup import setup_logging
+    from .core.core import SniperScanner
+    from .core.output import (
+        format_results_as_json,
+        format_results_as_text,
+        print_summary,
+        write_checkstyle,
+        write_sarif,
+    )
 
-    setup_logging(args.verbose)
+    # Configure logging to console (and file with --log-file)
+    _setup_logging(args)
     logging.info("Starting scan")
 
     exts: Set[str] = {e.strip().lower() for e in args.ext.split(",") if e.strip()}
     excludes: Set[str] = set(args.exclude) if args.exclude else set()
 
-    scanner = SniperScanner(
-        vault_path=args.vault_path,
-        banned_path=args.banned,
-        allowed_path=args.allowed,
-        exclude_patterns=excludes,
-        extensions=exts,
-        include_names=not args.no_names,
-    )
-
-    results, stats = scanner.scan()
+    banned_path, banned_profiles = _banned_profiles(args.banned)
+    try:
+        scanner = SniperScanner(
+            vault_path=args.vault_path,
+            banned_path=banned_path,
+            allowed_path=args.allowed,
+            exclude_patterns=excludes,
+            extensions=exts,
+            include_names=not args.no_names,
+            shard=args.shard,
+            respect_ignore=args.respect_ignore,
+            sequences=args.sequences,
+            banned_profiles=banned_profiles,
+            archives=args.archives,
+            max_per_file=args.max_per_file,
+            max_total=args.max_total,
+            skip_regions=args.skip_regions,
+            engine=args.engine,
+            result_cache=args.result_cache,
+            checkpoint=args.checkpoint,
+        )
+    except ValueError as e:
+        logging.error("%s", e)
+        return 2
 
-    payload = format_results_as_json(results, stats)
+    if args.format in ("sarif", "checkstyle") and not args.list_files:
+        # Streamed as the scanner produces results; they are only kept
+        # in memory when a JSON report was asked for as well
+        results: List[Occurrence] = []
+        found = scanner.iter_scan()
+        if args.report:
+            found = _keep(found, results)
+        if args.format == "sarif":
+            root = args.vault_path if args.vault_path.is_dir() else args.vault_path.parent
+            write_sarif(found, sys.stdout, root=root, stats=lambda: scanner.stats)
+        else:
+            write_checkstyle(found, sys.stdout)
+        stats = scanner.stats
+    else:
+        results, stats = scanner.scan()
 
     if args.list_files:
         files = sorted({r.file for r in results})
         for f in files:
             print(f)
-    else:
-        if args.format == "json":
-            print(json.dumps(payload, ensure_ascii=False, indent=2))
-        else:
-            print(format_results_as_text(results))
-            if not args.quiet:
-                print()
-                print_summary(stats)
+    elif args.format == "json":
+        payload = format_results_as_json(results, stats, scanner.file_meta)
+        print(json.dumps(payload, ensure_ascii=False, indent=2))
+    elif args.format == "txt":
+        print(format_results_as_text(results))
+        if not args.quiet:
+            print()
+            print_summary(stats)
 
     if args.report:
+        payload = format_results_as_json(results, stats, scanner.file_meta)
         try:
             args.report_dir.mkdir(parents=True, exist_ok=True)
             from datetime import datetime
 
             ts = datetime.now().strftime("%Y%m%d_%H%M%S")
             fname = f"{args.report_prefix}_{ts}.json"
-            fpath = args.report_dir / fname
-            with open(fpath, "w", encoding="utf-8") as f:
-                json.dump(payload, f, ensure_ascii=False, indent=2)
-            logging.info("Report written to %s", fpath)
+            _write_report(args.report_dir / fname, payload)
+
+            # One report per profile, from the same single pass
+            if len(scanner.profiles) > 1:
+                for name in scanner.profiles:
+                    sub_results = [r for r in results if r.profile == name]
+                    sub_files = {r.file for r in sub_results}
+                    sub_stats = {k: v for k, v in stats.items() if k != "profiles"}
+                    sub_stats["profile"] = name
+                    sub_stats["occurrences"] = len(sub_results)
+                    sub_payload = format_results_as_json(
+                        sub_results,
+                        sub_stats,
+                        [m for m in scanner.file_meta if m["file"] in sub_files],
+                    )
+                    _write_report(
+                        args.report_dir / f"{args.report_prefix}-{name}_{ts}.json", sub_payload
+                    )
         except Exception as e:
             logging.error("Failed to write report: %s", e)
-    
-    if args.fail_on_find and stats.get("occurrences", 0) > 0:
-        return 1
+            # Keep the checkpoint, so a rerun only has to write the report
+            args.checkpoint = None
+
+    if args.checkpoint is not None:
+        try:
+            args.checkpoint.unlink()
+        except OSError as e:
+            logging.warning("Could not remove checkpoint %s: %s", args.checkpoint, e)
+
+    if args.fail_on_find is not None:
+        if args.fail_on_find == "*":
+            if stats.get("occurrences", 0) > 0:
+                return 1
+        else:
+            wanted = {p.strip() for p in args.fail_on_find.split(",") if p.strip()}
+            unknown = wanted - set(scanner.profiles)
+            if unknown:
+                logging.warning(
+                    "Unknown profiles for --fail-on-find: %s", ", ".join(sorted(unknown))
+                )
+            counts = stats.get("profiles", {})
+            if any(counts.get(p, 0) > 0 for p in wanted):  # type: ignore[union-attr]
+                return 1
     return 0
 
 
 def run_substitute(args: argparse.Namespace) -> int:
-    from .utils.logging_setup import setup_logging
     from .core.substitute import Substitutor
 
-    setup_logging(args.verbose if hasattr(args, "verbose") else 0)
+    _setup_logging(args)
+    if args.vault_path is None and args.from_report is None:
+        logging.error("substitute needs a vault_path or --from-report")
+        return 2
+
     exts: Set[str] = {e.strip().lower() for e in args.ext.split(",") if e.strip()}
     excludes: Set[str] = set(args.exclude) if args.exclude else set()
 
     subber = Substitutor(
-        vault_path=args.vault_path,
+        vault_path=args.vault_path if args.vault_path is not None else Path("."),
         banned_path=args.banned,
         subs_path=args.map,
         allowed_path=args.allowed,
         exclude_patterns=excludes,
         extensions=exts,
+        shard=args.shard,
+        respect_ignore=args.respect_ignore,
+        sequences=args.sequences,
+        skip_regions=args.skip_regions,
+    )
+    # With --diff, stdout carries only the patch
+    options = dict(
+        dry_run=args.dry_run,
+        diff=sys.stdout if args.diff else None,
+        workers=args.workers,
+        context=max(args.context, 0),
     )
-    stats = subber.run(dry_run=args.dry_run)
+    if args.from_report is not None:
+        try:
+            stats = subber.run_from_report(args.from_report, **options)
+        except (OSError, ValueError) as e:
+            logging.error("Failed to read report: %s", e)
+            return 2
+    else:
+        stats = subber.run(**options)
 
     # Simple console summary
     print(
+        _substitution_summary(stats)
+        + (f" | Stale: {stats.stale_files}" if args.from_report is not None else ""),
+        file=sys.stderr if args.diff else sys.stdout,
+    )
+    return 0 if stats.errors == 0 and stats.stale_files == 0 else 1
+
+
+def _substitution_summary(stats: Any) -> str:
+    return (
         f"Files: {stats.files_scanned} | Changed: {stats.files_changed} | "
         f"Replacements: {stats.replacements} | Unmapped banned: {stats.unmapped_banned} | "
-        f"Errors: {stats.errors}"
+        f"Errors: {stats.errors} | Rule evals skipped: {stats.rule_evals_skipped}"
     )
-    return 0 if stats.errors == 0 else 1
 
 
-def main(argv: List[str] | None = None) -> int:
-    args = parse_args(argv)
-    if args.command == "scan":
-        return run_scan(args)
-    elif args.command == "substitute":
-        return run_substitute(args)
+def run_fix(args: argparse.Namespace) -> int:
+    from dataclasses import asdict
+
+    from .core.output import format_results_as_json, format_results_as_text
+    from .core.substitute import Substitutor
+
+    _setup_logging(args)
+    exts: Set[str] = {e.strip().lower() for e in args.ext.split(",") if e.strip()}
+    excludes: Set[str] = set(args.exclude) if args.exclude else set()
+
+    subber = Substitutor(
+        vault_path=args.vault_path,
+        banned_path=args.banned,
+        subs_path=args.map,
+        allowed_path=args.allowed,
+        exclude_patterns=excludes,
+        extensions=exts,
+        shard=args.shard,
+        respect_ignore=args.respect_ignore,
+        sequences=args.sequences,
+        skip_regions=args.skip_regions,
+        include_names=not args.no_names,
+    )
+    results, fix_stats = subber.fix(dry_run=args.dry_run)
+
+    stats: Dict[str, Any] = {"vault_path": str(args.vault_path)}
+    stats.update((k, v) for k, v in asdict(fix_stats).items() if k != "stale_files")
+    stats["occurrences"] = len(results)
+    stats["dry_run"] = args.dry_run
+    payload = format_results_as_json(results, stats, subber.file_meta)
+
+    if args.format == "json":
+        print(json.dumps(payload, ensure_ascii=False, indent=2))
+    else:
+        print(format_results_as_text(results))
+        if not args.quiet:
+            print()
+            print(_substitution_summary(fix_stats))
+
+    if args.report:
+        try:
+            args.report_dir.mkdir(parents=True, exist_ok=True)
+            from datetime import datetime
+
+            ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+            _write_report(args.report_dir / f"{args.report_prefix}_{ts}.json", payload)
+        except Exception as e:
+            logging.error("Failed to write report: %s", e)
+    return 0 if fix_stats.errors == 0 else 1
+
+
+def run_lsp(args: argparse.Namespace) -> int:
+    from .core.core import SniperScanner
+    from .core.substitution_map import SubstitutionMap
+    from .lsp import LanguageServer
+
+    # Console logs go to stderr; stdout carries the protocol
+    _setup_logging(args)
+    banned_path, banned_profiles = _banned_profiles(args.banned)
+    scanner = SniperScanner(
+        vault_path=Path("."),
+        banned_path=banned_path,
+        allowed_path=args.allowed,
+        sequences=args.sequences,
+        banned_profiles=banned_profiles,
+    )
+    subs = SubstitutionMap.load(args.map) if args.map is not None else None
+    server = LanguageServer(scanner, subs, sys.stdin.buffer, sys.stdout.buffer)
+    return server.serve()
+
+
+def run_index(args: argparse.Namespace) -> int:
+    from .core.core import SniperScanner
+    from .core.index import CodepointIndex, block_range, parse_codepoint
+    from .core.output import format_results_as_json, format_results_as_text
+
+    _setup_logging(args)
+    if args.index_command in ("build", "update"):
+        exts: Set[str] = {e.strip().lower() for e in args.ext.split(",") if e.strip()}
+        scanner = SniperScanner(
+            vault_path=args.vault_path,
+            banned_path=args.banned,
+            allowed_path=args.allowed,
+            exclude_patterns=set(args.exclude),
+            extensions=exts,
+            respect_ignore=args.respect_ignore,
+        )
+        idx = CodepointIndex(args.db)
+        try:
+            stats = idx.update(scanner, rebuild=args.index_command == "build")
+        finally:
+            idx.close()
+        print(
+            f"Indexed: {stats.files_indexed} | Unchanged: {stats.files_unchanged} | "
+            f"Removed: {stats.files_removed} | Postings: {stats.postings} | "
+            f"Errors: {stats.errors}" + (" | Rebuilt" if stats.rebuilt else "")
+        )
+        return 0 if stats.errors == 0 else 1
+
+    if not args.db.exists():
+        logging.error("Index not found: %s (run index build first)", args.db)
+        return 2
+    try:
+        if args.block:
+            lo, hi = block_range(args.block)
+        elif args.range:
+            a, _, b = args.range.partition("-")
+            lo, hi = parse_codepoint(a), parse_codepoint(b or a)
+        else:
+            lo = hi = parse_codepoint(args.char or args.codepoint)
+    except ValueError as e:
+        logging.error("%s", e)
+        return 2
+
+    idx = CodepointIndex(args.db)
+    try:
+        if args.files_only:
+            for f in idx.query_files(min(lo, hi), max(lo, hi)):
+                print(f)
+            return 0
+        results = idx.query(min(lo, hi), max(lo, hi))
+    finally:
+        idx.close()
+
+    if not args.no_names:
+        from .core.engine import _char_name
+
+        for r in results:
+            r.name = _char_name(r.char)
+    stats = {"occurrences": len(results), "files": len({r.file for r in results})}
+    if args.format == "json":
+        print(json.dumps(format_results_as_json(results, stats), ensure_ascii=False, indent=2))
     else:
-        logging.error("Unknown command")
+        print(format_results_as_text(results))
+    return 0
+
+
+def run_scan_records(args: argparse.Namespace) -> int:
+    import sqlite3
+    from .core.engine import Sniper
+    from .core.output import record_result_as_dict, record_result_as_text
+    from .core.records import RecordScanner
+    from .utils.records import detect_format, iter_records
+
+    _setup_logging(args)
+    banned_path, banned_profiles = _banned_profiles(args.banned)
+    sniper = Sniper.from_files(
+        banned_path,
+        args.allowed,
+        banned_profiles=banned_profiles,
+        sequences=args.sequences,
+        include_names=not args.no_names,
+        skip_regions=args.skip_regions,
+    )
+
+    try:
+        fmt = detect_format(args.source) if args.input_format == "auto" else args.input_format
+        records = iter_records(
+            args.source, fmt, args.field, args.id_field, args.table, args.batch_size
+        )
+        scanner = RecordScanner(sniper, batch_size=args.batch_size, workers=args.workers)
+        results = []
+        for r in scanner.scan(records):
+            if args.format == "jsonl":
+                print(json.dumps(record_result_as_dict(r), ensure_ascii=False))
+            elif args.format == "txt":
+                print(record_result_as_text(r))
+            else:
+                results.append(record_result_as_dict(r))
+    except (OSError, ValueError, sqlite3.Error) as e:
+        logging.error("Failed to read %s: %s", args.source, e)
         return 2
 
+    stats = scanner.stats
+    if args.format == "json":
+        print(json.dumps({"stats": stats, "results": results}, ensure_ascii=False, indent=2))
+    elif args.format == "txt" and not args.quiet:
+        print()
+        print(
+            f"Records: {stats['records_scanned']} | Fields: {stats['fields_scanned']} | "
+            f"Occurrences: {stats['occurrences']}"
+        )
+    if args.fail_on_find and stats.get("occurrences", 0):
+        return 1
+    return 0
+
+
+def run_merge_reports(args: argparse.Namespace) -> int:
+    from .core.merge import merge_reports
+
+    _setup_logging(args)
+    try:
+        if args.output is None:
+            stats = merge_reports(args.reports, sys.stdout)
+        else:
+            with open(args.output, "w", encoding="utf-8") as f:
+                stats = merge_reports(args.reports, f)
+    except (OSError, ValueError) as e:
+        logging.error("Failed to merge reports: %s", e)
+        return 2
+    logging.info(
+        "Merged %d reports (%s occurrences)", len(args.reports), stats.get("occurrences", 0)
+    )
+    return 0
+
+
+def main(argv: List[str] | None = None) -> int:
+    from .utils.logging_setup import stop_logging
+
+    args = parse_args(argv)
+    try:
+        if args.command == "scan":
+            return run_scan(args)
+        elif args.command == "substitute":
+            return run_substitute(args)
+        elif args.command == "fix":
+            return run_fix(args)
+        elif args.command == "index":
+            return run_index(args)
+        elif args.command == "lsp":
+            return run_lsp(args)
+        elif args.command == "scan-records":
+            return run_scan_records(args)
+        elif args.command == "merge-reports":
+            return run_merge_reports(args)
+        else:
+            logging.error("Unknown command")
+            return 2
+    finally:
+        # Drain the background log listener before returning
+        stop_logging()
+
 
 if __name__ == "__main__":
     raise SystemExit(main())
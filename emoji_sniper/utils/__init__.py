@@ -1 +1 @@
-from .file_discovery import find_files
+from .file_discovery import find_files, parse_shard, select_shard
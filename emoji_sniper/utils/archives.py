@@ -0,0 +1,83 @@
+"""
+Stream text members out of zip, tar and gzip archives without extracting them.
+
+Members are opened one at a time and decoded line by line, so memory per
+member stays bounded by the longest line. Member names are filtered with the
+same extension and exclude rules as files on disk.
+"""
+from __future__ import annotations
+
+from pathlib import Path, PurePosixPath
+from typing import IO, Iterable, Iterator, Set, Tuple
+
+from .file_discovery import is_excluded
+
+
+ARCHIVE_SUFFIXES: Set[str] = {".zip", ".tar", ".tgz", ".gz"}
+
+
+def is_archive(path: Path) -> bool:
+    return path.suffix.lower() in ARCHIVE_SUFFIXES
+
+
+def _wanted(name: str, extensions: Set[str] | None, exclude_patterns: Iterable[str]) -> bool:
+    if extensions and PurePosixPath(name).suffix.lower() not in extensions:
+        return False
+    return not is_excluded(name, exclude_patterns)
+
+
+def iter_archive_members(
+    path: Path,
+    extensions: Set[str] | None = None,
+    exclude_patterns: Iterable[str] = (),
+) -> Iterator[Tuple[str, IO[bytes]]]:
+    """
+    Yield (member name, binary stream) for each matching regular-file member.
+
+    Each stream is only valid until the next member is requested.
+    """
+    # Imported here: scans without archives never pay for these modules
+    import gzip
+    import tarfile
+    import zipfile
+
+    exclude_patterns = list(exclude_patterns)
+    name = path.name.lower()
+    if name.endswith(".zip"):
+        with zipfile.ZipFile(path) as zf:
+            for info in zf.infolist():
+                if info.is_dir() or not _wanted(info.filename, extensions, exclude_patterns):
+                    continue
+                with zf.open(info) as stream:
+                    yield info.filename, stream
+    elif name.endswith((".tar", ".tgz", ".tar.gz")):
+        # Stream mode reads members sequentially without seeking
+        with tarfile.open(path, mode="r|*") as tf:
+            for member in tf:
+                if not member.isfile() or not _wanted(member.name, extensions, exclude_patterns):
+                    continue
+                stream = tf.extractfile(member)
+                if stream is not None:
+                    with stream:
+                        yield member.name, stream
+    elif name.endswith(".gz"):
+        inner = path.name[: -len(".gz")]
+        if _wanted(inner, extensions, exclude_patterns):
+            with gzip.open(path, "rb") as stream:
+                yield inner, stream  # type: ignore[misc]
+
+
+def iter_member_lines(stream: IO[bytes]) -> Iterator[Tuple[int, str]]:
+    """
+    Decode a member stream as UTF-8 and yield (1-based line number, text).
+
+    Lines are read as bytes and decoded one at a time (UTF-8 never splits a
+    code point across a newline byte); this also works on non-seekable tar
+    stream members, which io.TextIOWrapper rejects.
+    """
+    for i, raw in enumerate(iter(stream.readline, b""), start=1):
+        if raw.endswith(b"\n"):
+            raw = raw[:-1]
+        if raw.endswith(b"\r"):
+            raw = raw[:-1]
+        yield i, raw.decode("utf-8", errors="replace")
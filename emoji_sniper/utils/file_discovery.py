@@ -6,17 +6,34 @@ Modeled after ../tagex with small adaptations.
 from __future__ import annotations
 
 from pathlib import Path
-from typing import List, Set, Union
+from typing import Iterable, List, Set, Tuple, Union
 import fnmatch
 
+from .ignore import IgnoreMatcher
+
 
 DEFAULT_EXCLUDES: Set[str] = {".obsidian", ".git", ".DS_Store", "__pycache__", "node_modules"}
 
 
+def is_excluded(rel: str, exclude_patterns: Iterable[str]) -> bool:
+    """Match a relative path against glob ("dir/*" or fnmatch) or substring excludes."""
+    for pat in exclude_patterns:
+        if pat.endswith("/*"):
+            d = pat[:-2]
+            if rel.startswith(d + "/") or rel == d:
+                return True
+        elif fnmatch.fnmatch(rel, pat):
+            return True
+        elif pat in rel:
+            return True
+    return False
+
+
 def find_files(
     root_path: str | Path,
     extensions: Union[Set[str], List[str], None] = None,
     exclude_patterns: Union[Set[str], List[str], None] = None,
+    respect_ignore: bool = False,
 ) -> List[Path]:
     """
     Recursively find files with given extensions under root_path.
@@ -25,6 +42,8 @@ def find_files(
         root_path: Directory to scan
         extensions: File extensions to include (like {".md", ".txt"}); if None, include all
         exclude_patterns: Glob-like patterns or substrings to exclude
+        respect_ignore: Honor .gitignore/.sniperignore files at and below root_path;
+            ignored directories are pruned without being opened
 
     Returns:
         Sorted list of Paths
@@ -54,22 +73,19 @@ def find_files(
 
     def should_exclude(path: Path) -> bool:
         rel = str(path.relative_to(root)) if path != root else ""
-        for pat in exclude_patterns:  # type: ignore[arg-type]
-            if pat.endswith("/*"):
-                d = pat[:-2]
-                if rel.startswith(d + "/") or rel == d:
-                    return True
-            elif fnmatch.fnmatch(rel, pat):
-                return True
-            elif pat in rel:
-                return True
-        return False
+        return is_excluded(rel, exclude_patterns)  # type: ignore[arg-type]
 
-    def walk(dirpath: Path) -> None:
+    def walk(dirpath: Path, matcher: IgnoreMatcher | None, rel_dir: str) -> None:
+        if matcher is not None:
+            matcher = matcher.child(dirpath, rel_dir)
         try:
             for item in dirpath.iterdir():
                 if should_exclude(item):
                     continue
+                rel = f"{rel_dir}/{item.name}" if rel_dir else item.name
+                if matcher is not None and matcher.rules:
+                    if matcher.is_ignored(rel, item.is_dir()):
+                        continue
                 if item.is_file():
                     if not extensions:
                         results.append(item)
@@ -77,9 +93,59 @@ def find_files(
                         if item.suffix.lower() in extensions:  # type: ignore[operator]
                             results.append(item)
                 elif item.is_dir():
-                    walk(item)
+                    walk(item, matcher, rel)
         except PermissionError:
             return
 
-    walk(root)
+    walk(root, IgnoreMatcher() if respect_ignore else None, "")
     return sorted(results)
+
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """
+    Parse a shard spec like "2/4" into (k, n) with 1 <= k <= n.
+
+    Raises:
+        ValueError: if the spec is malformed or out of range
+    """
+    try:
+        k_str, n_str = spec.split("/", 1)
+        k, n = int(k_str), int(n_str)
+    except ValueError:
+        raise ValueError(f"Invalid shard spec (expected K/N): {spec!r}") from None
+    if n < 1 or not 1 <= k <= n:
+        raise ValueError(f"Shard out of range (need 1 <= K <= N): {spec!r}")
+    return k, n
+
+
+def shard_index(rel_path: str, n: int) -> int:
+    """Stable 0-based shard for a relative POSIX path, independent of discovery order."""
+    import hashlib
+
+    digest = hashlib.blake2b(rel_path.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % n
+
+
+def select_shard(
+    files: Iterable[Path], root_path: str | Path, shard: Tuple[int, int] | None
+) -> List[Path]:
+    """
+    Keep only files assigned to shard (k, n), hashing paths relative to root_path.
+
+    Order of the input is preserved; shard=None returns all files.
+    """
+    files = list(files)
+    if shard is None:
+        return files
+    k, n = shard
+    root = Path(root_path)
+    base = root if root.is_dir() else root.parent
+    out: List[Path] = []
+    for fp in files:
+        try:
+            rel = fp.relative_to(base).as_posix()
+        except ValueError:
+            rel = fp.as_posix()
+        if shard_index(rel, n) == k - 1:
+            out.append(fp)
+    return out
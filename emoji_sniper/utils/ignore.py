@@ -0,0 +1,148 @@
+"""
+Hierarchical ignore files (.gitignore, .sniperignore) with gitignore semantics.
+
+Supported:
+- Comments (#) and blank lines; `\\#` and `\\!` escape a leading # or !.
+- `!pattern` re-includes a path excluded by an earlier rule (last match wins).
+- Trailing `/` restricts a rule to directories.
+- A leading or middle `/` anchors the rule to the ignore file's directory;
+  otherwise it matches the name at any depth below it.
+- `*`, `?`, `[...]` within one path segment and `**` across segments.
+
+Each directory's ignore files are compiled once when the walker enters it; the
+resulting matcher is shared by every entry in that directory and extended for
+its subdirectories. Ignored directories are pruned and never opened.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Tuple
+import re
+
+
+IGNORE_FILES: Tuple[str, ...] = (".gitignore", ".sniperignore")
+
+
+@dataclass(frozen=True)
+class IgnoreRule:
+    regex: re.Pattern[str]
+    negate: bool
+    dir_only: bool
+    base: str  # Directory of the ignore file, relative to root ("" or "a/b/")
+
+
+def _segment_to_regex(seg: str) -> str:
+    out: List[str] = []
+    i, n = 0, len(seg)
+    while i < n:
+        c = seg[i]
+        if c == "*":
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            out.append(re.escape(seg[i]))
+        elif c == "[":
+            j = seg.find("]", i + 2 if i + 1 < n and seg[i + 1] in "!^" else i + 1)
+            if j == -1:
+                out.append(re.escape(c))
+            else:
+                body = seg[i + 1 : j]
+                if body[:1] in ("!", "^"):
+                    body = "^" + body[1:]
+                out.append("[" + body.replace("\\", "\\\\") + "]")
+                i = j
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+def translate(pattern: str) -> Tuple[str, bool]:
+    """
+    Translate a gitignore pattern body (no `!`, no trailing `/`) to a regex.
+
+    Returns (regex source, anchored).
+    """
+    anchored = "/" in pattern
+    pattern = pattern.lstrip("/")
+    segs = pattern.split("/")
+    parts: List[str] = []
+    last = len(segs) - 1
+    for idx, seg in enumerate(segs):
+        if seg == "**":
+            parts.append(".*" if idx == last else "(?:.*/)?")
+            continue
+        parts.append(_segment_to_regex(seg))
+        if idx != last:
+            parts.append("/")
+    body = "".join(parts)
+    if not anchored:
+        body = "(?:.*/)?" + body
+    return body, anchored
+
+
+def parse_ignore_lines(lines: List[str], base: str) -> List[IgnoreRule]:
+    rules: List[IgnoreRule] = []
+    for raw in lines:
+        s = raw.rstrip("\n").rstrip("\r")
+        # Trailing spaces are ignored unless escaped
+        while s.endswith(" ") and not s.endswith("\\ "):
+            s = s[:-1]
+        if not s or s.startswith("#"):
+            continue
+        negate = False
+        if s.startswith("!"):
+            negate = True
+            s = s[1:]
+        elif s.startswith("\\#") or s.startswith("\\!"):
+            s = s[1:]
+        dir_only = s.endswith("/")
+        s = s.rstrip("/")
+        if not s:
+            continue
+        src, _ = translate(s)
+        rules.append(IgnoreRule(re.compile(src, re.DOTALL), negate, dir_only, base))
+    return rules
+
+
+class IgnoreMatcher:
+    """Ordered ignore rules in effect for one directory level."""
+
+    def __init__(self, rules: Tuple[IgnoreRule, ...] = ()) -> None:
+        self.rules = rules
+
+    def child(self, dirpath: Path, rel: str) -> "IgnoreMatcher":
+        """
+        Matcher for ``dirpath`` (``rel`` is its POSIX path relative to root, or
+        ""), adding rules from any ignore files it contains.
+        """
+        base = rel + "/" if rel else ""
+        added: List[IgnoreRule] = []
+        for name in IGNORE_FILES:
+            p = dirpath / name
+            try:
+                with open(p, "r", encoding="utf-8", errors="replace") as f:
+                    added.extend(parse_ignore_lines(f.readlines(), base))
+            except (FileNotFoundError, NotADirectoryError, PermissionError):
+                continue
+        if not added:
+            return self
+        return IgnoreMatcher(self.rules + tuple(added))
+
+    def is_ignored(self, rel: str, is_dir: bool) -> bool:
+        """Whether POSIX path ``rel`` (relative to root) is ignored; last match wins."""
+        for rule in reversed(self.rules):
+            if rule.dir_only and not is_dir:
+                continue
+            if rule.base:
+                if not rel.startswith(rule.base):
+                    continue
+                sub = rel[len(rule.base) :]
+            else:
+                sub = rel
+            if rule.regex.fullmatch(sub):
+                return not rule.negate
+        return False
@@ -1,37 +1,122 @@
+"""
+Logging configuration for the CLI.
+
+All records go through a QueueHandler on the root logger; a QueueListener
+thread owns the real handlers (console and optional rotating file), so file
+I/O never happens on the scanning thread. File logging is opt-in via
+``log_path``. An optional JSON-lines format and per-file sampling keep very
+large runs manageable.
+"""
 from __future__ import annotations
 
+import atexit
+import json
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 
 
-def setup_logging(verbosity: int = 0, log_path: Path | None = None) -> None:
+_listener: QueueListener | None = None
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Format records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        file_index = getattr(record, "file_index", None)
+        if file_index is not None:
+            payload["file_index"] = file_index
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False)
+
+
+class FileSampleFilter(logging.Filter):
+    """
+    Keep only every Nth per-file record.
+
+    Records that carry a ``file_index`` attribute (passed via ``extra=``) are
+    dropped unless ``file_index % every == 0``. Records without it always pass.
+    """
+
+    def __init__(self, every: int) -> None:
+        super().__init__()
+        self.every = max(1, int(every))
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        file_index = getattr(record, "file_index", None)
+        if file_index is None or self.every == 1:
+            return True
+        return file_index % self.every == 0
+
+
+def stop_logging() -> None:
+    """Flush and stop the background listener, if running."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def setup_logging(
+    verbosity: int = 0,
+    log_path: Path | None = None,
+    log_format: str = "text",
+    sample_every: int = 1,
+) -> None:
     level = logging.WARNING
     if verbosity >= 2:
         level = logging.DEBUG
     elif verbosity == 1:
         level = logging.INFO
 
-    log_dir = Path("log")
-    log_dir.mkdir(parents=True, exist_ok=True)
-    logfile = log_path or (log_dir / "emoji-sniper.log")
+    if log_format == "json":
+        fmt: logging.Formatter = JsonLinesFormatter()
+    else:
+        fmt = logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
 
-    fmt = logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+    handlers: list[logging.Handler] = []
 
     # Console handler
     ch = logging.StreamHandler()
     ch.setLevel(level)
     ch.setFormatter(fmt)
+    handlers.append(ch)
+
+    # Rotating file handler (5 files x 1MB), only when requested
+    if log_path is not None:
+        log_path = Path(log_path)
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        fh = RotatingFileHandler(log_path, maxBytes=1_000_000, backupCount=5, encoding="utf-8")
+        fh.setLevel(level)
+        fh.setFormatter(fmt)
+        handlers.append(fh)
 
-    # Rotating file handler (5 files x 1MB)
-    fh = RotatingFileHandler(logfile, maxBytes=1_000_000, backupCount=5, encoding="utf-8")
-    fh.setLevel(level)
-    fh.setFormatter(fmt)
+    stop_logging()
+
+    q: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    qh = QueueHandler(q)
+    qh.setLevel(level)
+    if sample_every > 1:
+        qh.addFilter(FileSampleFilter(sample_every))
 
     root = logging.getLogger()
     # Clear existing handlers to avoid duplicate logs in repeated runs/tests
     for h in list(root.handlers):
         root.removeHandler(h)
     root.setLevel(level)
-    root.addHandler(ch)
-    root.addHandler(fh)
+    root.addHandler(qh)
+
+    global _listener
+    _listener = QueueListener(q, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+atexit.register(stop_logging)
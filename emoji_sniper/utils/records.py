@@ -0,0 +1,149 @@
+"""
+Stream records out of JSONL, CSV and SQLite sources.
+
+Every reader yields ``(record id, {field: text})`` one row at a time and never
+holds more than the current row (SQLite rows are fetched ``batch_size`` at a
+time). Only string values are kept; numbers, nulls, blobs and nested JSON
+objects are not text to police.
+"""
+from __future__ import annotations
+
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+import csv
+import json
+import logging
+import sqlite3
+
+
+logger = logging.getLogger(__name__)
+
+Record = Tuple[str, Dict[str, str]]
+
+_SUFFIX_FORMATS = {
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".csv": "csv",
+    ".sqlite": "sqlite",
+    ".sqlite3": "sqlite",
+    ".db": "sqlite",
+}
+
+
+def detect_format(path: Path) -> str:
+    fmt = _SUFFIX_FORMATS.get(Path(path).suffix.lower())
+    if fmt is None:
+        raise ValueError(f"Cannot tell the input format of {path}; pass --input-format")
+    return fmt
+
+
+def _pick(
+    row: Dict[str, object], fields: Sequence[str] | None, id_field: str | None
+) -> Dict[str, str]:
+    # Without an explicit field list every text field except the id is scanned
+    keys = fields if fields else [k for k in row if k != id_field]
+    return {k: v for k in keys if isinstance(v := row.get(k), str)}
+
+
+def iter_jsonl(
+    path: Path, fields: Sequence[str] | None = None, id_field: str | None = None
+) -> Iterator[Record]:
+    """
+    One JSON object per line. The id is ``id_field`` when present, otherwise
+    the 1-based line number. Malformed lines are logged and skipped.
+    """
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for ln, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                logger.warning("%s:%d: skipping malformed JSON: %s", path, ln, e)
+                continue
+            if not isinstance(row, dict):
+                continue
+            rid = row.get(id_field) if id_field else None
+            yield (str(rid) if rid is not None else str(ln)), _pick(row, fields, id_field)
+
+
+def iter_csv(
+    path: Path, fields: Sequence[str] | None = None, id_field: str | None = None
+) -> Iterator[Record]:
+    """Rows of a CSV with a header line; the default id is the 1-based data row."""
+    with open(path, "r", encoding="utf-8", errors="replace", newline="") as f:
+        reader = csv.DictReader(f)
+        for n, row in enumerate(reader, start=1):
+            rid = row.get(id_field) if id_field else None
+            yield (rid if rid is not None else str(n)), _pick(row, fields, id_field)
+
+
+def _quote(ident: str) -> str:
+    return '"' + ident.replace('"', '""') + '"'
+
+
+def iter_sqlite(
+    path: Path,
+    table: str,
+    fields: Sequence[str] | None = None,
+    id_field: str | None = None,
+    batch_size: int = 1000,
+) -> Iterator[Record]:
+    """
+    Rows of ``table``; the default id is the rowid. The database is opened
+    read-only and rows are fetched ``batch_size`` at a time.
+    """
+    db = sqlite3.connect(f"file:{Path(path).as_posix()}?mode=ro", uri=True)
+    try:
+        columns = [r[1] for r in db.execute(f"PRAGMA table_info({_quote(table)})")]
+        if not columns:
+            raise ValueError(f"No such table in {path}: {table}")
+        wanted = list(fields) if fields else [c for c in columns if c != id_field]
+        missing = [c for c in wanted if c not in columns] + (
+            [id_field] if id_field and id_field not in columns else []
+        )
+        if missing:
+            raise ValueError(f"No such column in {table}: {', '.join(missing)}")
+        id_expr = _quote(id_field) if id_field else "rowid"
+        select = ", ".join([id_expr, *map(_quote, wanted)])
+        cur = db.execute(f"SELECT {select} FROM {_quote(table)}")
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield str(row[0]), {
+                    k: v for k, v in zip(wanted, row[1:], strict=True) if isinstance(v, str)
+                }
+    finally:
+        db.close()
+
+
+def iter_records(
+    path: Path,
+    fmt: str,
+    fields: Sequence[str] | None = None,
+    id_field: str | None = None,
+    table: str | None = None,
+    batch_size: int = 1000,
+) -> Iterator[Record]:
+    if fmt == "jsonl":
+        return iter_jsonl(path, fields, id_field)
+    if fmt == "csv":
+        return iter_csv(path, fields, id_field)
+    if fmt == "sqlite":
+        if not table:
+            raise ValueError("SQLite input needs --table")
+        return iter_sqlite(path, table, fields, id_field, batch_size)
+    raise ValueError(f"Unknown record format: {fmt}")
+
+
+def batched(records: Iterable[Record], size: int) -> Iterator[List[Record]]:
+    """Group records into lists of at most ``size``."""
+    it = iter(records)
+    while True:
+        batch = list(islice(it, max(size, 1)))
+        if not batch:
+            return
+        yield batch
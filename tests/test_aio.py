@@ -0,0 +1,72 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from emoji_sniper.core import Sniper, scan_paths_async, scan_text_async
+from emoji_sniper.core.aio import process_pool
+
+
+def _sniper(tmp_path: Path) -> Sniper:
+    banned = tmp_path / "banned.txt"
+    banned.write_text("😀\n⭐\n", encoding="utf-8")
+    return Sniper.from_files(banned)
+
+
+def _vault(tmp_path: Path, n: int = 6):
+    paths = []
+    for i in range(n):
+        p = tmp_path / f"doc{i}.md"
+        p.write_text(f"doc {i} 😀\n{'⭐' * i}\n", encoding="utf-8")
+        paths.append(p)
+    return paths
+
+
+def test_scan_paths_async_matches_sync_scan_in_order(tmp_path: Path):
+    sniper = _sniper(tmp_path)
+    paths = _vault(tmp_path)
+    expected = [o for p in paths for o in sniper.scan_bytes(p.read_bytes(), str(p))]
+
+    async def collect(**kwargs):
+        return [o async for o in scan_paths_async(sniper, paths, concurrency=2, **kwargs)]
+
+    assert asyncio.run(collect()) == expected
+    with process_pool(sniper, 2) as pool:
+        assert asyncio.run(collect(executor=pool)) == expected
+    assert asyncio.run(scan_text_async(sniper, "hi 😀", label="up")) == sniper.scan_text(
+        "hi 😀", "up"
+    )
+
+
+def test_scan_paths_async_backpressure_and_deadline(tmp_path: Path):
+    sniper = _sniper(tmp_path)
+    paths = _vault(tmp_path, 10)
+    pulled = []
+
+    def source():
+        for p in paths:
+            pulled.append(p)
+            yield p
+
+    async def first_then_close():
+        gen = scan_paths_async(sniper, source(), concurrency=3)
+        await gen.__anext__()
+        await asyncio.sleep(0.05)
+        # Only the files in flight were read ahead of the consumer
+        assert len(pulled) == 3
+        await gen.aclose()
+
+    asyncio.run(first_then_close())
+
+    class SlowExecutor(ThreadPoolExecutor):
+        def submit(self, fn, *args):
+            return super().submit(lambda: (time.sleep(0.5), fn(*args))[1])
+
+    async def slow():
+        with SlowExecutor(1) as ex:
+            return [o async for o in scan_paths_async(sniper, paths, executor=ex, timeout=0.05)]
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(slow())
@@ -54,3 +54,51 @@ def test_single_llama_still_banned(tmp_path: Path):
     assert stats["occurrences"] == 1
     assert any(r.char == "🦙" for r in results)
 
+
+def test_allowlist_trie_regex_and_trie_walk_agree(monkeypatch):
+    from emoji_sniper.core import allowed_parser
+    from emoji_sniper.core.allowed_parser import AllowedMatcher, AllowedSpec, build_trie_regex
+
+    assert build_trie_regex(["✨ brilliant", "✨ shiny", "a", "ab", "x", "y"]).pattern == (
+        r"(?:a(?:b)?|✨\ (?:brilliant|shiny)|[xy])"
+    )
+
+    words = [f"🦙 item{i}" for i in range(600)] + ["🦙 item1 plus", "🦙"]
+    spec = AllowedSpec(tuple(words), (r"`[^`]*`",))
+    text = "x 🦙 item1 plus 🦙 item7 🦙🦙 item599 `code 🦙`"
+
+    walk = AllowedMatcher(spec)
+    monkeypatch.setattr(allowed_parser, "TRIE_REGEX_MAX", len(words))
+    nested = AllowedMatcher(spec)
+    assert walk.literal_trie is not None and nested.literal_pattern is not None
+
+    # Longest literal wins; raw regex spans are reported alongside
+    spans = sorted(walk.spans(text))
+    assert spans == sorted(nested.spans(text))
+    assert [text[s:e] for s, e in spans] == [
+        "🦙 item1 plus",
+        "🦙 item7",
+        "🦙",
+        "🦙 item599",
+        "`code 🦙`",
+        "🦙",
+    ]
+
+
+def test_allowlist_overlapping_literal_and_regex_entries():
+    from emoji_sniper.core.allowed_parser import AllowedSpec
+    from emoji_sniper.core.banned_parser import BannedSpec
+    from emoji_sniper.core.engine import Sniper
+
+    banned = BannedSpec(((0x1F680, 0x1F680), (0x2728, 0x2728)), ())
+
+    # "xy" is the longest literal at 0, so "y🚀" starting inside it is never tried
+    sniper = Sniper(banned, AllowedSpec(("x", "xy", "y🚀"), ()))
+    assert [o.char for o in sniper.scan_text("xy🚀")] == ["🚀"]
+    assert sniper.scan_text("y🚀") == []
+
+    # The regex pass runs independently and may start inside a literal span
+    sniper = Sniper(banned, AllowedSpec(("✨ star",), (r"star ✨",)))
+    assert sniper.scan_text("✨ star ✨") == []
+    sniper = Sniper(banned, AllowedSpec(("✨ star",), ()))
+    assert [o.col for o in sniper.scan_text("✨ star ✨")] == [8]
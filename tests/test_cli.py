@@ -134,3 +134,204 @@ def test_cli_accepts_single_file(tmp_path: Path, capsys):
     assert code == 0
     out = capsys.readouterr().out.strip().splitlines()
     assert out == [str(file_path)]
+
+
+def test_cli_substitute_from_report_detects_stale(tmp_path: Path, capsys):
+    import os
+
+    vault = tmp_path / "vault"
+    vault.mkdir()
+    (vault / "a.md").write_text("keep\nHi ⭐\nkeep ⭐\n", encoding="utf-8")
+    (vault / "b.md").write_text("Yo ⭐\n", encoding="utf-8")
+    (vault / "clean.md").write_text("nothing\n", encoding="utf-8")
+    banned = tmp_path / "banned.txt"
+    banned.write_text("\\U00002B00-\\U00002BFF\n", encoding="utf-8")
+    subs = tmp_path / "subs.json"
+    subs.write_text('{"map": {"⭐": "*"}}', encoding="utf-8")
+    reports = tmp_path / "reports"
+
+    assert main([
+        "scan", str(vault), "--banned", str(banned), "--report", "--report-dir", str(reports),
+    ]) == 0
+    report = next(reports.glob("emoji-scan_*.json"))
+    data = json.loads(report.read_text(encoding="utf-8"))
+    assert sorted(Path(m["file"]).name for m in data["files"]) == ["a.md", "b.md"]
+    capsys.readouterr()
+
+    # b.md changes after the scan; its entry is stale and must be left alone
+    b = vault / "b.md"
+    b.write_text("Yo ⭐ edited\n", encoding="utf-8")
+    os.utime(b, ns=(0, 0))
+
+    code = main([
+        "substitute", "--banned", str(banned), "--map", str(subs), "--from-report", str(report),
+    ])
+    assert code == 1
+    out = capsys.readouterr().out
+    assert "Files: 2 | Changed: 1 | Replacements: 2" in out
+    assert "Stale: 1" in out
+    assert (vault / "a.md").read_text(encoding="utf-8") == "keep\nHi *\nkeep *\n"
+    assert b.read_text(encoding="utf-8") == "Yo ⭐ edited\n"
+
+
+def test_cli_shards_merge_to_single_node_report(tmp_path: Path, capsys):
+    vault = tmp_path / "vault"
+    (vault / "sub").mkdir(parents=True)
+    for i in range(8):
+        (vault / f"n{i}.md").write_text(f"{i} 😀\nx 😃 y 😀\n", encoding="utf-8")
+        (vault / "sub" / f"s{i}.md").write_text("😀\n", encoding="utf-8")
+    banned = tmp_path / "banned.txt"
+    banned.write_text("\\U0001F600-\\U0001F64F\n", encoding="utf-8")
+
+    def scan_report(out_dir: Path, *extra: str) -> dict:
+        assert main([
+            "scan", str(vault), "--banned", str(banned), "--no-names",
+            "--report", "--report-dir", str(out_dir), *extra,
+        ]) == 0
+        return json.loads(next(out_dir.glob("*.json")).read_text(encoding="utf-8"))
+
+    full = scan_report(tmp_path / "full")
+    shard_paths = []
+    for k in (1, 2, 3):
+        d = tmp_path / f"shard{k}"
+        scan_report(d, "--shard", f"{k}/3")
+        shard_paths.append(str(next(d.glob("*.json"))))
+    capsys.readouterr()
+
+    merged_path = tmp_path / "merged.json"
+    assert main(["merge-reports", *shard_paths, "-o", str(merged_path)]) == 0
+    merged = json.loads(merged_path.read_text(encoding="utf-8"))
+    assert merged["stats"] == full["stats"]
+    assert merged["files"] == full["files"]
+    assert merged["results"] == full["results"]
+
+
+def test_merge_reports_reads_shards_incrementally(tmp_path: Path, monkeypatch):
+    import io
+
+    from emoji_sniper.core import merge
+
+    shards = []
+    for k in range(3):
+        report = {
+            "stats": {"files_scanned": 2, "occurrences": 2, "truncated": k == 1, "shard": "x"},
+            "files": [
+                {"file": f"d/{k}{n}.md", "size": 10 ** 12 + k, "mtime_ns": n} for n in (0, 1)
+            ],
+            "results": [
+                {"file": f"d/{k}{n}.md", "line": 1, "col": 3, "char": "😀", "note": "a,]}\"\\"}
+                for n in (0, 1)
+            ],
+        }
+        path = tmp_path / f"s{k}.json"
+        path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        shards.append(path)
+
+    # Tiny reads put chunk boundaries inside strings, numbers and escapes
+    monkeypatch.setattr(merge, "READ_CHUNK", 7)
+    monkeypatch.setattr(json, "load", None)  # nothing may read a shard whole
+    out = io.StringIO()
+    stats = merge.merge_reports(shards, out)
+    merged = json.loads(out.getvalue())
+    assert stats == {"files_scanned": 6, "occurrences": 6, "truncated": True}
+    names = [f"d/{k}{n}.md" for k in range(3) for n in (0, 1)]
+    assert [f["file"] for f in merged["files"]] == names
+    assert merged["files"][2]["size"] == 10 ** 12 + 1
+    assert len(merged["results"]) == 6 and merged["results"][0]["note"] == 'a,]}"\\'
+
+
+def test_cli_named_profiles_single_pass(tmp_path: Path, capsys):
+    vault = tmp_path / "vault"
+    vault.mkdir()
+    (vault / "a.md").write_text("Hi 😀 “quoted”\n", encoding="utf-8")
+    (vault / "b.md").write_text("bidi ‮ here\n", encoding="utf-8")
+    emoji = tmp_path / "emoji.txt"
+    emoji.write_text("\\U0001F600-\\U0001F64F\n", encoding="utf-8")
+    sections = tmp_path / "more.txt"
+    sections.write_text("[quotes]\n“”\n[bidi]\n\\U0000202A-\\U0000202E\n", encoding="utf-8")
+    reports = tmp_path / "reports"
+
+    code = main([
+        "scan", str(vault), "--banned", f"emoji={emoji}", "--banned", f"quotes={sections}",
+        "--no-names", "--report", "--report-dir", str(reports), "--fail-on-find=emoji",
+    ])
+    assert code == 1
+    payload = json.loads(capsys.readouterr().out)
+    # Sections are merged when a file is given a profile name
+    assert payload["stats"]["profiles"] == {"emoji": 1, "quotes": 3}
+    assert [r["profile"] for r in payload["results"]] == ["emoji", "quotes", "quotes", "quotes"]
+    names = sorted(p.name.split("_")[0] for p in reports.glob("*.json"))
+    assert names == ["emoji-scan", "emoji-scan-emoji", "emoji-scan-quotes"]
+
+    # One file with [sections] yields one profile per section
+    code = main(["scan", str(vault), "--banned", str(sections), "--fail-on-find=emoji"])
+    assert code == 0
+    payload = json.loads(capsys.readouterr().out)
+    assert payload["stats"]["profiles"] == {"quotes": 2, "bidi": 1}
+
+
+def test_cli_scan_sarif_dedupes_rules(tmp_path: Path, capsys):
+    vault = tmp_path / "vault"
+    (vault / "sub").mkdir(parents=True)
+    (vault / "a.md").write_text("😀 😀\n🚀\n", encoding="utf-8")
+    (vault / "sub" / "b.md").write_text("x 😀\n", encoding="utf-8")
+    banned = tmp_path / "banned.txt"
+    banned.write_text("[faces]\n\\U0001F600-\\U0001F64F\n[travel]\n🚀\n", encoding="utf-8")
+
+    code = main(["scan", str(vault), "--banned", str(banned), "--format", "sarif"])
+    assert code == 0
+    run = json.loads(capsys.readouterr().out)["runs"][0]
+    rules = run["tool"]["driver"]["rules"]
+    assert [r["id"] for r in rules] == ["U+1F600", "U+1F680"]
+    assert rules[0]["properties"] == {
+        "char": "😀", "name": "GRINNING FACE", "block": "Emoticons"
+    }
+    assert [a["location"]["uri"] for a in run["artifacts"]] == ["a.md", "sub/b.md"]
+    assert len(run["results"]) == 4
+    last = run["results"][-1]
+    assert last["ruleIndex"] == 0 and last["properties"] == {"profile": "faces"}
+    loc = last["locations"][0]["physicalLocation"]
+    assert loc["artifactLocation"]["index"] == 1
+    # A single code point spans exactly one column, not the rest of the line
+    assert loc["region"] == {"startLine": 1, "startColumn": 3, "endColumn": 4}
+    assert run["invocations"][0]["properties"]["occurrences"] == 4
+
+
+def test_cli_scan_checkstyle_streams_per_file(tmp_path: Path, capsys):
+    import xml.etree.ElementTree as ET
+
+    from emoji_sniper.core.engine import Occurrence
+    from emoji_sniper.core.output import write_checkstyle
+
+    vault = tmp_path / "vault"
+    vault.mkdir()
+    (vault / "a.md").write_text("😀 & 😃\n", encoding="utf-8")
+    (vault / "b.md").write_text("fine\n", encoding="utf-8")
+    banned = tmp_path / "banned.txt"
+    banned.write_text("\\U0001F600-\\U0001F64F\n", encoding="utf-8")
+
+    assert main(["scan", str(vault), "--banned", str(banned), "--format", "checkstyle"]) == 0
+    root = ET.fromstring(capsys.readouterr().out)
+    (file_el,) = root.findall("file")
+    assert file_el.get("name").endswith("a.md")
+    assert [(e.get("column"), e.get("source")) for e in file_el] == [
+        ("1", "emoji-sniper.U+1F600"),
+        ("5", "emoji-sniper.U+1F603"),
+    ]
+
+    # Each result is written before the next one is requested
+    class Out:
+        text = ""
+
+        def write(self, s):
+            self.text += s
+
+    out = Out()
+
+    def hits():
+        for i in range(1, 3):
+            yield Occurrence("f.md", i, 1, "😀", "U+1F600", None)
+            assert out.text.count("<error") == i
+
+    write_checkstyle(hits(), out)
+    assert out.text.endswith("</checkstyle>\n")
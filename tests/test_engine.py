@@ -0,0 +1,69 @@
+from pathlib import Path
+
+from emoji_sniper.core.allowed_parser import AllowedSpec
+from emoji_sniper.core.banned_parser import BannedSpec
+from emoji_sniper.core.engine import Sniper
+from emoji_sniper.core.substitution_map import RegexRule, SubstitutionMap
+
+
+BANNED = BannedSpec(ranges=((0x1F600, 0x1F64F), (0x2700, 0x27BF)), literals=("✅",))
+
+
+def test_in_memory_scan_has_banned_and_substitute():
+    sniper = Sniper(
+        BANNED,
+        AllowedSpec(sequences=("✨ brilliant",), regexes=()),
+        SubstitutionMap({"✅": "[x]", "😀": ":)"}, (RegexRule("✨+", "*"),)),
+        include_names=True,
+    )
+
+    text = "ok ✅\r\nfine\n✨ brilliant ✨✨ 😀🙃\n"
+    occ = sniper.scan_text(text, label="req")
+    assert [(o.line, o.col, o.char) for o in occ] == [
+        (1, 4, "✅"),
+        (3, 13, "✨"),
+        (3, 14, "✨"),
+        (3, 16, "😀"),
+        (3, 17, "🙃"),
+    ]
+    assert occ[0].file == "req" and occ[0].name == "WHITE HEAVY CHECK MARK"
+    assert [o.char for o in sniper.scan_bytes(text.encode("utf-8"))] == [o.char for o in occ]
+
+    assert sniper.has_banned("ok ✅")
+    assert not sniper.has_banned("plain ascii")
+    assert not sniper.has_banned("✨ brilliant only")
+
+    # Line endings survive; allowed phrase untouched; unmapped 🙃 stays
+    assert sniper.substitute_text(text) == "ok [x]\r\nfine\n✨ brilliant * :)🙃\n"
+
+
+def test_batch_variants_match_single_calls():
+    sniper = Sniper(
+        {"emoji": BANNED, "quotes": BannedSpec(ranges=(), literals=("“", "”"))},
+        AllowedSpec(sequences=(), regexes=(r"`[^`]*`",)),
+        SubstitutionMap({"“": '"', "”": '"'}, ()),
+    )
+    texts = ["plain", "“quoted” 😀", "`✅` in code", "", "naïve", "a\n✅"]
+
+    assert sniper.has_banned_batch(texts) == [sniper.has_banned(t) for t in texts]
+    assert sniper.has_banned_batch(texts) == [False, True, False, False, False, True]
+
+    batches = sniper.scan_texts(texts)
+    assert [len(b) for b in batches] == [0, 3, 0, 0, 0, 1]
+    assert [o.profile for o in batches[1]] == ["quotes", "quotes", "emoji"]
+    assert batches[5][0].file == "<text>[5]" and batches[5][0].line == 2
+
+    assert sniper.substitute_texts(texts) == [sniper.substitute_text(t) for t in texts]
+    assert sniper.substitute_texts(texts)[1] == '"quoted" 😀'
+
+
+def test_from_files_matches_scanner_rules(tmp_path: Path):
+    banned = tmp_path / "banned.txt"
+    banned.write_text("\\U0001F600-\\U0001F64F\n[quotes]\n“\n", encoding="utf-8")
+    sniper = Sniper.from_files(banned)
+    assert sniper.profiles == ["default", "quotes"]
+    assert [o.profile for o in sniper.scan_text("“😀")] == ["quotes", "default"]
+
+    merged = Sniper.from_files(banned, profiles=False)
+    assert merged.profile_groups is None
+    assert len(merged.scan_text("“😀")) == 2
@@ -29,3 +29,60 @@ def test_find_files_with_excludes_and_exts(tmp_path: Path):
     assert not any("node_modules" in p for p in paths)
     assert "private/secret.md" not in paths
 
+
+def test_select_shard_partitions_files(tmp_path: Path):
+    import pytest
+
+    from emoji_sniper.utils.file_discovery import parse_shard, select_shard
+
+    for i in range(20):
+        (tmp_path / f"f{i}.md").write_text("x", encoding="utf-8")
+    files = find_files(tmp_path, extensions={".md"})
+
+    shards = [select_shard(files, tmp_path, (k, 4)) for k in range(1, 5)]
+    assert sorted(p for s in shards for p in s) == files
+    # Assignment does not depend on discovery order
+    assert select_shard(list(reversed(files)), tmp_path, (2, 4)) == list(reversed(shards[1]))
+
+    assert parse_shard("2/4") == (2, 4)
+    with pytest.raises(ValueError):
+        parse_shard("5/4")
+
+
+def test_find_files_respects_ignore_files_and_prunes(tmp_path: Path, monkeypatch):
+    def w(rel: str, text: str = "x") -> None:
+        p = tmp_path / rel
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_text(text, encoding="utf-8")
+
+    w(".gitignore", "build/\n*.log.md\n/top.md\ndocs/**/gen-*.md\n!keep.log.md\n")
+    w("top.md")
+    w("sub/top.md")
+    w("build/out.md")
+    w("a.log.md")
+    w("keep.log.md")
+    w("docs/x/y/gen-1.md")
+    w("docs/x/real.md")
+    w("notes/.sniperignore", "drafts\n!drafts/\n*.txt\n")
+    w("notes/drafts/d.md")
+    w("notes/n.txt")
+    w("notes/n.md")
+
+    opened = []
+    orig_iterdir = Path.iterdir
+
+    def spy(self):
+        opened.append(self.relative_to(tmp_path).as_posix())
+        return orig_iterdir(self)
+
+    monkeypatch.setattr(Path, "iterdir", spy)
+
+    res = find_files(tmp_path, {".md", ".txt"}, set(), respect_ignore=True)
+    paths = {p.relative_to(tmp_path).as_posix() for p in res}
+    assert paths == {
+        "sub/top.md", "keep.log.md", "docs/x/real.md", "notes/drafts/d.md", "notes/n.md"
+    }
+    assert "build" not in opened
+
+    # Without the flag, ignore files have no effect
+    assert len(find_files(tmp_path, {".md", ".txt"}, set())) == 10
@@ -0,0 +1,66 @@
+from pathlib import Path
+import json
+import os
+
+import pytest
+
+from emoji_sniper.core import SniperScanner
+from emoji_sniper.core.index import CodepointIndex, block_of, block_range
+from emoji_sniper.main import main
+
+
+def test_index_incremental_update(tmp_path: Path):
+    vault = tmp_path / "vault"
+    vault.mkdir()
+    (vault / "a.md").write_text("go 🚀\n🇺🇸 flag\n", encoding="utf-8")
+    (vault / "b.md").write_text("plain\n", encoding="utf-8")
+    (vault / "c.md").write_text("🚀🚀\n", encoding="utf-8")
+    banned = tmp_path / "banned.txt"
+    banned.write_text("\\U0001F680-\\U0001F6FF\n\\U0001F1E0-\\U0001F1FF\n", encoding="utf-8")
+
+    scanner = SniperScanner(vault, banned, extensions={".md"})
+    idx = CodepointIndex(tmp_path / "idx.sqlite")
+    stats = idx.update(scanner, rebuild=True)
+    assert (stats.files_indexed, stats.postings) == (3, 5)
+    assert [(Path(r.file).name, r.line, r.col) for r in idx.query(0x1F680)] == [
+        ("a.md", 1, 4), ("c.md", 1, 1), ("c.md", 1, 2),
+    ]
+
+    b = vault / "b.md"
+    b.write_text("now 🚀\n", encoding="utf-8")
+    os.utime(b, ns=(1, 1))
+    (vault / "c.md").unlink()
+    stats = idx.update(scanner)
+    assert (stats.files_indexed, stats.files_unchanged, stats.files_removed) == (1, 1, 1)
+    assert [Path(f).name for f in idx.query_files(0x1F680)] == ["a.md", "b.md"]
+    idx.close()
+
+
+def test_cli_index_query_block(tmp_path: Path, capsys):
+    vault = tmp_path / "vault"
+    vault.mkdir()
+    (vault / "a.md").write_text("🇯🇵 and 🚀\n", encoding="utf-8")
+    banned = tmp_path / "banned.txt"
+    banned.write_text("\\U0001F680-\\U0001F6FF\n\\U0001F1E0-\\U0001F1FF\n", encoding="utf-8")
+    db = tmp_path / "idx.sqlite"
+
+    assert main(["index", "build", str(vault), "--banned", str(banned), "--db", str(db)]) == 0
+    capsys.readouterr()
+    (vault / "a.md").unlink()  # queries never touch the vault
+
+    block = "enclosed alphanumeric supplement"
+    assert main(["index", "query", "--db", str(db), "--block", block]) == 0
+    payload = json.loads(capsys.readouterr().out)
+    assert [r["codepoint"] for r in payload["results"]] == ["U+1F1EF", "U+1F1F5"]
+    assert payload["results"][0]["name"] == "REGIONAL INDICATOR SYMBOL LETTER J"
+
+
+def test_block_lookup_covers_all_blocks():
+    assert block_range("Latin-1 Supplement") == (0x80, 0xFF)
+    assert block_range("latin_1_supplement") == (0x80, 0xFF)
+    assert block_of(0xE9) == "Latin-1 Supplement"
+    assert block_of(0x2460) == "Enclosed Alphanumerics"
+    assert block_of(0x1F1EF) == "Enclosed Alphanumeric Supplement"
+    assert block_of(0x2FE0) is None
+    with pytest.raises(ValueError):
+        block_range("Flags")
@@ -0,0 +1,55 @@
+from pathlib import Path
+import json
+import logging
+
+from emoji_sniper.main import main
+from emoji_sniper.utils.logging_setup import FileSampleFilter
+
+
+def _vault(tmp_path: Path) -> tuple[Path, Path]:
+    vault = tmp_path / "vault"
+    vault.mkdir()
+    for i in range(4):
+        (vault / f"n{i}.md").write_text("Hi 😀", encoding="utf-8")
+    banned = tmp_path / "banned.txt"
+    banned.write_text("\\U0001F600-\\U0001F64F\n", encoding="utf-8")
+    return vault, banned
+
+
+def test_no_log_dir_without_log_file(tmp_path: Path, monkeypatch, capsys):
+    vault, banned = _vault(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    code = main(["scan", str(vault), "--banned", str(banned), "-vv"])
+    assert code == 0
+    assert not (tmp_path / "log").exists()
+
+
+def test_json_log_file_with_sampling(tmp_path: Path, capsys):
+    vault, banned = _vault(tmp_path)
+    log_file = tmp_path / "logs" / "sniper.jsonl"
+    code = main([
+        "scan",
+        str(vault),
+        "--banned",
+        str(banned),
+        "-vv",
+        "--log-file",
+        str(log_file),
+        "--log-format",
+        "json",
+        "--log-sample",
+        "2",
+    ])
+    assert code == 0
+    records = [json.loads(line) for line in log_file.read_text(encoding="utf-8").splitlines()]
+    per_file = [r for r in records if "file_index" in r]
+    assert [r["file_index"] for r in per_file] == [2, 4]
+    assert any(r["msg"] == "Starting scan" for r in records)
+
+
+def test_sample_filter_passes_untagged_records():
+    flt = FileSampleFilter(10)
+    rec = logging.LogRecord("x", logging.DEBUG, __file__, 1, "msg", None, None)
+    assert flt.filter(rec)
+    rec.file_index = 3
+    assert not flt.filter(rec)
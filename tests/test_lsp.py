@@ -0,0 +1,76 @@
+from io import BytesIO
+from pathlib import Path
+import json
+
+from emoji_sniper.core import SniperScanner
+from emoji_sniper.core.substitution_map import SubstitutionMap
+from emoji_sniper.lsp import LanguageServer
+
+
+def frame(msg: dict) -> bytes:
+    body = json.dumps(msg).encode("utf-8")
+    return f"Content-Length: {len(body)}\r\n\r\n".encode("ascii") + body
+
+
+def read_frames(data: bytes) -> list:
+    out = []
+    buf = BytesIO(data)
+    while True:
+        header = buf.readline()
+        if not header:
+            return out
+        length = int(header.split(b":")[1])
+        buf.readline()
+        out.append(json.loads(buf.read(length)))
+
+
+def test_lsp_incremental_diagnostics_and_code_action(tmp_path: Path):
+    banned = tmp_path / "banned.txt"
+    banned.write_text("\\U0001F600-\\U0001F64F\n\\U00002B00-\\U00002BFF\n", encoding="utf-8")
+    allowed = tmp_path / "allowed.txt"
+    allowed.write_text("⭐ Important\n", encoding="utf-8")
+    subs = tmp_path / "subs.json"
+    subs.write_text('{"map": {"⭐": "*"}}', encoding="utf-8")
+
+    scanner = SniperScanner(Path("."), banned, allowed_path=allowed)
+    uri = "file:///note.md"
+    pos = lambda ln, c: {"line": ln, "character": c}  # noqa: E731
+    msgs = [
+        {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {}},
+        {"jsonrpc": "2.0", "method": "textDocument/didOpen", "params": {
+            "textDocument": {"uri": uri, "text": "😀 hi\n⭐ Important\nplain"}}},
+        # Type "⭐" after the emoji on line 0 (the emoji is 2 UTF-16 units)
+        {"jsonrpc": "2.0", "method": "textDocument/didChange", "params": {
+            "textDocument": {"uri": uri},
+            "contentChanges": [{"range": {"start": pos(0, 2), "end": pos(0, 2)}, "text": "⭐"}]}},
+        # Turn "plain" into two lines, the second with a star
+        {"jsonrpc": "2.0", "method": "textDocument/didChange", "params": {
+            "textDocument": {"uri": uri},
+            "contentChanges": [
+                {"range": {"start": pos(2, 5), "end": pos(2, 5)}, "text": "\n⭐ x"}
+            ]}},
+        {"jsonrpc": "2.0", "id": 2, "method": "textDocument/codeAction", "params": {
+            "textDocument": {"uri": uri}, "range": {"start": pos(3, 0), "end": pos(3, 1)},
+            "context": {"diagnostics": [{"source": "emoji-sniper",
+                                         "range": {"start": pos(3, 0), "end": pos(3, 1)}}]}}},
+        {"jsonrpc": "2.0", "id": 3, "method": "shutdown"},
+        {"jsonrpc": "2.0", "method": "exit"},
+    ]
+    out = BytesIO()
+    stdin = BytesIO(b"".join(map(frame, msgs)))
+    server = LanguageServer(scanner, SubstitutionMap.load(subs), stdin, out)
+    assert server.serve() == 0
+
+    replies = read_frames(out.getvalue())
+    init = replies[0]["result"]["capabilities"]
+    assert init["textDocumentSync"]["change"] == 2 and init["codeActionProvider"]
+
+    published = [r["params"]["diagnostics"] for r in replies if r.get("method")]
+    spans = lambda d: [(x["range"]["start"]["line"], x["range"]["start"]["character"]) for x in d]  # noqa: E731
+    assert spans(published[0]) == [(0, 0)]  # allowed "⭐ Important" suppressed
+    assert spans(published[1]) == [(0, 0), (0, 2)]
+    assert spans(published[2]) == [(0, 0), (0, 2), (3, 0)]
+    assert server.documents[uri].lines == ["😀⭐ hi", "⭐ Important", "plain", "⭐ x"]
+
+    action = next(r for r in replies if r.get("id") == 2)["result"][0]
+    assert action["edit"]["changes"][uri][0]["newText"] == "*"
@@ -0,0 +1,54 @@
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from emoji_sniper.core import numpy_engine  # noqa: E402
+from emoji_sniper.core.core import SniperScanner  # noqa: E402
+from emoji_sniper.main import main  # noqa: E402
+
+
+def _key(o):
+    return (o.file, o.line, o.col, o.char, o.codepoint, o.name, o.profile)
+
+
+def test_numpy_engine_matches_regex_engine(tmp_path: Path, monkeypatch):
+    vault = tmp_path / "vault"
+    vault.mkdir()
+    (vault / "a.md").write_text(
+        "Plain\r\nHi 😀 and ✅ ok\rdone ✅\n\n✨ star 😀😃\nno newline 🚀", encoding="utf-8"
+    )
+    (vault / "b.txt").write_bytes(b"bad \xff byte\n" + "😃\n".encode("utf-8"))
+    (vault / "c.md").write_text("".join(f"line {i} 😀\n" for i in range(200)), encoding="utf-8")
+    banned = tmp_path / "banned.txt"
+    banned.write_text(
+        "[faces]\n\\U0001F600-\\U0001F64F\n[marks]\n✅😀\n[misc]\n✨🚀\n",
+        encoding="utf-8",
+    )
+    allowed = tmp_path / "allowed.txt"
+    allowed.write_text("✅ ok\nre:star 😀+\n", encoding="utf-8")
+
+    def scan(engine):
+        scanner = SniperScanner(vault, banned, allowed, include_names=True, engine=engine)
+        results, stats = scanner.scan()
+        return sorted(map(_key, results)), stats
+
+    # A tiny chunk size makes lines straddle read boundaries
+    monkeypatch.setattr(numpy_engine, "CHUNK_BYTES", 7)
+    expected, expected_stats = scan("regex")
+    got, stats = scan("numpy")
+    assert got == expected
+    assert stats == expected_stats
+    assert len(got) == 206 and stats["profiles"] == {"faces": 203, "marks": 1, "misc": 2}
+
+
+def test_numpy_engine_rejects_unsupported_options(tmp_path: Path):
+    banned = tmp_path / "banned.txt"
+    banned.write_text("\\U0001F600-\\U0001F64F\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        SniperScanner(tmp_path, banned, sequences=True, engine="numpy")
+    with pytest.raises(ValueError):
+        SniperScanner(tmp_path, banned, max_total=5, engine="numpy")
+    argv = ["scan", str(tmp_path), "--banned", str(banned), "--engine", "numpy"]
+    assert main([*argv, "--skip-regions", "fences"]) == 2
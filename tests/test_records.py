@@ -0,0 +1,77 @@
+from pathlib import Path
+import json
+import sqlite3
+
+from emoji_sniper.core.banned_parser import BannedSpec
+from emoji_sniper.core.engine import Sniper
+from emoji_sniper.core.records import RecordScanner
+from emoji_sniper.main import main
+from emoji_sniper.utils.records import iter_csv, iter_jsonl, iter_sqlite
+
+
+def test_readers_stream_text_fields(tmp_path: Path):
+    jl = tmp_path / "posts.jsonl"
+    jl.write_text(
+        '{"id": "a1", "title": "Hi 😀", "views": 3}\n'
+        "not json\n"
+        '{"title": "plain", "body": "ok"}\n',
+        encoding="utf-8",
+    )
+    assert list(iter_jsonl(jl, id_field="id")) == [
+        ("a1", {"title": "Hi 😀"}),
+        ("3", {"title": "plain", "body": "ok"}),
+    ]
+
+    csv_path = tmp_path / "comments.csv"
+    csv_path.write_text('cid,text\nc9,"multi\nline 😀"\nc10,fine\n', encoding="utf-8")
+    assert list(iter_csv(csv_path, fields=["text"], id_field="cid")) == [
+        ("c9", {"text": "multi\nline 😀"}),
+        ("c10", {"text": "fine"}),
+    ]
+
+    db_path = tmp_path / "cms.sqlite"
+    db = sqlite3.connect(db_path)
+    db.execute("CREATE TABLE pages (slug TEXT, body TEXT, hits INTEGER)")
+    db.executemany(
+        "INSERT INTO pages VALUES (?, ?, ?)", [(f"p{i}", f"body {i}", i) for i in range(5)]
+    )
+    db.commit()
+    db.close()
+    rows = list(iter_sqlite(db_path, "pages", id_field="slug", batch_size=2))
+    assert rows[0] == ("p0", {"body": "body 0"})
+    assert len(rows) == 5
+
+
+def test_record_scanner_parallel_matches_serial():
+    sniper = Sniper(BannedSpec(ranges=((0x1F600, 0x1F64F),), literals=()))
+    records = [(str(i), {"t": "x 😀" if i % 7 == 0 else "clean", "u": "😃"}) for i in range(50)]
+
+    serial = RecordScanner(sniper, batch_size=8)
+    expected = [(o.record, o.field, o.col) for o in serial.scan(iter(records))]
+    assert serial.stats["records_scanned"] == 50 and serial.stats["fields_scanned"] == 100
+
+    parallel = RecordScanner(sniper, batch_size=8, workers=2)
+    assert [(o.record, o.field, o.col) for o in parallel.scan(iter(records))] == expected
+    assert parallel.stats["occurrences"] == len(expected) == 58
+
+
+def test_cli_scan_records_sqlite(tmp_path: Path, capsys):
+    db_path = tmp_path / "cms.db"
+    db = sqlite3.connect(db_path)
+    db.execute("CREATE TABLE posts (id INTEGER PRIMARY KEY, body TEXT)")
+    db.executemany("INSERT INTO posts (body) VALUES (?)", [("fine",), ("line\nbad 😀",)])
+    db.commit()
+    db.close()
+    banned = tmp_path / "banned.txt"
+    banned.write_text("\\U0001F600-\\U0001F64F\n", encoding="utf-8")
+
+    code = main([
+        "scan-records", str(db_path), "--table", "posts", "--banned", str(banned), "--fail-on-find",
+    ])
+    assert code == 1
+    payload = json.loads(capsys.readouterr().out)
+    assert payload["stats"]["records_scanned"] == 2
+    (hit,) = payload["results"]
+    assert (hit["record"], hit["field"], hit["line"], hit["col"]) == ("2", "body", 2, 5)
+
+    assert main(["scan-records", str(db_path), "--table", "nope", "--banned", str(banned)]) == 2
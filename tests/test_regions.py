@@ -0,0 +1,65 @@
+from pathlib import Path
+
+from emoji_sniper.core import SniperScanner
+from emoji_sniper.core.regions import RegionTracker, inline_code_spans, parse_skip_regions
+from emoji_sniper.core.substitute import Substitutor
+
+
+DOC = """---
+tags: [🚀]
+---
+Intro 😀 and `code 😀` and ``a ` 😀`` end 😀
+```python
+print("😀")
+```
+~~~~
+```
+😀
+~~~~
+After 😀 ` unclosed 😀
+"""
+
+
+def test_region_tracker_states():
+    assert inline_code_spans("a `x` b ``y ` z`` c ` d") == [(2, 5), (8, 17)]
+    tracker = RegionTracker(parse_skip_regions("fences,frontmatter,inline-code"))
+    fed = [tracker.feed(line) for line in DOC.split("\n")]
+    assert fed[:3] == [None, None, None]
+    assert fed[3] == [(12, 20), (25, 34)]
+    # Backtick fence, then a tilde fence that a shorter/other fence cannot close
+    assert fed[4:11] == [None] * 7
+    assert fed[11] == []  # an unmatched backtick opens nothing
+
+
+def test_scan_and_substitute_skip_regions(tmp_path: Path):
+    vault = tmp_path / "vault"
+    vault.mkdir()
+    note = vault / "note.md"
+    note.write_text(DOC, encoding="utf-8")
+    banned = tmp_path / "banned.txt"
+    banned.write_text("\\U0001F600-\\U0001F64F\n\\U0001F680-\\U0001F6FF\n", encoding="utf-8")
+    subs = tmp_path / "subs.json"
+    subs.write_text('{"map": {"😀": ":)"}}', encoding="utf-8")
+
+    kinds = ("fences", "frontmatter", "inline-code")
+    results, _ = SniperScanner(vault, banned, skip_regions=kinds).scan()
+    assert [(r.line, r.col) for r in results] == [(4, 7), (4, 40), (12, 7), (12, 20)]
+    # Without the option every emoji is reported
+    assert len(SniperScanner(vault, banned).scan()[0]) == 9
+
+    stats = Substitutor(vault, banned, subs, skip_regions=kinds).run(dry_run=False)
+    assert stats.replacements == 4 and stats.unmapped_banned == 0
+    out = note.read_text(encoding="utf-8").split("\n")
+    assert out[3] == "Intro :) and `code 😀` and ``a ` 😀`` end :)"
+    assert out[5] == 'print("😀")' and out[9] == "😀"
+
+
+def test_has_banned_batch_respects_skip_regions(tmp_path: Path):
+    from emoji_sniper.core import Sniper
+
+    banned = tmp_path / "banned.txt"
+    banned.write_text("😀\n", encoding="utf-8")
+    sniper = Sniper.from_files(banned, skip_regions=("fences", "inline-code"))
+    texts = ["only `code 😀` here", "```\n😀\n```\n", "bare 😀", "plain"]
+    assert sniper.has_banned_batch(texts) == [sniper.has_banned(t) for t in texts]
+    assert sniper.has_banned_batch(texts) == [False, False, True, False]
@@ -27,3 +27,195 @@ def test_scanner_finds_occurrences(tmp_path: Path):
     files = {r.file for r in results}
     assert str(vault / "a.md") in files
 
+
+def test_scanner_sequences_mode_reports_whole_sequences(tmp_path: Path):
+    vault = tmp_path / "vault"
+    vault.mkdir()
+    (vault / "s.md").write_text(
+        "fam 👨‍👩‍👧‍👦 flag 🇺🇸 ok 👍🏽 warn ⚠️ key 1️⃣ plain ✓️",
+        encoding="utf-8",
+    )
+    banned = tmp_path / "banned.txt"
+    banned.write_text(
+        "\\U0001F300-\\U0001F6FF\n\\U0001F1E0-\\U0001F1FF\n\\U00002600-\\U000026FF\n⚠️\n",
+        encoding="utf-8",
+    )
+
+    per_cp, _ = SniperScanner(vault, banned, extensions={".md"}).scan()
+    results, stats = SniperScanner(
+        vault, banned, extensions={".md"}, include_names=True, sequences=True
+    ).scan()
+
+    assert [r.char for r in results] == ["👨‍👩‍👧‍👦", "🇺🇸", "👍🏽", "⚠️", "1️⃣"]
+    assert stats["occurrences"] == 5 < len(per_cp)
+    fam = results[0]
+    assert fam.length == 7
+    assert fam.codepoints[:3] == ("U+1F468", "U+200D", "U+1F469")
+    assert fam.name == "MAN + WOMAN + GIRL + BOY"
+    assert results[3].codepoints == ("U+26A0", "U+FE0F")
+
+
+def test_scanner_streams_archive_members(tmp_path: Path):
+    import gzip
+    import io
+    import tarfile
+    import zipfile
+
+    vault = tmp_path / "vault"
+    vault.mkdir()
+    with zipfile.ZipFile(vault / "backup.zip", "w") as zf:
+        zf.writestr("notes/a.md", "ok\nHi 😀\n")
+        zf.writestr("notes/skip.bin", "😀")
+        zf.writestr("private/b.md", "😀")
+    with tarfile.open(vault / "bundle.tar.gz", "w:gz") as tf:
+        data = "😃 tar\n".encode("utf-8")
+        info = tarfile.TarInfo("docs/t.txt")
+        info.size = len(data)
+        tf.addfile(info, io.BytesIO(data))
+    with gzip.open(vault / "single.md.gz", "wb") as gz:
+        gz.write("x 😀\n".encode("utf-8"))
+    (vault / "plain.md").write_text("😀", encoding="utf-8")
+
+    banned = tmp_path / "banned.txt"
+    banned.write_text("\\U0001F600-\\U0001F64F\n", encoding="utf-8")
+
+    scanner = SniperScanner(
+        vault,
+        banned,
+        exclude_patterns={"private/*"},
+        extensions={".md", ".txt"},
+        archives=True,
+    )
+    results, stats = scanner.scan()
+    labels = [(r.file.replace(str(vault) + "/", ""), r.line, r.col) for r in results]
+    assert labels == [
+        ("backup.zip!/notes/a.md", 2, 4),
+        ("bundle.tar.gz!/docs/t.txt", 1, 1),
+        ("plain.md", 1, 1),
+        ("single.md.gz!/single.md", 1, 3),
+    ]
+    assert stats["archives_scanned"] == 3
+    assert stats["files_scanned"] == 4
+
+
+def test_result_caps_truncate_and_estimate(tmp_path: Path):
+    vault = tmp_path / "vault"
+    vault.mkdir()
+    (vault / "a_small.md").write_text("😀 x\n" * 100, encoding="utf-8")
+    (vault / "b_huge.md").write_text("line 😀\n" * 20000, encoding="utf-8")
+    (vault / "c_exact.md").write_text("😀\n😀\nplain\n", encoding="utf-8")
+    banned = tmp_path / "banned.txt"
+    banned.write_text("\\U0001F600-\\U0001F64F\n", encoding="utf-8")
+
+    scanner = SniperScanner(vault, banned, extensions={".md"}, max_per_file=2)
+    results, stats = scanner.scan()
+    assert len(results) == 6
+    meta = {Path(m["file"]).name: m for m in scanner.file_meta}
+    # Short tail: remaining hits are counted exactly
+    assert meta["a_small.md"]["truncated"] is True
+    assert meta["a_small.md"]["estimated_remaining"] == 98
+    # Long tail: extrapolated from hit density
+    assert abs(meta["b_huge.md"]["estimated_remaining"] - 19998) < 1000
+    # Cap landed on the last hit: nothing was cut
+    assert "truncated" not in meta["c_exact.md"]
+    assert stats["files_truncated"] == 2 and stats["truncated"] is True
+
+    scanner = SniperScanner(vault, banned, extensions={".md"}, max_total=150)
+    results, stats = scanner.scan()
+    assert len(results) == 150
+    assert stats["files_scanned"] == 2 and stats["files_skipped"] == 1
+    assert scanner.file_meta[1]["truncated"] is True
+
+
+def test_result_cache_is_content_addressed(tmp_path: Path, monkeypatch):
+    from emoji_sniper.core.engine import Sniper
+
+    banned = tmp_path / "banned.txt"
+    banned.write_text("\\U0001F600-\\U0001F64F\n", encoding="utf-8")
+    cache = tmp_path / "cache"
+    doc = "# Template 😀\r\nbody\n\nend 😃 😀\n"
+    checkout_a = tmp_path / "a"
+    (checkout_a / "copies").mkdir(parents=True)
+    for name in ("one.md", "copies/two.md", "copies/three.md"):
+        (checkout_a / name).write_text(doc, encoding="utf-8", newline="")
+    (checkout_a / "other.md").write_text("clean\n", encoding="utf-8")
+
+    calls = []
+    real = Sniper.scan_text
+
+    def counting(self, text, label):
+        calls.append(label)
+        return real(self, text, label)
+
+    monkeypatch.setattr(Sniper, "scan_text", counting)
+    expected, _ = SniperScanner(checkout_a, banned, include_names=True).scan()
+
+    # Identical contents are scanned once per run
+    first, stats = SniperScanner(checkout_a, banned, include_names=True, result_cache=cache).scan()
+    assert first == expected
+    assert len(calls) == 2
+    assert (stats["cache_hits"], stats["cache_misses"]) == (2, 2)
+    assert stats["cache_bytes"] == 2 * len(doc.encode("utf-8"))
+
+    # Another checkout on another path is served entirely from the directory
+    checkout_b = tmp_path / "b"
+    checkout_a.rename(checkout_b)
+    calls.clear()
+    scanner = SniperScanner(checkout_b, banned, include_names=True, result_cache=cache)
+    again, stats = scanner.scan()
+    assert calls == [] and stats["cache_misses"] == 0
+    assert again == [
+        type(o)(**{**o.__dict__, "file": o.file.replace(str(checkout_a), str(checkout_b))})
+        for o in expected
+    ]
+
+    # Different rules never reuse entries
+    banned.write_text("😀\n", encoding="utf-8")
+    _, stats = SniperScanner(checkout_b, banned, result_cache=cache).scan()
+    assert stats["cache_misses"] == 2 and stats["occurrences"] == 6
+
+
+def test_checkpoint_resumes_interrupted_scan(tmp_path: Path, monkeypatch):
+    import pytest
+
+    vault = tmp_path / "vault"
+    vault.mkdir()
+    for i in range(6):
+        (vault / f"f{i}.md").write_text(f"line {i} 😀\nok\n{'😀' * i}\n", encoding="utf-8")
+    (vault / "z_clean.md").write_text("no emoji\n", encoding="utf-8")
+    banned = tmp_path / "banned.txt"
+    banned.write_text("😀\n", encoding="utf-8")
+    ckpt = tmp_path / "scan.ckpt"
+
+    full = SniperScanner(vault, banned, extensions={".md"})
+    expected, expected_stats = full.scan()
+
+    # Interrupt after the first three files have been completed
+    first = SniperScanner(vault, banned, extensions={".md"}, checkpoint=ckpt)
+    it = first.iter_scan()
+    seen = set()
+    for occ in it:
+        seen.add(occ.file)
+        if len(seen) == 4:
+            break
+    it.close()
+    assert len(ckpt.read_text(encoding="utf-8").splitlines()) == 1 + 3
+
+    opened = []
+    resumed = SniperScanner(vault, banned, extensions={".md"}, checkpoint=ckpt)
+    read = resumed._iter_file_lines
+    monkeypatch.setattr(resumed, "_iter_file_lines", lambda p: opened.append(p) or read(p))
+    results, stats = resumed.scan()
+    assert results == expected
+    assert stats == expected_stats
+    assert resumed.file_meta == full.file_meta
+    assert len(opened) == len(full.discover()) - 3
+
+    # A torn last line is dropped; different rules refuse the checkpoint
+    with open(ckpt, "a", encoding="utf-8") as f:
+        f.write('{"file": "trunc')
+    assert SniperScanner(vault, banned, extensions={".md"}, checkpoint=ckpt).scan()[0] == expected
+    allowed = tmp_path / "allowed.txt"
+    allowed.write_text("line 1 😀\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        SniperScanner(vault, banned, allowed, extensions={".md"}, checkpoint=ckpt)
@@ -0,0 +1,44 @@
+from pathlib import Path
+import json
+import subprocess
+import sys
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Generous on purpose: the import currently takes ~50 ms here, and the check
+# exists to catch a heavy module creeping back into the import path
+IMPORT_BUDGET_MS = 250
+
+# Only needed by other subcommands or options, so never imported up front
+DEFERRED = [
+    "concurrent.futures",
+    "gzip",
+    "hashlib",
+    "multiprocessing",
+    "numpy",
+    "pickle",
+    "sqlite3",
+    "tarfile",
+    "zipfile",
+    "unicodedata",
+    "emoji_sniper.core.core",
+    "emoji_sniper.core.engine",
+    "emoji_sniper.core.output",
+    "emoji_sniper.core.records",
+    "emoji_sniper.core.aio",
+    "emoji_sniper.core.checkpoint",
+    "emoji_sniper.core.substitute",
+]
+
+
+def test_cli_import_is_lean_and_within_budget():
+    code = (
+        "import json, sys, time; t = time.perf_counter(); import emoji_sniper.main; "
+        "ms = (time.perf_counter() - t) * 1000; "
+        f"print(json.dumps([ms, [m for m in {DEFERRED!r} if m in sys.modules]]))"
+    )
+    out = subprocess.check_output([sys.executable, "-c", code], cwd=ROOT, text=True)
+    ms, loaded = json.loads(out)
+    assert loaded == []
+    assert ms < IMPORT_BUDGET_MS
+
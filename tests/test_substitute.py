@@ -73,3 +73,281 @@ def test_substitute_regex_applies_when_not_allowed(tmp_path: Path):
     result = f.read_text(encoding="utf-8").rstrip("\n")
     assert result == "brilliant idea"
     assert stats.replacements >= 1
+
+
+def test_substitute_multi_codepoint_keys_longest_match(tmp_path: Path):
+    vault = tmp_path / "vault"
+    vault.mkdir()
+    f = vault / "m.md"
+    f.write_text("⚠️ careful ⚠ and 🇺🇸 flag, 👍🏽 ok, allowed 👍🏽!", encoding="utf-8")
+
+    banned = tmp_path / "banned.txt"
+    banned.write_text(
+        "\\U00002600-\\U000026FF\n\\U0001F1E0-\\U0001F1FF\n\\U0001F300-\\U0001F5FF\n"
+        "\\U0001F3FB-\\U0001F3FF\n\\U0001F44D-\\U0001F44D\n",
+        encoding="utf-8",
+    )
+    allowed = tmp_path / "allowed.txt"
+    allowed.write_text("allowed 👍🏽\n", encoding="utf-8")
+
+    subs = tmp_path / "subs.json"
+    subs.write_text(
+        '{"map": {"⚠": "!", "⚠\\ufe0f": "(!)", "🇺🇸": "US", "👍🏽": "+1"}}',
+        encoding="utf-8",
+    )
+
+    subber = Substitutor(
+        vault_path=vault,
+        banned_path=banned,
+        subs_path=subs,
+        allowed_path=allowed,
+        exclude_patterns=set(),
+        extensions={".md"},
+    )
+    stats = subber.run(dry_run=False)
+    result = f.read_text(encoding="utf-8").rstrip("\n")
+    assert result == "(!) careful ! and US flag, +1 ok, allowed 👍🏽!"
+    assert stats.replacements == 4
+    assert stats.unmapped_banned == 0
+
+
+def test_substitute_prefilter_skips_rules_without_triggers(tmp_path: Path):
+    vault = tmp_path / "vault"
+    vault.mkdir()
+    f = vault / "r.md"
+    f.write_text("✨ brilliant\n⭐ shiny\nplain\n", encoding="utf-8")
+
+    banned = tmp_path / "banned.txt"
+    banned.write_text("\\U00002700-\\U000027BF\n\\U00002B00-\\U00002BFF\n", encoding="utf-8")
+
+    subs = tmp_path / "subs.json"
+    subs.write_text(
+        '{"map": {}, "regex": ['
+        '{"pattern": "(?:\\u2728) +brilliant", "replacement": "brilliant"},'
+        '{"pattern": "\\u2b50 +shiny", "replacement": "shiny"},'
+        '{"pattern": ". +shiny", "replacement": "?"}]}',
+        encoding="utf-8",
+    )
+
+    subber = Substitutor(
+        vault_path=vault,
+        banned_path=banned,
+        subs_path=subs,
+        exclude_patterns=set(),
+        extensions={".md"},
+    )
+    assert subber.rule_prefilter.always == [2]
+
+    stats = subber.run(dry_run=False)
+    assert f.read_text(encoding="utf-8") == "brilliant\nshiny\nplain\n"
+    # line 1 skips the star rule, line 2 skips the sparkles rule, line 3 skips all three
+    assert stats.rule_evals_skipped == 5
+
+
+def test_substitute_sequences_mode_targets_whole_sequences(tmp_path: Path):
+    vault = tmp_path / "vault"
+    vault.mkdir()
+    f = vault / "q.md"
+    f.write_text("team 👩‍💻 and 👍🏽 and 🚀\n", encoding="utf-8")
+
+    banned = tmp_path / "banned.txt"
+    banned.write_text("\\U0001F300-\\U0001F6FF\n", encoding="utf-8")
+    subs = tmp_path / "subs.json"
+    subs.write_text('{"map": {"👩\\u200d💻": "dev", "👍": "+1"}}', encoding="utf-8")
+
+    subber = Substitutor(
+        vault_path=vault,
+        banned_path=banned,
+        subs_path=subs,
+        extensions={".md"},
+        sequences=True,
+    )
+    stats = subber.run(dry_run=False)
+    # "👍" alone would leave the banned modifier behind, so 👍🏽 stays unmapped
+    assert f.read_text(encoding="utf-8") == "team dev and 👍🏽 and 🚀\n"
+    assert stats.unmapped_banned == 2
+
+
+def test_substitute_diff_applies_with_git(tmp_path: Path, monkeypatch):
+    import io
+    import shutil
+    import subprocess
+
+    import pytest
+
+    if shutil.which("git") is None:
+        pytest.skip("git not available")
+
+    vault = tmp_path / "vault"
+    vault.mkdir()
+    body = ["plain line %d" % i for i in range(20)]
+    body[2] = "first ⭐ here"
+    body[17] = "second ⭐ there"
+    crlf = vault / "crlf.md"
+    crlf.write_bytes("\r\n".join(body).encode("utf-8") + b"\r\n")
+    tail = vault / "tail.md"
+    tail.write_bytes("keep\nlast ⭐".encode("utf-8"))
+    clean = vault / "clean.md"
+    clean.write_text("nothing to do\n", encoding="utf-8")
+    originals = {p: p.read_bytes() for p in (crlf, tail, clean)}
+
+    banned = tmp_path / "banned.txt"
+    banned.write_text("⭐\n", encoding="utf-8")
+    subs = tmp_path / "subs.json"
+    subs.write_text('{"map": {"⭐": "*"}}', encoding="utf-8")
+
+    monkeypatch.chdir(vault)
+    subber = Substitutor(vault_path=vault, banned_path=banned, subs_path=subs, extensions={".md"})
+
+    serial = io.StringIO()
+    stats = subber.run(diff=serial, context=2)
+    parallel = io.StringIO()
+    subber.run(diff=parallel, workers=2, context=2)
+
+    patch = serial.getvalue()
+    assert patch == parallel.getvalue()
+    # Two hunks for the far-apart changes; the clean file is not mentioned
+    assert patch.count("@@ -") == 3
+    assert "clean.md" not in patch
+    assert "\\ No newline at end of file" in patch
+    assert stats.files_changed == 2 and stats.replacements == 3
+    # Diff mode never touches the files
+    assert {p: p.read_bytes() for p in originals} == originals
+
+    (tmp_path / "fix.patch").write_bytes(patch.encode("utf-8"))
+    subprocess.run(["git", "apply", str(tmp_path / "fix.patch")], cwd=vault, check=True)
+    assert crlf.read_bytes() == originals[crlf].replace("⭐".encode("utf-8"), b"*")
+    assert tail.read_bytes() == b"keep\nlast *"
+
+
+def test_substitute_writes_what_the_diff_shows(tmp_path: Path, monkeypatch):
+    import io
+    import shutil
+    import subprocess
+
+    import pytest
+
+    if shutil.which("git") is None:
+        pytest.skip("git not available")
+
+    texts = {
+        "crlf.md": b"one \xe2\xad\x90\r\ntwo\r\nthree \xe2\xad\x90\r\n",
+        "tail.md": b"keep\r\nlast \xe2\xad\x90",
+        "mixed.md": b"a \xe2\xad\x90\nb\r\nc \xe2\xad\x90\r\n",
+    }
+    previewed = tmp_path / "previewed"
+    written = tmp_path / "written"
+    for vault in (previewed, written):
+        vault.mkdir()
+        for name, data in texts.items():
+            (vault / name).write_bytes(data)
+    banned = tmp_path / "banned.txt"
+    banned.write_text("⭐\n", encoding="utf-8")
+    subs = tmp_path / "subs.json"
+    subs.write_text('{"map": {"⭐": "*"}}', encoding="utf-8")
+
+    monkeypatch.chdir(previewed)
+    patch = io.StringIO()
+    Substitutor(previewed, banned, subs, extensions={".md"}).run(diff=patch)
+    (tmp_path / "fix.patch").write_bytes(patch.getvalue().encode("utf-8"))
+    subprocess.run(["git", "apply", str(tmp_path / "fix.patch")], cwd=previewed, check=True)
+
+    stats = Substitutor(written, banned, subs, extensions={".md"}).run(dry_run=False)
+    assert stats.files_changed == 3
+    for name, data in texts.items():
+        assert (written / name).read_bytes() == (previewed / name).read_bytes()
+        assert (written / name).read_bytes() == data.replace("⭐".encode("utf-8"), b"*")
+
+
+def test_fix_reports_and_rewrites_in_one_pass(tmp_path: Path, monkeypatch):
+    from emoji_sniper.core import SniperScanner
+
+    vault = tmp_path / "vault"
+    vault.mkdir()
+    texts = {
+        "a.md": "⭐ Star ✨ brilliant and 🦙\nplain\n🦙🦙🦙 ⭐\n",
+        "b.md": "only 🦙 here\n",
+        "c.md": "nothing\n",
+    }
+    for name, text in texts.items():
+        (vault / name).write_text(text, encoding="utf-8")
+    banned = tmp_path / "banned.txt"
+    banned.write_text("⭐\n✨\n🦙\n", encoding="utf-8")
+    allowed = tmp_path / "allowed.txt"
+    allowed.write_text("🦙🦙🦙\n", encoding="utf-8")
+    subs = tmp_path / "subs.json"
+    subs.write_text('{"map": {"⭐": "*", "🦙": "llama"}}', encoding="utf-8")
+
+    expected, _ = SniperScanner(vault, banned, allowed, extensions={".md"}).scan()
+    subber = Substitutor(vault, banned, subs, allowed, extensions={".md"})
+    opened = []
+    read = subber._read_lines
+    monkeypatch.setattr(subber, "_read_lines", lambda p: opened.append(p) or read(p))
+
+    results, stats = subber.fix()
+
+    assert len(opened) == len(texts)
+    # Same hits as a separate scan, each marked by what the rewrite did
+    assert [(r.file, r.line, r.col, r.char) for r in results] == [
+        (r.file, r.line, r.col, r.char) for r in expected
+    ]
+    assert [r.fix for r in results] == ["replaced", "unmapped", "replaced", "replaced", "replaced"]
+    assert stats.replacements == 4 and stats.unmapped_banned == 1 and stats.files_changed == 2
+    assert (vault / "a.md").read_text(encoding="utf-8") == (
+        "* Star ✨ brilliant and llama\nplain\n🦙🦙🦙 *\n"
+    )
+    assert [m["file"] for m in subber.file_meta] == [str(vault / "a.md"), str(vault / "b.md")]
+
+
+def test_substitute_prefilter_triggers_on_keycap_sequences(tmp_path: Path):
+    vault = tmp_path / "vault"
+    vault.mkdir()
+    f = vault / "k.md"
+    f.write_text("1️⃣ item and ✨ brilliant\n", encoding="utf-8")
+
+    # Only the sparkles and VS16 are banned; keycaps match as whole sequences
+    banned = tmp_path / "banned.txt"
+    banned.write_text("✨\n\ufe0f\n", encoding="utf-8")
+    subs = tmp_path / "subs.json"
+    subs.write_text(
+        '{"map": {}, "regex": ['
+        '{"pattern": "1\\ufe0f\\u20e3 item", "replacement": "one item"},'
+        '{"pattern": "\\u2728 brilliant", "replacement": "brilliant"}]}',
+        encoding="utf-8",
+    )
+
+    subber = Substitutor(vault, banned, subs, extensions={".md"}, sequences=True)
+    assert subber.sniper.substitute_line("1️⃣ item and ✨ brilliant") == (
+        "one item and brilliant",
+        2,
+        0,
+        0,
+    )
+
+
+def test_fix_report_matches_rescan(tmp_path: Path):
+    from emoji_sniper.core import SniperScanner
+
+    vault = tmp_path / "vault"
+    vault.mkdir()
+    f = vault / "a.md"
+    f.write_text("team 👍🏽 ok\n🚀 go\n", encoding="utf-8")
+    banned = tmp_path / "banned.txt"
+    banned.write_text("\\U0001F300-\\U0001F6FF\n", encoding="utf-8")
+    subs = tmp_path / "subs.json"
+    subs.write_text('{"map": {"👍": "+1", "🚀": "rocket"}}', encoding="utf-8")
+
+    results, stats = Substitutor(vault, banned, subs, extensions={".md"}, sequences=True).fix()
+    # "👍" alone does not cover the modifier, so the sequence is not replaced
+    assert [(r.char, r.fix) for r in results] == [("👍🏽", "unmapped"), ("🚀", "replaced")]
+    assert stats.unmapped_banned == 1
+    left, _ = SniperScanner(vault, banned, extensions={".md"}, sequences=True).scan()
+    assert [r.char for r in left] == ["👍🏽"]
+
+    subs.write_text('{"map": {"👍🏽": "+1"}}', encoding="utf-8")
+    results, stats = Substitutor(vault, banned, subs, extensions={".md"}, sequences=True).fix()
+    assert [(r.char, r.fix) for r in results] == [("👍🏽", "replaced")]
+    assert stats.unmapped_banned == 0
+    assert f.read_text(encoding="utf-8") == "team +1 ok\nrocket go\n"
+    left, _ = SniperScanner(vault, banned, extensions={".md"}, sequences=True).scan()
+    assert left == []